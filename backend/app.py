@@ -11,14 +11,21 @@ import time
 
 # Set up logging before importing the shared logger
 logging.basicConfig(level=logging.INFO)
-from config import logger
+from config import logger, JOBS_DB_PATH, JOB_WORKERS, MONTE_CARLO_MAX_ITERATIONS, OPTIMIZER_WORKERS
 
 logger.info("Starting the Flask app...")
 
 import plotly
 import plotly.graph_objs as go
 import pandas as pd
+from src.backtest_jobs import JOB_HANDLERS, run_simulation, run_ib_strategy, run_portfolio_backtest
 from src.grid_backtester import GridBacktester
+from src.job_queue import JobQueue, DONE as JOB_DONE, FAILED as JOB_FAILED
+from src.monte_carlo import run_monte_carlo
+from src.optimizer import ParameterOptimizer, grid_search, random_search
+from src.result_cache import get_result_cache
+from src.walk_forward import WalkForwardAnalysis
+from src.data_handler.base_data_handler import BaseDataHandler
 from src.results_storage import (
     save_simulation_result,
     get_all_simulation_results,
@@ -556,156 +563,397 @@ def api_delete_backtest(timestamp):
             'status': 'error',
             'message': str(e)
         }), 500
+
+@app.route('/api/backtests/<timestamp>/monte_carlo', methods=['POST'])
+def api_monte_carlo(timestamp):
+    """Monte Carlo distributions of a stored backtest's metrics over resampled trade sequences"""
+    try:
+        result = get_simulation_result_by_timestamp(timestamp)
+        if not result:
+            return jsonify({
+                'status': 'error',
+                'message': f"Backtest with timestamp {timestamp} not found"
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        iterations = int(data.get('iterations', 10000))
+        if iterations > MONTE_CARLO_MAX_ITERATIONS:
+            raise ValueError(f"At most {MONTE_CARLO_MAX_ITERATIONS} iterations are allowed, got {iterations}")
+        seed = data.get('seed')
+        analysis = run_monte_carlo(
+            result.get('orders', []),
+            float(result.get('equity', {}).get('initial') or result.get('params', {}).get('initial_capital', 10000)),
+            iterations=iterations,
+            method=data.get('method', 'bootstrap'),
+            slippage_bps=float(data.get('slippage_bps', 0.0)),
+            seed=int(seed) if seed is not None else None
+        )
+        return jsonify({
+            'status': 'success',
+            'data': analysis
+        })
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo analysis of backtest {timestamp}: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/simulate', methods=['POST'])
 def api_simulate():
     try:
         data = request.json
-        symbol = data.get('symbol')
-        interval = data.get('interval')
-        initial_capital = float(data.get('initial_capital'))
-        risk_percent = float(data.get('risk_percent'))
-        rsi_length = int(data.get('rsi_length', 14))
-        macd_fast = int(data.get('macd_fast', 12))
-        macd_slow = int(data.get('macd_slow', 26))
-        macd_signal = int(data.get('macd_signal', 9))
+        if data.get('async'):
+            return submit_job('simulate', data)
 
-        backtester = GridBacktester(
-            symbol=symbol,
-            interval=interval,
-            initial_capital=initial_capital,
-            risk_percent=risk_percent,
-            strategy_type='momentum',
-            box_params={
-                'rsi_length': rsi_length,
-                'macd_fast': macd_fast,
-                'macd_slow': macd_slow,
-                'macd_signal': macd_signal
-            }
-        )
+        return jsonify({
+            'status': 'success',
+            **run_simulation(data)
+        })
+    except Exception as e:
+        logger.error(f"API simulation error: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
-        backtester.fetch_and_store_data()
-        orders, final_value, trade_analysis, drawdown_analysis, sharpe_analysis = backtester.simulate()
+@app.route('/api/backtest/ib_strategy', methods=['POST'])
+def backtest_ib_strategy():
+    try:
+        # Get parameters from request
+        data = request.get_json() or request.form.to_dict()
+        if data.get('async'):
+            return submit_job('ib_strategy', data)
 
-        # Get optional name and notes
-        name = data.get('name')
-        notes = data.get('notes')
+        return jsonify({
+            'status': 'success',
+            **run_ib_strategy(data)
+        })
+    except Exception as e:
+        logger.error(f"IB Strategy backtest error: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
-        # Save the simulation result
-        df_candles = backtester.get_stored_data(symbol)
-        filename = save_simulation_result(
-            params={
+@app.route('/api/data/gaps', methods=['GET'])
+def api_get_gaps():
+    """List missing candles in a cached series"""
+    try:
+        symbol = request.args.get('symbol')
+        interval = request.args.get('interval', '1h')
+        if not symbol:
+            return jsonify({'status': 'error', 'message': 'symbol is required'}), 400
+
+        gaps = BaseDataHandler().get_gaps(symbol, interval)
+        return jsonify({
+            'status': 'success',
+            'data': {
                 'symbol': symbol,
                 'interval': interval,
-                'initial_capital': initial_capital,
-                'risk_percent': risk_percent,
-                'strategy_type': 'momentum',
-                'box_params': {
-                    'rsi_length': rsi_length,
-                    'macd_fast': macd_fast,
-                    'macd_slow': macd_slow,
-                    'macd_signal': macd_signal
-                }
-            },
-            orders=orders,
-            final_value=final_value,
-            candle_data=df_candles,
-            name=name,
-            notes=notes
-        )
+                'gaps': [{'start': start, 'end': end} for start, end in gaps]
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error getting gaps: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
-        # Get the timestamp from the filename
-        timestamp = os.path.basename(filename).replace('simulation_', '').replace('.json', '')
+@app.route('/api/data/gaps/repair', methods=['POST'])
+def api_repair_gaps():
+    """Re-fetch the missing candles of a cached series"""
+    try:
+        data = request.get_json() or {}
+        symbol = data.get('symbol')
+        interval = data.get('interval', '1h')
+        if not symbol:
+            return jsonify({'status': 'error', 'message': 'symbol is required'}), 400
 
+        report = BaseDataHandler().repair_gaps(symbol, interval)
+        report['remaining'] = [{'start': start, 'end': end} for start, end in report['remaining']]
         return jsonify({
             'status': 'success',
-            'timestamp': timestamp,
-            'final_value': final_value,
-            'orders': orders,
-            'trade_analysis': trade_analysis,
-            'drawdown_analysis': drawdown_analysis,
-            'sharpe_analysis': sharpe_analysis,
+            'data': report
         })
     except Exception as e:
-        logger.error(f"API simulation error: {str(e)}")
+        logger.error(f"Error repairing gaps: {str(e)}")
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
-@app.route('/api/backtest/ib_strategy', methods=['POST'])
-def backtest_ib_strategy():
+def parse_max_workers(value):
+    """A request's max_workers clamped to 1..OPTIMIZER_WORKERS, None to keep the default"""
+    if value is None:
+        return None
     try:
-        # Get parameters from request
-        data = request.get_json() or request.form
-        symbol = data.get('symbol', 'BTCUSDT')
-        interval = data.get('interval', '1h')  # IB strategy typically works better on higher timeframes
-        initial_capital = float(data.get('initial_capital', 10000))
-        risk_percent = float(data.get('risk_percent', 1.0))
-
-        # IB strategy specific parameters
-        ib_params = {
-            'minInsideBarSize': float(data.get('minInsideBarSize', 0.5)),
-            'useTrendFilter': bool(data.get('useTrendFilter', True)),
-            'useVolumeFilter': bool(data.get('useVolumeFilter', True)),
-            'volMultiplier': float(data.get('volMultiplier', 1.1)),
-            'useATRTP': bool(data.get('useATRTP', True)),
-            'atrLength': int(data.get('atrLength', 14)),
-            'atrMult': float(data.get('atrMult', 1.5)),
-            'rr_ratio': float(data.get('rr_ratio', 2.5))
-        }
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError
+        workers = int(value)
+    except ValueError:
+        raise ValueError(f"max_workers must be an integer, got {value!r}") from None
+    return min(max(workers, 1), OPTIMIZER_WORKERS)
+
+@app.route('/api/optimize', methods=['POST'])
+def api_optimize():
+    """Sweep strategy parameters and stream the runs back as NDJSON, then the ranking"""
+    try:
+        data = request.get_json() or {}
+        symbol = data.get('symbol')
+        if not symbol:
+            return jsonify({'status': 'error', 'message': 'symbol is required'}), 400
+        try:
+            max_workers = parse_max_workers(data.get('max_workers'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        backtester = GridBacktester(
+        if data.get('search', 'grid') == 'random':
+            combinations = random_search(data.get('space', {}), int(data.get('n_iter', 20)), data.get('seed'))
+        else:
+            combinations = grid_search(data.get('param_grid', {}))
+
+        optimizer = ParameterOptimizer(
             symbol=symbol,
-            interval=interval,
-            initial_capital=initial_capital,
-            risk_percent=risk_percent,
-            strategy_type='ib_price_action',  # New strategy type
-            box_params=ib_params  # Pass IB specific params
+            interval=data.get('interval', '1h'),
+            initial_capital=float(data.get('initial_capital', 10000)),
+            risk_percent=float(data.get('risk_percent', 1.0)),
+            box_params=data.get('box_params', {}),
+            strategy_type=data.get('strategy_type', 'grid'),
+            htf_interval=data.get('htf_interval'),
+            objective=data.get('objective', 'sharpe'),
+            engine=data.get('engine', 'vector'),
+            max_workers=max_workers,
+            early_stop=data.get('early_stop')
         )
+        # Load the candles up front so fetch errors still get a JSON error response
+        optimizer.load_data(data.get('start_time'), data.get('end_time'))
+        top = int(data.get('top', 10))
+
+        def generate():
+            results = []
+            try:
+                for result in optimizer.iter_results(combinations):
+                    results.append(result)
+                    yield json.dumps({'type': 'result', 'data': result}) + '\n'
+                ranked = optimizer.rank(results)
+                yield json.dumps({'type': 'ranking', 'objective': optimizer.objective, 'data': ranked[:top]}) + '\n'
+            except Exception as e:
+                logger.error(f"Optimization error: {str(e)}")
+                yield json.dumps({'type': 'error', 'message': str(e)}) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+    except Exception as e:
+        logger.error(f"Error starting optimization: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
-        backtester.fetch_and_store_data()
-        orders, final_value, trade_analysis, drawdown_analysis, sharpe_analysis = backtester.simulate()
+@app.route('/api/walk_forward', methods=['POST'])
+def api_walk_forward():
+    """Optimize on rolling train windows and report the stitched out-of-sample results"""
+    try:
+        data = request.get_json() or {}
+        symbol = data.get('symbol')
+        if not symbol:
+            return jsonify({'status': 'error', 'message': 'symbol is required'}), 400
+        if 'train_bars' not in data or 'test_bars' not in data:
+            return jsonify({'status': 'error', 'message': 'train_bars and test_bars are required'}), 400
+        try:
+            max_workers = parse_max_workers(data.get('max_workers'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        # Get optional name and notes
-        name = data.get('name')
-        notes = data.get('notes')
+        if data.get('search', 'grid') == 'random':
+            combinations = random_search(data.get('space', {}), int(data.get('n_iter', 20)), data.get('seed'))
+        else:
+            combinations = grid_search(data.get('param_grid', {}))
 
-        # Save the simulation result
-        df_candles = backtester.get_stored_data(symbol)
-        filename = save_simulation_result(
-            params={
-                'symbol': symbol,
-                'interval': interval,
-                'initial_capital': initial_capital,
-                'risk_percent': risk_percent,
-                'strategy_type': 'ib_price_action',
-                'box_params': ib_params
-            },
-            orders=orders,
-            final_value=final_value,
-            candle_data=df_candles,
-            name=name,
-            notes=notes
+        optimizer = ParameterOptimizer(
+            symbol=symbol,
+            interval=data.get('interval', '1h'),
+            initial_capital=float(data.get('initial_capital', 10000)),
+            risk_percent=float(data.get('risk_percent', 1.0)),
+            box_params=data.get('box_params', {}),
+            strategy_type=data.get('strategy_type', 'grid'),
+            htf_interval=data.get('htf_interval'),
+            objective=data.get('objective', 'sharpe'),
+            engine=data.get('engine', 'vector'),
+            max_workers=max_workers,
+            early_stop=data.get('early_stop')
         )
+        optimizer.load_data(data.get('start_time'), data.get('end_time'))
+        analysis = WalkForwardAnalysis(
+            optimizer,
+            train_bars=int(data['train_bars']),
+            test_bars=int(data['test_bars']),
+            step_bars=data.get('step_bars'),
+            anchored=bool(data.get('anchored', False))
+        )
+        return jsonify({
+            'status': 'success',
+            'data': analysis.run(combinations)
+        })
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Walk-forward error: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
 
-        # Get the timestamp from the filename
-        timestamp = os.path.basename(filename).replace('simulation_', '').replace('.json', '')
+@app.route('/api/portfolio_backtest', methods=['POST'])
+def api_portfolio_backtest():
+    """Backtest one strategy over a basket of cached symbols with shared cash"""
+    try:
+        data = request.get_json() or {}
+        if not data.get('symbols'):
+            return jsonify({'status': 'error', 'message': 'symbols is required'}), 400
+        if data.get('async'):
+            return submit_job('portfolio_backtest', data)
 
         return jsonify({
             'status': 'success',
-            'timestamp': timestamp,
-            'final_value': final_value,
-            'orders': orders,
-            'trade_analysis': trade_analysis,
-            'drawdown_analysis': drawdown_analysis,
-            'sharpe_analysis': sharpe_analysis,
+            **run_portfolio_backtest(data)
         })
     except Exception as e:
-        logger.error(f"IB Strategy backtest error: {str(e)}")
+        logger.error(f"Portfolio backtest error: {str(e)}")
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
+# ================================= #
+# Background jobs                   #
+# ================================= #
+
+job_queue = None
+job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """The process's job queue, created (and its persisted jobs resumed) on first use"""
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            queue = JobQueue(JOBS_DB_PATH, JOB_HANDLERS, max_workers=JOB_WORKERS)
+            queue.resume()
+            job_queue = queue
+    return job_queue
+
+def submit_job(kind, params):
+    job = get_job_queue().submit(kind, dict(params))
+    return jsonify({
+        'status': 'success',
+        'job_id': job['id'],
+        'data': job
+    }), 202
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue a backtest ('simulate', 'ib_strategy' or 'portfolio_backtest') and return its id"""
+    try:
+        data = request.get_json() or {}
+        kind = data.get('kind')
+        if kind not in JOB_HANDLERS:
+            return jsonify({'status': 'error', 'message': f"kind must be one of {sorted(JOB_HANDLERS)}"}), 400
+        return submit_job(kind, data.get('params') or {})
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """List recent jobs, optionally filtered by status"""
+    try:
+        jobs = get_job_queue().store.list(
+            status=request.args.get('status'),
+            limit=int(request.args.get('limit', 50))
+        )
+        return jsonify({
+            'status': 'success',
+            'data': jobs
+        })
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """Status and progress of a job"""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f"Job {job_id} not found"}), 404
+    return jsonify({
+        'status': 'success',
+        'data': job
+    })
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def api_get_job_result(job_id):
+    """Result of a finished job (409 while it is queued or running)"""
+    job = get_job_queue().store.get(job_id, with_result=True)
+    if job is None:
+        return jsonify({'status': 'error', 'message': f"Job {job_id} not found"}), 404
+    if job['status'] == JOB_DONE:
+        return jsonify({
+            'status': 'success',
+            **job['result']
+        })
+    if job['status'] == JOB_FAILED:
+        return jsonify({'status': 'error', 'message': job['error']}), 500
+    return jsonify({'status': 'error', 'message': f"Job {job_id} is {job['status']}", 'data': job}), 409
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """Cancel a job that has not started yet"""
+    store = get_job_queue().store
+    if store.get(job_id) is None:
+        return jsonify({'status': 'error', 'message': f"Job {job_id} not found"}), 404
+    if not store.cancel(job_id):
+        return jsonify({'status': 'error', 'message': f"Job {job_id} has already started"}), 409
+    return jsonify({'status': 'success', 'message': f"Cancelled job {job_id}"})
+
+@app.route('/api/result_cache', methods=['GET'])
+def api_result_cache_stats():
+    """Size and usage of the backtest result cache"""
+    return jsonify({
+        'status': 'success',
+        'data': get_result_cache().stats()
+    })
+
+@app.route('/api/result_cache', methods=['DELETE'])
+def api_clear_result_cache():
+    """Drop every cached backtest result"""
+    count = get_result_cache().clear()
+    return jsonify({'status': 'success', 'message': f"Evicted {count} cached results"})
+
+@app.route('/api/result_cache/<key>', methods=['DELETE'])
+def api_evict_result(key):
+    """Drop one cached backtest result (the cache_key of a GridBacktester run)"""
+    if not get_result_cache().evict(key):
+        return jsonify({'status': 'error', 'message': f"No cached result {key}"}), 404
+    return jsonify({'status': 'success', 'message': f"Evicted cached result {key}"})
+
 if __name__ == '__main__':
+    # Resume persisted jobs in the serving process only, not in the debug reloader's watcher
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_job_queue()
     app.run(debug=True)
@@ -0,0 +1,66 @@
+# benchmarks/bench_early_stop.py
+"""
+Wall time of a parameter sweep with and without early-stop rules.
+
+Runs the same ParameterOptimizer sweep over synthetic candles twice, without
+rules and with them, and checks that every run the rules did not stop
+returned exactly the result of the full sweep.
+
+Run from the backend directory:
+    poetry run python -m benchmarks.bench_early_stop --bars 20000 --engine backtrader
+"""
+import argparse
+import logging
+import time
+
+from config import logger
+from src.data_handler.synthetic import generate_ohlcv
+from src.optimizer import ParameterOptimizer, grid_search
+
+PARAM_GRID = {
+    'rsi_threshold': [30, 40, 50, 60],
+    'box_lookback': [10, 20, 31],
+    'atr_multiplier': [1.0, 2.0],
+}
+
+
+def sweep(candles, engine: str, early_stop, workers: int):
+    optimizer = ParameterOptimizer('BENCH/USDT', '1h', 10000.0, 2.0, strategy_type='grid', engine=engine,
+                                   max_workers=workers, early_stop=early_stop)
+    optimizer.data = candles
+    start = time.perf_counter()
+    results = optimizer.run(grid_search(PARAM_GRID))
+    return time.perf_counter() - start, {result['index']: result for result in results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=20_000)
+    parser.add_argument('--engine', choices=['vector', 'backtrader'], default='vector')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--max-drawdown', type=float, default=10.0)
+    parser.add_argument('--min-equity-pct', type=float, default=90.0)
+    parser.add_argument('--no-trade-bars', type=int, default=2000)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    candles = generate_ohlcv(args.bars, '1h', seed=1)
+    rules = {'max_drawdown': args.max_drawdown, 'min_equity_pct': args.min_equity_pct,
+             'no_trade_bars': args.no_trade_bars}
+    full_time, full = sweep(candles, args.engine, None, args.workers)
+    stop_time, stopped = sweep(candles, args.engine, rules, args.workers)
+
+    truncated = [result for result in stopped.values() if result.get('truncated')]
+    for index, result in stopped.items():
+        if not result.get('truncated'):
+            assert result['final_value'] == full[index]['final_value'], "early stop changed a completed run"
+    bars_run = sum(result['truncated']['bars'] for result in truncated) + args.bars * (len(stopped) - len(truncated))
+
+    print(f"{len(full)} runs x {args.bars} bars ({args.engine} engine), rules {rules}")
+    print(f"full sweep      {full_time:8.2f}s")
+    print(f"with early stop {stop_time:8.2f}s  ({full_time / stop_time:.2f}x), {len(truncated)} runs stopped, "
+          f"{bars_run / (args.bars * len(stopped)):.0%} of the bars simulated")
+
+
+if __name__ == '__main__':
+    main()
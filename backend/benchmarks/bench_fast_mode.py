@@ -0,0 +1,56 @@
+# benchmarks/bench_fast_mode.py
+"""
+Time GridBacktester.simulate() with the default Cerebro settings against fast=True.
+
+Run from the backend directory:
+    poetry run python -m benchmarks.bench_fast_mode --bars 100000
+"""
+import argparse
+import logging
+import time
+from typing import Tuple
+
+import pandas as pd
+
+from config import logger
+from src.data_handler.synthetic import generate_ohlcv
+from src.grid_backtester import GridBacktester
+from src.indicator_cache import get_indicator_cache
+
+STRATEGIES = {
+    'grid': {'rsi_threshold': 30, 'box_lookback': 10},
+    'momentum': {},
+    'stoch_mean_reversion': {'oversold': 40, 'overbought': 60},
+}
+
+
+def time_simulate(candles: pd.DataFrame, strategy_type: str, fast: bool) -> Tuple[float, float]:
+    # Start from a cold indicator cache so both modes compute their indicators
+    get_indicator_cache().clear()
+    backtester = GridBacktester('BENCH/USDT', '1h', 10000.0, 1.0, STRATEGIES[strategy_type], strategy_type, fast=fast)
+    backtester.store_data('BENCH/USDT', candles.copy())
+    start = time.perf_counter()
+    result = backtester.simulate()
+    elapsed = time.perf_counter() - start
+    return elapsed, result[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=100_000)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), action='append')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    candles = generate_ohlcv(args.bars, '1h', seed=1)
+    print(f"{'strategy':<22}{'default s':>11}{'fast s':>9}{'speedup':>9}{'bars/s (fast)':>15}")
+    for strategy_type in args.strategy or sorted(STRATEGIES):
+        default_time, default_value = time_simulate(candles, strategy_type, fast=False)
+        fast_time, fast_value = time_simulate(candles, strategy_type, fast=True)
+        assert fast_value == default_value, "fast mode changed the result"
+        print(f"{strategy_type:<22}{default_time:>11.2f}{fast_time:>9.2f}"
+              f"{default_time / fast_time:>8.2f}x{args.bars / fast_time:>15,.0f}")
+
+
+if __name__ == '__main__':
+    main()
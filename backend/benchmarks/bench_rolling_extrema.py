@@ -0,0 +1,102 @@
+# benchmarks/bench_rolling_extrema.py
+"""
+Per-bar cost of a rolling box low/high against the window length.
+
+Compares the min(line.get(size=N)) / max(...) scans BoxMacdRsiStrategy used to do
+in next() with the RollingMin/RollingMax indicators, in Cerebro's bar-by-bar mode
+(runonce=False, as with live feeds) and in runonce mode (backtests), and the vector
+engine's lowest() against a sliding-window scan. Only the strategy's next() and
+its indicators are timed (see src.profiling), not the rest of Cerebro's loop.
+
+Run from the backend directory:
+    poetry run python -m benchmarks.bench_rolling_extrema --bars 20000
+"""
+import argparse
+import time
+
+import backtrader as bt
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src import vector_indicators as vi
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.array_feed import CandleArrayData
+from src.data_handler.synthetic import generate_ohlcv
+from src.profiling import SimulationProfiler
+from src.rolling_indicators import RollingMax, RollingMin
+
+LOOKBACKS = (5, 31, 100, 500, 2000)
+
+
+class WindowScan(bt.Strategy):
+    params = (('lookback', 31),)
+
+    def next(self):
+        if len(self.data) >= self.p.lookback:
+            self.box = (min(self.data.low.get(size=self.p.lookback)), max(self.data.high.get(size=self.p.lookback)))
+
+
+class Rolling(bt.Strategy):
+    params = (('lookback', 31),)
+
+    def __init__(self):
+        self.lowest = RollingMin(self.data.low, period=self.p.lookback)
+        self.highest = RollingMax(self.data.high, period=self.p.lookback)
+
+    def next(self):
+        self.box = (self.lowest[0], self.highest[0])
+
+
+def best_time(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def strategy_time(candles: CandleArrays, strategy_cls: type, lookback: int, runonce: bool, repeat: int) -> float:
+    """
+    Best time spent in the strategy's next() plus its indicators, leaving out the
+    rest of Cerebro's per-bar work (identical for both strategies).
+    """
+    timings = []
+    for _ in range(repeat):
+        profiler = SimulationProfiler()
+        cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+        cerebro.adddata(CandleArrayData(candles=candles))
+        cerebro.addstrategy(profiler.profile_strategy(strategy_cls), lookback=lookback)
+        cerebro.run()
+        timings.append(sum(sum(profiler.durations[section]) for section in ('next', 'indicators')) / 1e9)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (best is kept)')
+    args = parser.parse_args()
+
+    candles = CandleArrays.from_frame(generate_ohlcv(args.bars, '1h', seed=1), dtype=None)
+    low = candles.low
+
+    def per_bar(seconds: float) -> float:
+        return seconds / args.bars * 1e6
+
+    print("microseconds per bar (box low and high for the Cerebro columns, low only for vector)")
+    print(f"{'lookback':>8}{'next scan':>11}{'next rolling':>14}{'once scan':>11}{'once rolling':>14}"
+          f"{'vector scan':>13}{'vector':>9}")
+    for lookback in LOOKBACKS:
+        cerebro_costs = [
+            per_bar(strategy_time(candles, strategy_cls, lookback, runonce, args.repeat))
+            for runonce in (False, True) for strategy_cls in (WindowScan, Rolling)
+        ]
+        vector_scan = per_bar(best_time(lambda: sliding_window_view(low, lookback).min(axis=1), args.repeat))
+        vector = per_bar(best_time(lambda: vi.lowest(low, lookback), args.repeat))
+        print(f"{lookback:>8}" + ''.join(f"{cost:>{width}.2f}" for cost, width in zip(cerebro_costs, (11, 14, 11, 14)))
+              + f"{vector_scan:>13.3f}{vector:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
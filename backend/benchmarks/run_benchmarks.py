@@ -0,0 +1,296 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite over deterministic synthetic candles (no network access).
+
+Times the data handler cache, GridBacktester.simulate() per strategy and engine,
+calculate_advanced_metrics, results_storage and the /sse stream, and writes a
+JSON report (seconds, throughput and peak traced memory per case) that can be
+compared against the report of another commit.
+
+Run from the backend directory:
+    poetry run python -m benchmarks.run_benchmarks --bars 20000 --output before.json
+    poetry run python -m benchmarks.run_benchmarks --compare before.json after.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest import mock
+
+import numpy as np
+
+from config import logger
+from src import results_storage
+from src.data_handler.base_data_handler import BaseDataHandler
+from src.data_handler.memory_store import get_shared_store
+from src.data_handler.ohlcv_cache import get_cache_backend
+from src.data_handler.synthetic import generate_ohlcv
+from src.data_handler.timeframes import resample_ohlcv
+from src.grid_backtester import GridBacktester
+from src.indicator_cache import get_indicator_cache
+from src.metrics import calculate_advanced_metrics
+
+SYMBOL = 'BENCH/USDT'
+INTERVAL = '1h'
+
+# strategy_type -> (box_params, risk_percent, htf_interval)
+STRATEGIES = {
+    'grid': ({'rsi_threshold': 30, 'box_lookback': 10}, 2.0, None),
+    'momentum': ({}, 0.5, None),
+    'ib_price_action': ({'useVolumeFilter': False}, 10.0, None),
+    'stoch_mean_reversion': ({'oversold': 40, 'overbought': 60}, 1.0, '4h'),
+}
+# IBPriceActionStrategy re-arms two orders for every fill, so its order book grows with
+# the series: under Cerebro even 600 bars take minutes. Time it on a short series with
+# the vector engine only
+IB_MAX_BARS = 600
+IB_ENGINES = ('vector',)
+
+# engine label -> GridBacktester keyword arguments
+ENGINES = {
+    'backtrader': {},
+    'backtrader-fast': {'fast': True},
+    'vector': {'engine': 'vector'},
+}
+
+# case name -> (callable, processed count, unit); every call must redo the full work
+Case = Tuple[Callable[[], Any], int, str]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Best wall time over `repeat` calls, then the peak traced memory of one more call.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(timings), 'peak_memory_bytes': peak}
+
+
+def data_handler_cases(candles, workdir: str) -> Dict[str, Case]:
+    cases = {}
+    for backend in ('numpy', 'csv'):
+        handler = BaseDataHandler()
+        handler.cache = get_cache_backend(backend, os.path.join(workdir, f'cache_{backend}'))
+        handler.cache.save(SYMBOL, INTERVAL, candles)
+        cases[f'data_handler.save[{backend}]'] = (
+            lambda h=handler: h.cache.save(SYMBOL, INTERVAL, candles), len(candles), 'bars')
+        cases[f'data_handler.load[{backend}]'] = (
+            lambda h=handler: h.load_cached_data(SYMBOL, INTERVAL), len(candles), 'bars')
+    return cases
+
+
+def simulate(candles, strategy_type: str, **engine_kwargs):
+    box_params, risk, htf_interval = STRATEGIES[strategy_type]
+    # Cold caches, so every run computes its indicators and loads its data
+    get_indicator_cache().clear()
+    get_shared_store().clear()
+    backtester = GridBacktester(SYMBOL, INTERVAL, 10000.0, risk, dict(box_params), strategy_type,
+                                htf_interval=htf_interval, **engine_kwargs)
+    backtester.store_data(SYMBOL, candles.copy())
+    if htf_interval:
+        backtester.store_data(backtester.htf_key, resample_ohlcv(candles, INTERVAL, htf_interval))
+    return backtester.simulate()
+
+
+def simulate_cases(candles) -> Dict[str, Case]:
+    cases = {}
+    for strategy_type in STRATEGIES:
+        series, engines = candles, ENGINES
+        if strategy_type == 'ib_price_action':
+            series = candles.iloc[:IB_MAX_BARS]
+            engines = {label: ENGINES[label] for label in IB_ENGINES}
+        for label, kwargs in engines.items():
+            cases[f'simulate.{strategy_type}[{label}]'] = (
+                lambda s=series, st=strategy_type, kw=kwargs: simulate(s, st, **kw), len(series), 'bars')
+    return cases
+
+
+def metrics_cases(candles) -> Dict[str, Case]:
+    orders, final_value = simulate(candles, 'grid', fast=True)[:2]
+    return {
+        'metrics.calculate_advanced_metrics': (
+            lambda: calculate_advanced_metrics(orders, 10000.0, final_value), len(orders), 'orders'),
+    }
+
+
+@contextmanager
+def results_dir(workdir: str):
+    """
+    Point results_storage at a scratch directory.
+    """
+    results = os.path.join(workdir, 'results')
+    archive = os.path.join(workdir, 'archived_results')
+    os.makedirs(results, exist_ok=True)
+    os.makedirs(archive, exist_ok=True)
+    with mock.patch.object(results_storage, 'RESULTS_DIR', results), \
+            mock.patch.object(results_storage, 'ARCHIVE_DIR', archive):
+        yield results
+
+
+def results_storage_cases(candles, workdir: str, n_results: int = 20) -> Dict[str, Case]:
+    orders = simulate(candles, 'grid', fast=True)[0]
+    params = {'symbol': SYMBOL, 'interval': INTERVAL, 'initial_capital': 10000.0, 'strategy_type': 'grid'}
+
+    def save():
+        with results_dir(workdir):
+            return results_storage.save_simulation_result(params, orders, 10000.0, candles.copy())
+
+    # Results are named by their timestamp in seconds, so fan one out under distinct names
+    with results_dir(workdir) as directory:
+        saved = save()
+        with open(saved) as f:
+            result = json.load(f)
+        os.remove(saved)
+        for i in range(n_results):
+            result['timestamp'] = 1_600_000_000 + i
+            with open(os.path.join(directory, f"simulation_{result['timestamp']}.json"), 'w') as f:
+                json.dump(result, f)
+
+    def list_all():
+        with results_dir(workdir):
+            return results_storage.get_all_simulation_results()
+
+    return {
+        'results_storage.save': (save, len(candles), 'bars'),
+        'results_storage.list': (list_all, n_results, 'results'),
+    }
+
+
+def sse_cases(candles, n_events: int = 5000) -> Dict[str, Case]:
+    import app as app_module
+
+    logging.getLogger().setLevel(logging.WARNING)
+    records = candles.iloc[:n_events].assign(time=candles['time'].astype(str)).to_dict(orient='records')
+
+    def stream():
+        # The route polls its queues once per second; take the sleep out to time the stream itself
+        with mock.patch.object(app_module, 'time', SimpleNamespace(sleep=lambda seconds: None)), \
+                mock.patch.object(app_module, 'trading_client', None):
+            for record in records:
+                app_module.live_data_queue.put(record)
+            response = app_module.app.test_client().get('/sse')
+            chunks = iter(response.response)
+            for _ in range(len(records)):
+                next(chunks)
+            response.close()
+
+    return {'sse.stream': (stream, len(records), 'events')}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(bars: int, seed: int, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    candles = generate_ohlcv(bars, INTERVAL, seed=seed)
+    workdir = tempfile.mkdtemp(prefix='benchmarks_')
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'bars': bars,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'cases': {},
+    }
+    try:
+        cases = {}
+        for build in (
+            lambda: data_handler_cases(candles, workdir),
+            lambda: simulate_cases(candles),
+            lambda: metrics_cases(candles),
+            lambda: results_storage_cases(candles, workdir),
+            lambda: sse_cases(candles),
+        ):
+            cases.update(build())
+
+        for name, (func, count, unit) in cases.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            result = measure(func, repeat)
+            result.update({'count': count, 'unit': unit, 'per_second': count / result['seconds']})
+            report['cases'][name] = result
+            print(f"{name:<48}{result['seconds']:>10.4f}s{result['per_second']:>14,.0f} {unit}/s"
+                  f"{result['peak_memory_bytes'] / 2**20:>10.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Print the time ratio of every case present in both reports; returns the
+    cases that got slower by more than `threshold` (e.g. 1.1 = 10%).
+    """
+    regressions = []
+    print(f"{'case':<48}{'before s':>10}{'after s':>10}{'ratio':>8}")
+    for name, old in before['cases'].items():
+        new = after['cases'].get(name)
+        if new is None:
+            continue
+        ratio = new['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        flag = ' <- slower' if ratio > threshold else ''
+        print(f"{name:<48}{old['seconds']:>10.4f}{new['seconds']:>10.4f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark suite over synthetic candles')
+    parser.add_argument('--bars', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='timed calls per case (best is kept)')
+    parser.add_argument('--only', action='append', help='run cases whose name contains this (repeatable)')
+    parser.add_argument('--output', help='report path (default: benchmarks/reports/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two reports')
+    parser.add_argument('--threshold', type=float, default=1.1, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        sys.exit(1 if compare(before, after, args.threshold) else 0)
+
+    logger.setLevel(logging.WARNING)
+    report = run(args.bars, args.seed, args.repeat, args.only)
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), 'reports', f"{(report['meta']['commit'] or 'local')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,17 @@ API_SECRET = os.environ.get("EXCHANGE_SECRET_KEY", "YOUR_DEFAULT_SECRET")
 EXCHANGE_NAME = os.environ.get("EXCHANGE_NAME", "mexc")
 USE_SDK = os.environ.get("USE_SDK", "True").lower() == "true"
 
+# Exchange request budget shared by all concurrent downloads (requests per second)
+EXCHANGE_RATE_LIMIT = float(os.environ.get("EXCHANGE_RATE_LIMIT", "10"))
+# Worker threads used when downloading many series at once
+BULK_DOWNLOAD_WORKERS = int(os.environ.get("BULK_DOWNLOAD_WORKERS", "8"))
+# Worker processes used by parameter sweeps (src/optimizer.py)
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", str(os.cpu_count() or 4)))
+# Worker threads loading the cached series of a portfolio backtest (src/portfolio_backtester.py)
+PORTFOLIO_LOAD_WORKERS = int(os.environ.get("PORTFOLIO_LOAD_WORKERS", "8"))
+# Worker processes running queued API jobs (src/job_queue.py)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
 # Flask settings
 FLASK_DEBUG_MODE = os.environ.get("FLASK_DEBUG", "True").lower() == "true"
 
@@ -21,6 +32,27 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 # Results directory
 RESULTS_DIR = os.environ.get("RESULTS_DIR", "results")
 
+# SQLite file holding the API job queue; queued jobs are resumed from it on restart
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.db")
+
+# OHLCV cache (backend: "numpy" for the columnar binary format, "csv" for legacy files)
+OHLCV_CACHE_DIR = os.environ.get("OHLCV_CACHE_DIR", "ohlcv_cache")
+OHLCV_CACHE_BACKEND = os.environ.get("OHLCV_CACHE_BACKEND", "numpy").lower()
+# Number of appended tail segments after which a series is compacted in the background
+OHLCV_COMPACT_SEGMENTS = int(os.environ.get("OHLCV_COMPACT_SEGMENTS", "16"))
+# Finest interval downloaded from the exchange; coarser multiples are derived from it locally
+# (empty = download every interval separately)
+OHLCV_BASE_INTERVAL = os.environ.get("OHLCV_BASE_INTERVAL", "")
+# Memory budget of the process-wide in-memory OHLCV store (LRU eviction beyond it)
+OHLCV_MEMORY_BUDGET_MB = int(os.environ.get("OHLCV_MEMORY_BUDGET_MB", "512"))
+# Memory budget of the per-process indicator cache shared across backtest runs (0 disables it)
+INDICATOR_CACHE_MB = int(os.environ.get("INDICATOR_CACHE_MB", "256"))
+# On-disk cache of completed backtest results, reused for identical runs (0 MB disables it)
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "result_cache")
+RESULT_CACHE_MB = int(os.environ.get("RESULT_CACHE_MB", "512"))
+# Largest number of paths a Monte Carlo analysis of a stored backtest may request
+MONTE_CARLO_MAX_ITERATIONS = int(os.environ.get("MONTE_CARLO_MAX_ITERATIONS", "100000"))
+
 # ------------------------
 # Logging Configuration
 # ------------------------
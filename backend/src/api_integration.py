@@ -11,6 +11,7 @@ except ImportError:
     Spot = None
 
 from config import API_KEY, API_SECRET, USE_SDK, EXCHANGE_NAME, logger
+from src.exchange_pool import get_exchange_client
 
 class ExchangeAPI:
     """
@@ -42,16 +43,15 @@ class ExchangeAPI:
             self.client = Spot(api_key=self.api_key, api_secret=self.api_secret)
             logger.info("Using the official MEXC SDK for API integration.")
         else:
-            # Get the exchange class dynamically from ccxt
-            exchange_class = getattr(ccxt, self.exchange_name.lower())
-            self.client = exchange_class({
-                'apiKey': self.api_key,
-                'secret': self.api_secret,
-                'enableRateLimit': True,
-                'options': {
+            # Reuse the pooled ccxt client for these credentials
+            self.client = get_exchange_client(
+                self.exchange_name,
+                api_key=self.api_key,
+                api_secret=self.api_secret,
+                options={
                     'adjustForTimeDifference': True,
                 },
-            })
+            )
             logger.info(f"Using ccxt for {self.exchange_name} API integration")
 
     def create_order(
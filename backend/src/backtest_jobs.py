@@ -0,0 +1,197 @@
+# src/backtest_jobs.py
+"""
+The backtests behind the REST API, as functions of the request parameters.
+
+Each returns the JSON-serializable result the API responds with. The endpoints
+call them directly (synchronous requests) and the job queue runs them in its
+worker processes (see src.job_queue), passing a progress(fraction, message)
+callback.
+
+Backtests go through the result cache (src.result_cache) unless the request
+sets "use_cache": false; "refresh_cache": true re-simulates and replaces the
+stored result. A cache hit returns the simulation file saved by the identical
+earlier request instead of writing a new one.
+"""
+import os
+from typing import Any, Callable, Dict, Optional
+
+from src.grid_backtester import GridBacktester
+from src.portfolio_backtester import PortfolioBacktester
+from src.result_cache import get_result_cache, result_key
+from src.results_storage import save_simulation_result, get_simulation_result_by_timestamp
+
+Progress = Optional[Callable[..., None]]
+
+# Share of a job's progress spent fetching data; the simulation fills the rest
+FETCH_SHARE = 0.2
+
+
+def _report(progress: Progress, fraction: float, message: Optional[str] = None) -> None:
+    if progress:
+        progress(fraction, message)
+
+
+def _run_and_save(backtester: GridBacktester, params: Dict[str, Any], data: Dict[str, Any],
+                  progress: Progress) -> Dict[str, Any]:
+    _report(progress, 0.0, 'fetching data')
+    backtester.fetch_and_store_data()
+    _report(progress, FETCH_SHARE, 'simulating')
+    orders, final_value, trade_analysis, drawdown_analysis, sharpe_analysis = backtester.simulate()
+    _report(progress, 1.0, 'saving')
+
+    # An identical request already saved this result unless its file was deleted since
+    saved_key = result_key({'saved': backtester.cache_key, 'params': params,
+                            'name': data.get('name'), 'notes': data.get('notes')})
+    timestamp = get_result_cache().get(saved_key) if backtester.cache_hit else None
+    if timestamp is None or get_simulation_result_by_timestamp(timestamp) is None:
+        # Save the simulation result
+        filename = save_simulation_result(
+            params=params,
+            orders=orders,
+            final_value=final_value,
+            candle_data=backtester.get_stored_data(backtester.symbol),
+            name=data.get('name'),
+            notes=data.get('notes')
+        )
+
+        # Get the timestamp from the filename
+        timestamp = os.path.basename(filename).replace('simulation_', '').replace('.json', '')
+        if backtester.cache_key:
+            get_result_cache().put(saved_key, timestamp)
+
+    return {
+        'timestamp': timestamp,
+        'cached': backtester.cache_hit,
+        'final_value': final_value,
+        'orders': orders,
+        'trade_analysis': trade_analysis,
+        'drawdown_analysis': drawdown_analysis,
+        'sharpe_analysis': sharpe_analysis,
+        'profile': backtester.profile_summary,
+    }
+
+
+def _simulation_progress(progress: Progress) -> Optional[Callable[[float], None]]:
+    if not progress:
+        return None
+    return lambda fraction: progress(FETCH_SHARE + (1.0 - FETCH_SHARE) * fraction)
+
+
+def run_simulation(data: Dict[str, Any], progress: Progress = None) -> Dict[str, Any]:
+    """
+    Momentum backtest of /api/simulate.
+    """
+    symbol = data.get('symbol')
+    interval = data.get('interval')
+    initial_capital = float(data.get('initial_capital'))
+    risk_percent = float(data.get('risk_percent'))
+    box_params = {
+        'rsi_length': int(data.get('rsi_length', 14)),
+        'macd_fast': int(data.get('macd_fast', 12)),
+        'macd_slow': int(data.get('macd_slow', 26)),
+        'macd_signal': int(data.get('macd_signal', 9))
+    }
+
+    backtester = GridBacktester(
+        symbol=symbol,
+        interval=interval,
+        initial_capital=initial_capital,
+        risk_percent=risk_percent,
+        strategy_type='momentum',
+        box_params=box_params,
+        fast=bool(data.get('fast', False)),
+        profile=bool(data.get('profile', False)),
+        progress=_simulation_progress(progress),
+        cache_results=bool(data.get('use_cache', True)),
+        refresh_cache=bool(data.get('refresh_cache', False))
+    )
+    params = {
+        'symbol': symbol,
+        'interval': interval,
+        'initial_capital': initial_capital,
+        'risk_percent': risk_percent,
+        'strategy_type': 'momentum',
+        'box_params': box_params
+    }
+    return _run_and_save(backtester, params, data, progress)
+
+
+def run_ib_strategy(data: Dict[str, Any], progress: Progress = None) -> Dict[str, Any]:
+    """
+    Inside-bar price action backtest of /api/backtest/ib_strategy.
+    """
+    symbol = data.get('symbol', 'BTCUSDT')
+    interval = data.get('interval', '1h')  # IB strategy typically works better on higher timeframes
+    initial_capital = float(data.get('initial_capital', 10000))
+    risk_percent = float(data.get('risk_percent', 1.0))
+
+    # IB strategy specific parameters
+    ib_params = {
+        'minInsideBarSize': float(data.get('minInsideBarSize', 0.5)),
+        'useTrendFilter': bool(data.get('useTrendFilter', True)),
+        'useVolumeFilter': bool(data.get('useVolumeFilter', True)),
+        'volMultiplier': float(data.get('volMultiplier', 1.1)),
+        'useATRTP': bool(data.get('useATRTP', True)),
+        'atrLength': int(data.get('atrLength', 14)),
+        'atrMult': float(data.get('atrMult', 1.5)),
+        'rr_ratio': float(data.get('rr_ratio', 2.5))
+    }
+
+    backtester = GridBacktester(
+        symbol=symbol,
+        interval=interval,
+        initial_capital=initial_capital,
+        risk_percent=risk_percent,
+        strategy_type='ib_price_action',  # New strategy type
+        box_params=ib_params,  # Pass IB specific params
+        fast=bool(data.get('fast', False)),
+        profile=bool(data.get('profile', False)),
+        progress=_simulation_progress(progress),
+        cache_results=bool(data.get('use_cache', True)),
+        refresh_cache=bool(data.get('refresh_cache', False))
+    )
+    params = {
+        'symbol': symbol,
+        'interval': interval,
+        'initial_capital': initial_capital,
+        'risk_percent': risk_percent,
+        'strategy_type': 'ib_price_action',
+        'box_params': ib_params
+    }
+    return _run_and_save(backtester, params, data, progress)
+
+
+def run_portfolio_backtest(data: Dict[str, Any], progress: Progress = None) -> Dict[str, Any]:
+    """
+    Multi-symbol backtest of /api/portfolio_backtest.
+    """
+    backtester = PortfolioBacktester(
+        symbols=data.get('symbols') or [],
+        interval=data.get('interval', '1h'),
+        initial_capital=float(data.get('initial_capital', 10000)),
+        risk_percent=float(data.get('risk_percent', 1.0)),
+        box_params=data.get('box_params', {}),
+        strategy_type=data.get('strategy_type', 'momentum'),
+        htf_interval=data.get('htf_interval'),
+        max_position_pct=data.get('max_position_pct')
+    )
+    _report(progress, 0.0, 'loading data')
+    backtester.fetch_and_store_data(data.get('start_time'), data.get('end_time'))
+    _report(progress, FETCH_SHARE, 'simulating')
+    orders, final_value, trade_analysis, drawdown_analysis, sharpe_analysis = backtester.simulate()
+    return {
+        'final_value': final_value,
+        'orders': orders,
+        'trade_analysis': trade_analysis,
+        'drawdown_analysis': drawdown_analysis,
+        'sharpe_analysis': sharpe_analysis,
+        'symbols': backtester.symbol_results,
+    }
+
+
+# Job kinds accepted by the job queue (POST /api/jobs)
+JOB_HANDLERS = {
+    'simulate': run_simulation,
+    'ib_strategy': run_ib_strategy,
+    'portfolio_backtest': run_portfolio_backtest,
+}
@@ -0,0 +1,53 @@
+# src/data_handler/array_feed.py
+import backtrader as bt
+import numpy as np
+
+from .candle_arrays import CandleArrays
+
+# Backtrader stores datetimes as float days since 0001-01-01 (date2num); 1970-01-01 is day 719163
+EPOCH_DATENUM = 719163.0
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def epoch_ms_to_datenum(times: np.ndarray) -> np.ndarray:
+    """
+    Vectorized bt.date2num for naive UTC epoch-ms timestamps.
+    """
+    return EPOCH_DATENUM + np.asarray(times, dtype=np.int64) / MS_PER_DAY
+
+
+class CandleArrayData(bt.feed.DataBase):
+    """
+    Backtrader feed reading straight from CandleArrays, with no intermediate
+    DataFrame. The arrays are only indexed, never copied, so memory-mapped
+    candles stay mapped.
+
+    Usage: cerebro.adddata(CandleArrayData(candles=arrays))
+    """
+
+    params = (
+        ('candles', None),
+    )
+
+    def start(self):
+        super().start()
+        candles = self.p.candles
+        if not isinstance(candles, CandleArrays):
+            raise ValueError("CandleArrayData needs a CandleArrays instance as 'candles'")
+        self._datenums = epoch_ms_to_datenum(candles.time)
+        self._idx = 0
+
+    def _load(self):
+        idx = self._idx
+        if idx >= len(self._datenums):
+            return False
+        candles = self.p.candles
+        self.lines.datetime[0] = self._datenums[idx]
+        self.lines.open[0] = float(candles.open[idx])
+        self.lines.high[0] = float(candles.high[idx])
+        self.lines.low[0] = float(candles.low[idx])
+        self.lines.close[0] = float(candles.close[idx])
+        self.lines.volume[0] = float(candles.volume[idx])
+        self.lines.openinterest[0] = 0.0
+        self._idx = idx + 1
+        return True
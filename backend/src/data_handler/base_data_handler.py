@@ -1,67 +1,48 @@
 # /src/data_handler/base_data_handler.py
-import os
+import time
+import numpy as np
 import pandas as pd
-import ccxt
-from typing import Dict, Optional
-from config import logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from config import logger, OHLCV_CACHE_DIR, OHLCV_BASE_INTERVAL, EXCHANGE_NAME, BULK_DOWNLOAD_WORKERS
+from .ohlcv_cache import OHLCVCache, get_cache_backend
+from .memory_store import SharedOHLCVStore, get_shared_store, slice_window
+from .candle_arrays import CandleArrays
+from src.exchange_pool import get_exchange_client
+from .timeframes import (
+    timeframe_to_ms, split_time_range, stitch_candles, is_derivable, resample_ohlcv, bucket_starts
+)
 
 class BaseDataHandler:
     """
     Base class for fetching and storing OHLCV data in memory,
-    now with CSV caching support.
+    backed by a pluggable on-disk cache (see ohlcv_cache.py) and a
+    process-wide in-memory store shared by all handlers (see memory_store.py).
     """
 
-    CACHE_DIR = "ohlcv_cache"  # Folder where CSV files will be stored
+    CACHE_DIR = OHLCV_CACHE_DIR  # Folder where cached series will be stored
+    PAGE_LIMIT = 1000  # Candles requested per fetch_ohlcv call
 
-    def __init__(self):
+    def __init__(self, cache_backend: Optional[str] = None):
         self.data_store: Dict[str, pd.DataFrame] = {}
 
-        # Ensure the cache directory exists
-        if not os.path.exists(self.CACHE_DIR):
-            os.makedirs(self.CACHE_DIR)
-
-    def _get_csv_path(self, symbol: str, interval: str) -> str:
-        """
-        Generate a cache filename based on the symbol and interval.
-        Example: symbol='BTC/USDT', interval='1h' => 'ohlcv_cache/BTC-USDT_1h.csv'
-        """
-        symbol_sanitized = symbol.replace("/", "-")
-        return os.path.join(self.CACHE_DIR, f"{symbol_sanitized}_{interval}.csv")
-
-    def _load_from_csv(self, csv_path: str) -> pd.DataFrame:
-        """
-        Loads a CSV file into a DataFrame, if it exists.
-        Expects a CSV file with columns: 'time', 'open', 'high', 'low', 'close', 'volume'.
-        """
-        if not os.path.exists(csv_path):
-            return pd.DataFrame()
-        try:
-            # Read only the specified columns and parse 'time' as datetime
-            df = pd.read_csv(
-                csv_path,
-                usecols=['time', 'open', 'high', 'low', 'close', 'volume'],
-                parse_dates=['time']
-            )
-            # Ensure the 'time' column is datetime; if not, force conversion
-            if not pd.api.types.is_datetime64_any_dtype(df['time']):
-                df['time'] = pd.to_datetime(df['time'], errors='coerce')
-            df.sort_values('time', inplace=True)
-            df.reset_index(drop=True, inplace=True)
-            logger.info("Loaded %d rows from cache: %s", len(df), csv_path)
-            return df
-        except Exception as e:
-            logger.error("Error loading CSV at %s: %s", csv_path, e)
-            return pd.DataFrame()
-
-    def _save_to_csv(self, df: pd.DataFrame, csv_path: str):
-        """
-        Saves a DataFrame to CSV, overwriting existing file.
-        """
-        try:
-            df.to_csv(csv_path, index=False)
-            logger.info("Saved %d rows to CSV: %s", len(df), csv_path)
-        except Exception as e:
-            logger.error("Error saving CSV to %s: %s", csv_path, e)
+        # Ensure the cache directory exists and pick the storage backend
+        self.cache: OHLCVCache = get_cache_backend(cache_backend, self.CACHE_DIR)
+        self.memory_store: SharedOHLCVStore = get_shared_store()
+        self.exchange_name = EXCHANGE_NAME.lower()
+
+    def load_cached_data(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Read candles from the on-disk cache only, without touching the exchange.
+        """
+        return self.cache.load(symbol, interval, start_time, end_time, columns)
 
     def fetch_historical_data(
         self,
@@ -71,7 +52,13 @@ class BaseDataHandler:
         end_time: Optional[int] = None
     ) -> pd.DataFrame:
         """
-        Fetch historical OHLCV data from the configured exchange (via ccxt), with CSV caching and incremental updates.
+        Fetch historical OHLCV data from the configured exchange (via ccxt), with on-disk caching and incremental updates.
+
+        start_time/end_time (epoch ms) are applied when reading the cache, so only
+        the requested window is materialised regardless of how much history is cached.
+
+        If OHLCV_BASE_INTERVAL is set and `interval` is a multiple of it, the candles
+        are derived from the base interval instead of being downloaded separately.
 
         Note: Some exchanges have limitations on historical data availability. For 1h interval,
         the maximum available data is typically 500-1000 candles depending on the exchange.
@@ -80,26 +67,303 @@ class BaseDataHandler:
         logger.debug(f"Starting historical data fetch for {symbol} {interval}")
         logger.debug(f"Start time: {start_time}, End time: {end_time}")
 
+        self._sync_series(symbol, interval, start_time, end_time)
+        return self._read_series(symbol, interval, start_time, end_time)
 
-        csv_path = self._get_csv_path(symbol, interval)
-        cached_df = self._load_from_csv(csv_path)
+    def fetch_candle_arrays(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> CandleArrays:
+        """
+        Same as fetch_historical_data, but return compact CandleArrays (int64 epoch-ms
+        times, float32 OHLCV) read straight from the cache without a DataFrame.
+        """
+        self._sync_series(symbol, interval, start_time, end_time)
+        in_memory = self.memory_store.get((self.exchange_name, symbol, interval), start_time, end_time,
+                                          version=self.cache.series_version(symbol, interval))
+        if in_memory is not None:
+            return CandleArrays.from_frame(in_memory)
+        return CandleArrays.from_columns(
+            self.cache.load_arrays(symbol, interval, start_time, end_time, dtype=CandleArrays.DTYPE)
+        )
+
+    def fetch_mapped_candles(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> CandleArrays:
+        """
+        Same as fetch_candle_arrays, but the arrays are read-only memory maps of the
+        cache files (float64), shared by every process that maps the same series.
+        """
+        self._sync_series(symbol, interval, start_time, end_time)
+        return CandleArrays.from_columns(self.cache.map_arrays(symbol, interval, start_time, end_time), dtype=None)
 
-        # If we have cached data, determine our start_time from the last candle + 1 interval
-        if not cached_df.empty:
-            cached_df.sort_values('time', inplace=True)
-            latest_time_in_cache = cached_df['time'].iloc[-1]
-            # Convert that timestamp to ms (pd.Timestamp.value gives nanoseconds)
-            last_ts_ms = int(latest_time_in_cache.value // 10**6)
-            if start_time is None:
-                # If user didn't pass a specific start_time, fetch from the last known timestamp
-                start_time = last_ts_ms
+    def _sync_series(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> None:
+        """
+        Bring the cached series up to date, deriving it from OHLCV_BASE_INTERVAL when configured.
+        """
+        if OHLCV_BASE_INTERVAL and is_derivable(OHLCV_BASE_INTERVAL, interval):
+            self.update_cache(symbol, OHLCV_BASE_INTERVAL, start_time, end_time)
+            self._refresh_derived(symbol, interval, OHLCV_BASE_INTERVAL)
         else:
+            self.update_cache(symbol, interval, start_time, end_time)
+
+    def fetch_resampled_data(
+        self,
+        symbol: str,
+        interval: str,
+        base_interval: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Build `interval` candles (e.g. 5m/15m/1h/4h/1d) from a finer base interval.
+
+        Only the base interval is downloaded from the exchange. The derived series is
+        cached like any other interval and extended incrementally as the base grows.
+        When no base_interval is given, the finest cached interval that divides
+        `interval` is used; without one this falls back to a direct download.
+        """
+        base_interval = base_interval or self.find_base_interval(symbol, interval)
+        if base_interval is None:
+            self.update_cache(symbol, interval, start_time, end_time)
+            return self._read_series(symbol, interval, start_time, end_time)
+
+        self.update_cache(symbol, base_interval, start_time, end_time)
+        self._refresh_derived(symbol, interval, base_interval)
+        return self._read_series(symbol, interval, start_time, end_time)
+
+    def find_base_interval(self, symbol: str, interval: str) -> Optional[str]:
+        """
+        Finest configured or cached interval from which `interval` can be derived.
+        """
+        candidates = set(self.cache.cached_intervals(symbol))
+        if OHLCV_BASE_INTERVAL:
+            candidates.add(OHLCV_BASE_INTERVAL)
+        derivable = [c for c in candidates if is_derivable(c, interval)]
+        return min(derivable, key=timeframe_to_ms) if derivable else None
+
+    def _refresh_derived(self, symbol: str, interval: str, base_interval: str) -> int:
+        """
+        Append newly completed `interval` candles built from the cached base series.
+        """
+        last_derived = self.cache.last_timestamp(symbol, interval)
+        since = last_derived + timeframe_to_ms(interval) if last_derived is not None else None
+        base = self._read_series(symbol, base_interval, since)
+        derived = resample_ohlcv(base, base_interval, interval)
+        if derived.empty:
+            return 0
+
+        appended = self.cache.append(symbol, interval, derived)
+        if appended:
+            logger.info("Derived %d %s candles for %s from %s", appended, interval, symbol, base_interval)
+            self.memory_store.invalidate((self.exchange_name, symbol, interval))
+            if self.cache.derived_from(symbol, interval) != base_interval:
+                self.cache.mark_derived(symbol, interval, base_interval)
+        return appended
+
+    def _rebuild_derived(self, symbol: str, base_interval: str, start_time: int, end_time: int) -> None:
+        """
+        Re-aggregate the candles of every series derived from `base_interval` whose
+        buckets overlap the changed base window [start_time, end_time] (epoch ms).
+
+        _refresh_derived() only appends after the newest derived candle, so candles
+        inserted into the base (gap repairs, backfills) would otherwise never reach
+        the derived series.
+        """
+        for interval in self.cache.cached_intervals(symbol):
+            if self.cache.derived_from(symbol, interval) != base_interval:
+                continue
+            interval_ms = timeframe_to_ms(interval)
+            first = int(bucket_starts(np.array([start_time]), interval)[0])
+            last = int(bucket_starts(np.array([end_time]), interval)[0]) + interval_ms - 1
+
+            rebuilt = resample_ohlcv(self.cache.load(symbol, base_interval, first, last), base_interval, interval)
+            cached = self.cache.load(symbol, interval)
+            outside = ((cached['time'] < pd.to_datetime(first, unit='ms')) |
+                       (cached['time'] > pd.to_datetime(last, unit='ms')))
+            merged = pd.concat([cached[outside], rebuilt], ignore_index=True).sort_values('time').reset_index(drop=True)
+            self.cache.save(symbol, interval, merged)
+            self.memory_store.invalidate((self.exchange_name, symbol, interval))
+            logger.info("Rebuilt %d %s candles for %s after %s candles changed",
+                        len(rebuilt), interval, symbol, base_interval)
+            # Series derived from this one in turn
+            self._rebuild_derived(symbol, interval, first, last)
+
+    def _read_series(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Read a cached window, going through the shared in-memory store first.
+        """
+        key = (self.exchange_name, symbol, interval)
+        # Another process may have rewritten the on-disk series since it was put in memory
+        version = self.cache.series_version(symbol, interval)
+        merged = self.memory_store.get(key, start_time, end_time, version=version)
+        if merged is None:
+            # Keep the full series in memory so repeat requests skip the disk
+            full = self.cache.load(symbol, interval)
+            if full.empty:
+                merged = full
+            else:
+                self.memory_store.put(key, full, version)
+                merged = slice_window(full, start_time, end_time)
+        if not merged.empty:
+            logger.debug(f"Total rows after merge: {len(merged)}")
+            logger.debug(f"Time range: {merged['time'].min()} to {merged['time'].max()}")
+        return merged
+
+    def update_cache(
+        self,
+        symbol: str,
+        interval: str = '1h',
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> int:
+        """
+        Download candles newer than the cached series and append them to the on-disk cache.
+
+        Only the new bars are written, so topping up a long history costs O(new bars).
+        Returns the number of candles appended.
+        """
+        key = (self.exchange_name, symbol, interval)
+
+        # If we have cached data, continue from the last cached candle
+        last_ts_ms = self.memory_store.last_timestamp(key)
+        if last_ts_ms is None:
+            last_ts_ms = self.cache.last_timestamp(symbol, interval)
+        if last_ts_ms is None:
             last_ts_ms = start_time or None
 
-        from config import EXCHANGE_NAME
-        exchange_class = getattr(ccxt, EXCHANGE_NAME.lower())
-        exchange = exchange_class({'enableRateLimit': True})
-        all_dfs = [cached_df]
+        fresh_dfs = self._fetch_range(self._create_exchange(), symbol, interval, last_ts_ms, end_time)
+        if not fresh_dfs:
+            return 0
+
+        fresh = pd.concat(fresh_dfs, ignore_index=True).drop_duplicates(subset=['time']).sort_values('time')
+        appended = self.cache.append(symbol, interval, fresh)
+        if appended:
+            # The on-disk series was extended, drop the stale in-memory copy
+            self.memory_store.invalidate(key)
+        return appended
+
+    def backfill_historical_data(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        max_workers: int = BULK_DOWNLOAD_WORKERS,
+        window_bars: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Download a long history for one symbol by splitting [start_time, end_time]
+        (epoch ms) into independent time windows fetched concurrently.
+
+        All windows share the exchange rate limiter, so the sync is bounded by the
+        rate limit rather than by round-trip latency. The windows are stitched with
+        overlap/gap verification and merged into the on-disk cache.
+        Returns the backfilled candles.
+        """
+        interval_ms = timeframe_to_ms(interval)
+        if end_time is None:
+            end_time = int(time.time() * 1000)
+        window_ms = (window_bars or self.PAGE_LIMIT) * interval_ms
+        windows = split_time_range(start_time, end_time, window_ms, align_ms=interval_ms)
+        logger.info("Backfilling %s %s in %d windows", symbol, interval, len(windows))
+
+        def fetch_window(window):
+            window_start, window_end = window
+            return self._fetch_range(self._create_exchange(), symbol, interval, window_start - 1, window_end)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as pool:
+            pages = [page for window_pages in pool.map(fetch_window, windows) for page in window_pages]
+
+        backfilled, report = stitch_candles(pages, interval_ms)
+        logger.info("Backfilled %d candles for %s %s (%d overlaps removed, %d gaps)",
+                    report["rows"], symbol, interval, report["overlaps"], len(report["gaps"]))
+        if backfilled.empty:
+            return backfilled
+
+        cached = self.cache.load(symbol, interval)
+        merged = backfilled if cached.empty else stitch_candles([cached, backfilled], interval_ms)[0]
+        self.cache.save(symbol, interval, merged)
+        self.memory_store.invalidate((self.exchange_name, symbol, interval))
+        times = backfilled['time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        self._rebuild_derived(symbol, interval, int(times[0]), int(times[-1]))
+        return backfilled
+
+    def get_gaps(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """
+        Missing candles in the cached series as inclusive (first_missing, last_missing)
+        epoch-ms ranges, read from the cache's gap index.
+        """
+        return self.cache.gaps(symbol, interval)
+
+    def repair_gaps(
+        self,
+        symbol: str,
+        interval: str,
+        max_workers: int = BULK_DOWNLOAD_WORKERS
+    ) -> Dict[str, Any]:
+        """
+        Re-fetch only the missing windows of a cached series and merge them in.
+
+        Gaps the exchange has no candles for (e.g. maintenance windows) stay in
+        the index and are reported as remaining.
+        """
+        gaps = self.get_gaps(symbol, interval)
+        if not gaps:
+            return {"gaps": 0, "filled": 0, "remaining": []}
+        logger.info("Repairing %d gaps in %s %s", len(gaps), symbol, interval)
+
+        def fetch_gap(gap):
+            first_missing, last_missing = gap
+            return self._fetch_range(self._create_exchange(), symbol, interval, first_missing - 1, last_missing)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(gaps)))) as pool:
+            pages = [page for gap_pages in pool.map(fetch_gap, gaps) for page in gap_pages]
+
+        filled = self.cache.merge(symbol, interval, pd.concat(pages, ignore_index=True)) if pages else 0
+        if filled:
+            self.memory_store.invalidate((self.exchange_name, symbol, interval))
+            self._rebuild_derived(symbol, interval, min(gap[0] for gap in gaps), max(gap[1] for gap in gaps))
+        remaining = self.get_gaps(symbol, interval)
+        logger.info("Filled %d candles in %s %s, %d gaps remaining", filled, symbol, interval, len(remaining))
+        return {"gaps": len(gaps), "filled": filled, "remaining": remaining}
+
+    def _create_exchange(self):
+        # Pooled client: shared HTTP session, loaded markets and rate-limit budget
+        return get_exchange_client(self.exchange_name)
+
+    def _fetch_range(
+        self,
+        exchange,
+        symbol: str,
+        interval: str,
+        last_ts_ms: Optional[int],
+        end_time: Optional[int]
+    ) -> List[pd.DataFrame]:
+        """
+        Page through fetch_ohlcv from just after last_ts_ms up to end_time (both epoch ms).
+        Returns the fetched pages as DataFrames with a datetime 'time' column.
+        """
+        fresh_dfs = []
 
         # Keep fetching until we’ve gotten up to 'end_time' or no more new data.
         while True:
@@ -111,8 +375,8 @@ class BaseDataHandler:
                 break
 
             try:
-                logger.debug(f"Fetching data since {since} with limit 1000")
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe=interval, since=since, limit=1000)
+                logger.debug(f"Fetching data since {since} with limit {self.PAGE_LIMIT}")
+                ohlcv = exchange.fetch_ohlcv(symbol, timeframe=interval, since=since, limit=self.PAGE_LIMIT)
                 logger.debug(f"Received {len(ohlcv)} rows from exchange")
             except Exception as e:
                 logger.error("Error fetching CCXT data: %s", e)
@@ -122,7 +386,7 @@ class BaseDataHandler:
 
             if not ohlcv:
                 logger.info("No additional candles returned from exchange.")
-                if len(all_dfs) == 1 and len(all_dfs[0]) == 500:
+                if len(fresh_dfs) == 1 and len(fresh_dfs[0]) == 500:
                     logger.warning("Reached maximum historical data limit (500 candles) for %s %s",
                                   symbol, interval)
                 break
@@ -144,19 +408,10 @@ class BaseDataHandler:
 
             logger.info("Fetched %d new candles starting at %s.", len(fresh_df), fresh_df['time'].iloc[0])
 
-            all_dfs.append(fresh_df)
+            fresh_dfs.append(fresh_df)
             last_ts_ms = int(fresh_df['time'].iloc[-1].value // 10**6)
 
-        merged = pd.concat(all_dfs, ignore_index=True).drop_duplicates(subset=['time']).sort_values('time')
-        merged.reset_index(drop=True, inplace=True)
-        logger.debug(f"Total rows after merge: {len(merged)}")
-        logger.debug(f"Time range: {merged['time'].min()} to {merged['time'].max()}")
-
-
-        if not merged.empty:
-            self._save_to_csv(merged, csv_path)
-
-        return merged
+        return fresh_dfs
 
     def store_data(self, symbol: str, data: pd.DataFrame) -> None:
         """
@@ -174,7 +429,7 @@ class BaseDataHandler:
     def clear_data(self) -> None:
         """
         Clear all in-memory stored data.
-        Does not delete cached CSV files on disk.
+        Does not delete cached series on disk.
         """
         self.data_store.clear()
         logger.info("Data store cleared.")
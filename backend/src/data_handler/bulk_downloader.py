@@ -0,0 +1,80 @@
+# src/data_handler/bulk_downloader.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+import pandas as pd
+
+from config import logger, BULK_DOWNLOAD_WORKERS
+from .base_data_handler import BaseDataHandler
+
+SeriesId = Tuple[str, str]  # (symbol, interval)
+ProgressCallback = Callable[[int, int, str, str, Optional[Exception]], None]
+
+
+class BulkDownloader:
+    """
+    Download many (symbol, interval) series concurrently.
+
+    Each series goes through BaseDataHandler.fetch_historical_data, so it is
+    topped up from the cache, written to disk as soon as it completes and
+    throttled by the exchange-wide rate limiter shared by all workers.
+    """
+
+    def __init__(
+        self,
+        data_handler: Optional[BaseDataHandler] = None,
+        max_workers: int = BULK_DOWNLOAD_WORKERS,
+        progress_callback: Optional[ProgressCallback] = None
+    ):
+        self.data_handler = data_handler or BaseDataHandler()
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+
+    def iter_download(
+        self,
+        series: Sequence[SeriesId],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+        """
+        Yield (symbol, interval, DataFrame) for each series in completion order.
+        Failed series are logged and yielded as empty frames.
+        """
+        series = list(dict.fromkeys(series))
+        total = len(series)
+        if not total:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total)) as pool:
+            futures = {
+                pool.submit(self.data_handler.fetch_historical_data, symbol, interval, start_time, end_time):
+                    (symbol, interval)
+                for symbol, interval in series
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                symbol, interval = futures[future]
+                error = None
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error("Download failed for %s %s: %s", symbol, interval, e)
+                    error = e
+                    df = pd.DataFrame()
+
+                logger.info("Downloaded %s %s (%d rows) [%d/%d]", symbol, interval, len(df), completed, total)
+                if self.progress_callback:
+                    self.progress_callback(completed, total, symbol, interval, error)
+                yield symbol, interval, df
+
+    def download(
+        self,
+        series: Sequence[SeriesId],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> Dict[SeriesId, pd.DataFrame]:
+        """
+        Download all series and return them keyed by (symbol, interval).
+        """
+        return {
+            (symbol, interval): df
+            for symbol, interval, df in self.iter_download(series, start_time, end_time)
+        }
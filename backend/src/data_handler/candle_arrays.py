@@ -0,0 +1,133 @@
+# src/data_handler/candle_arrays.py
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from config import logger
+from .ohlcv_cache import VALUE_COLUMNS, to_epoch_ms, from_epoch_ms
+
+
+class CandleArrays:
+    """
+    Compact columnar OHLCV series: one contiguous int64 array of epoch-ms open
+    times and one float32 array per price/volume column.
+
+    At 28 bytes per candle this is a bit over half the footprint of a float64
+    DataFrame, and it can be fed to Backtrader (see array_feed.CandleArrayData)
+    without building an intermediate DataFrame. Arrays saved with save() can be
+    memory-mapped back with load(), so the OS pages them in on demand.
+
+    Pass dtype=None to keep floating columns in the dtype they come in, e.g. to
+    wrap float64 cache files mapped with NumpyCache.map_arrays() without a copy.
+    """
+
+    DTYPE = np.float32
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        dtype=DTYPE
+    ):
+        # np.asanyarray keeps memory-mapped arrays mapped when the dtype already matches
+        self.time = np.asanyarray(time, dtype=np.int64)
+        self.open = np.asanyarray(open, dtype=dtype)
+        self.high = np.asanyarray(high, dtype=dtype)
+        self.low = np.asanyarray(low, dtype=dtype)
+        self.close = np.asanyarray(close, dtype=dtype)
+        self.volume = np.asanyarray(volume, dtype=dtype)
+        lengths = {len(self.time)} | {len(getattr(self, col)) for col in VALUE_COLUMNS}
+        if len(lengths) != 1:
+            raise ValueError(f"Candle columns have different lengths: {sorted(lengths)}")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype=DTYPE) -> "CandleArrays":
+        """
+        Convert an OHLCV DataFrame with a 'time' column (datetime or epoch ms).
+        dtype=None keeps the columns' own dtype (float64 frames are not rounded).
+        """
+        if df.empty:
+            return cls.empty_series()
+        return cls(to_epoch_ms(df['time']), *(df[col].to_numpy(dtype=dtype) for col in VALUE_COLUMNS), dtype=dtype)
+
+    @classmethod
+    def from_columns(cls, arrays: Dict[str, np.ndarray], dtype=DTYPE) -> "CandleArrays":
+        """
+        Build from a dict of column arrays as returned by OHLCVCache.load_arrays().
+        """
+        return cls(arrays['time'], *(arrays[col] for col in VALUE_COLUMNS), dtype=dtype)
+
+    @classmethod
+    def empty_series(cls) -> "CandleArrays":
+        return cls(np.empty(0, dtype=np.int64), *(np.empty(0, dtype=cls.DTYPE) for _ in VALUE_COLUMNS))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CandleArrays":
+        """
+        Load arrays written by save(). With mmap=True the files are mapped
+        read-only instead of being read into memory.
+        """
+        mode = 'r' if mmap else None
+        arrays = {
+            col: np.load(os.path.join(directory, f"{col}.npy"), mmap_mode=mode)
+            for col in ['time'] + VALUE_COLUMNS
+        }
+        return cls.from_columns(arrays, dtype=None)
+
+    def save(self, directory: str) -> None:
+        """
+        Write one .npy file per column into `directory`.
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        for col in ['time'] + VALUE_COLUMNS:
+            np.save(os.path.join(directory, f"{col}.npy"), np.ascontiguousarray(getattr(self, col)))
+        logger.info("Saved %d candles to %s", len(self), directory)
+
+    def window(self, start_time: Optional[int] = None, end_time: Optional[int] = None) -> "CandleArrays":
+        """
+        Candles within [start_time, end_time] (epoch ms), as views on these arrays.
+        """
+        lo = int(np.searchsorted(self.time, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(self.time, end_time, side='right')) if end_time is not None else len(self)
+        return CandleArrays(self.time[lo:hi], *(getattr(self, col)[lo:hi] for col in VALUE_COLUMNS), dtype=None)
+
+    def rows(self, start: int, stop: int) -> "CandleArrays":
+        """
+        Candles start..stop-1 by position, as views on these arrays.
+        """
+        return CandleArrays(self.time[start:stop], *(getattr(self, col)[start:stop] for col in VALUE_COLUMNS), dtype=None)
+
+    def shift_time(self, offset_ms: int) -> "CandleArrays":
+        """
+        Same candles with every time moved by offset_ms; the value arrays are shared.
+        """
+        return CandleArrays(self.time + offset_ms, *(getattr(self, col) for col in VALUE_COLUMNS), dtype=None)
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {'time': from_epoch_ms(self.time)}
+        for col in VALUE_COLUMNS:
+            data[col] = getattr(self, col)
+        return pd.DataFrame(data)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.time) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + sum(getattr(self, col).nbytes for col in VALUE_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __repr__(self) -> str:
+        if self.empty:
+            return "CandleArrays(0 candles)"
+        return (f"CandleArrays({len(self)} candles, {from_epoch_ms(self.time[:1])[0]} to "
+                f"{from_epoch_ms(self.time[-1:])[0]}, {self.nbytes} bytes)")
@@ -0,0 +1,143 @@
+# src/data_handler/memory_store.py
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from config import logger, OHLCV_MEMORY_BUDGET_MB
+
+SeriesKey = Tuple[str, str, str]  # (exchange, symbol, interval)
+
+
+def slice_window(df: pd.DataFrame, start_time: Optional[int] = None, end_time: Optional[int] = None) -> pd.DataFrame:
+    """
+    Copy of the rows of a time-sorted series within [start_time, end_time] (epoch ms).
+    """
+    times = df['time'].to_numpy()
+    lo = np.searchsorted(times, np.datetime64(int(start_time), 'ms'), side='left') if start_time is not None else 0
+    hi = np.searchsorted(times, np.datetime64(int(end_time), 'ms'), side='right') if end_time is not None else len(df)
+    return df.iloc[lo:hi].reset_index(drop=True).copy()
+
+
+class SharedOHLCVStore:
+    """
+    Process-wide, thread-safe in-memory cache of full OHLCV series.
+
+    Series are keyed by (exchange, symbol, interval) and evicted least recently
+    used first once their combined size exceeds the memory budget. Callers get
+    copies of the requested window, so the stored frames are never mutated.
+
+    The store only lives in this process, while other processes (job workers,
+    bulk downloads) write the on-disk cache too. Each series is therefore stored
+    with the cache's version of it (OHLCVCache.series_version()), and reads that
+    pass the current version treat a copy taken from another version as a miss.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._series: "OrderedDict[Hashable, pd.DataFrame]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._versions: Dict[Hashable, Hashable] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(
+        self,
+        key: SeriesKey,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        version: Optional[Hashable] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Return a copy of the cached series limited to [start_time, end_time] (epoch ms),
+        or None if the series is not in memory or was stored from another `version`
+        of the on-disk series (the stale copy is dropped).
+        """
+        with self._lock:
+            df = self._series.get(key)
+            if df is not None and version is not None and self._versions.get(key) != version:
+                logger.debug("In-memory copy of %s is stale, dropping it", key)
+                self._drop(key)
+                df = None
+            if df is None:
+                self.misses += 1
+                return None
+            self._series.move_to_end(key)
+            self.hits += 1
+        return slice_window(df, start_time, end_time)
+
+    def last_timestamp(self, key: SeriesKey) -> Optional[int]:
+        """
+        Epoch-ms time of the newest candle held in memory for the series, if any.
+        """
+        with self._lock:
+            df = self._series.get(key)
+        if df is None or df.empty:
+            return None
+        return int(df['time'].iloc[-1].value // 10**6)
+
+    def put(self, key: SeriesKey, df: pd.DataFrame, version: Optional[Hashable] = None) -> bool:
+        """
+        Store a full series, read from `version` of the on-disk series.
+        Returns False if it alone exceeds the memory budget.
+        """
+        size = int(df.memory_usage(index=True, deep=False).sum())
+        if size > self.max_bytes:
+            logger.debug("Series %s (%d bytes) exceeds the in-memory budget, not cached", key, size)
+            return False
+
+        df = df.copy()
+        with self._lock:
+            self._drop(key)
+            self._series[key] = df
+            self._sizes[key] = size
+            self._versions[key] = version
+            while self.used_bytes > self.max_bytes:
+                evicted = next(iter(self._series))
+                self._drop(evicted)
+                logger.debug("Evicted %s from the in-memory OHLCV store", evicted)
+        return True
+
+    def invalidate(self, key: SeriesKey) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def _drop(self, key: SeriesKey) -> None:
+        # Callers hold the lock
+        self._series.pop(key, None)
+        self._sizes.pop(key, None)
+        self._versions.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._sizes.clear()
+            self._versions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_shared_store = SharedOHLCVStore(OHLCV_MEMORY_BUDGET_MB * 1024 * 1024)
+
+
+def get_shared_store() -> SharedOHLCVStore:
+    """
+    The store shared by every BaseDataHandler in this process.
+    """
+    return _shared_store
@@ -0,0 +1,755 @@
+# src/data_handler/ohlcv_cache.py
+import os
+import json
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from config import logger, OHLCV_CACHE_DIR, OHLCV_CACHE_BACKEND, OHLCV_COMPACT_SEGMENTS
+from .timeframes import find_gaps, timeframe_to_ms
+
+OHLCV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def to_epoch_ms(times: pd.Series) -> np.ndarray:
+    """
+    Convert a datetime-like Series into an int64 array of epoch milliseconds.
+    """
+    if pd.api.types.is_integer_dtype(times):
+        return times.to_numpy(dtype=np.int64)
+    converted = pd.to_datetime(times, errors='coerce')
+    if getattr(converted.dt, 'tz', None) is not None:
+        converted = converted.dt.tz_convert(None)
+    return converted.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+
+def from_epoch_ms(times: np.ndarray) -> pd.Series:
+    """
+    Convert an int64 array of epoch milliseconds into a datetime64[ns] Series.
+    """
+    return pd.Series(pd.to_datetime(np.asarray(times, dtype=np.int64), unit='ms'), name='time')
+
+
+class OHLCVCache:
+    """
+    Base class for on-disk OHLCV cache backends.
+
+    Every backend stores one series per (symbol, interval) pair and hands back
+    DataFrames with the columns 'time', 'open', 'high', 'low', 'close', 'volume',
+    where 'time' is a naive UTC datetime column sorted ascending.
+    Time bounds are given as epoch milliseconds, matching ccxt.
+    """
+
+    name = "base"
+
+    def __init__(self, cache_dir: str = OHLCV_CACHE_DIR):
+        self.cache_dir = cache_dir
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def series_key(self, symbol: str, interval: str) -> str:
+        """
+        Example: symbol='BTC/USDT', interval='1h' => 'BTC-USDT_1h'
+        """
+        symbol_sanitized = symbol.replace("/", "-")
+        return f"{symbol_sanitized}_{interval}"
+
+    def exists(self, symbol: str, interval: str) -> bool:
+        raise NotImplementedError
+
+    def cached_intervals(self, symbol: str) -> List[str]:
+        """
+        Intervals for which a series of the symbol is cached.
+        """
+        raise NotImplementedError
+
+    def load(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def load_arrays(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        dtype=np.float64
+    ) -> Dict[str, np.ndarray]:
+        """
+        Like load(), but return raw column arrays: 'time' as int64 epoch ms and the
+        value columns as `dtype`.
+        """
+        df = self.load(symbol, interval, start_time, end_time, columns)
+        value_columns = self._select_columns(columns)
+        if df.empty:
+            return self._empty_arrays(value_columns, dtype)
+        arrays = {'time': to_epoch_ms(df['time'])}
+        for col in value_columns:
+            arrays[col] = df[col].to_numpy(dtype=dtype)
+        return arrays
+
+    def map_arrays(
+        self,
+        symbol: str,
+        interval: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Column arrays backed directly by the cache files, if the backend can map them.
+        The default implementation has no files to map and returns loaded copies.
+        """
+        return self.load_arrays(symbol, interval, start_time, end_time)
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Add candles newer than the cached series. Returns the number of rows written.
+
+        The default implementation rewrites the whole series; columnar backends
+        override it with a cheaper append.
+        """
+        cached = self.load(symbol, interval)
+        if not cached.empty:
+            df = df[df['time'] > cached['time'].iloc[-1]]
+        if df.empty:
+            return 0
+        merged = pd.concat([cached, df], ignore_index=True) if not cached.empty else df
+        self.save(symbol, interval, merged.sort_values('time').reset_index(drop=True))
+        return len(df)
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        """
+        Epoch-ms time of the newest cached candle, or None if nothing is cached.
+        """
+        df = self.load(symbol, interval, columns=[])
+        if df.empty:
+            return None
+        return int(to_epoch_ms(df['time'])[-1])
+
+    def merge(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Insert candles anywhere in the cached series (e.g. to fill gaps), keeping
+        already cached candles on duplicate timestamps. Rewrites the series.
+        Returns the number of new rows.
+        """
+        cached = self.load(symbol, interval)
+        if cached.empty:
+            self.save(symbol, interval, df)
+            return len(df)
+        merged = (
+            pd.concat([cached, df[OHLCV_COLUMNS]], ignore_index=True)
+            .drop_duplicates(subset='time', keep='first')
+            .sort_values('time')
+            .reset_index(drop=True)
+        )
+        added = len(merged) - len(cached)
+        if added:
+            self.save(symbol, interval, merged)
+        return added
+
+    def gaps(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """
+        Missing candles inside the cached series as inclusive (first_missing,
+        last_missing) epoch-ms ranges.
+        """
+        interval_ms = self.gap_interval_ms(interval)
+        if interval_ms is None:
+            return []
+        df = self.load(symbol, interval, columns=[])
+        if df.empty:
+            return []
+        return find_gaps(to_epoch_ms(df['time']), interval_ms)
+
+    def series_version(self, symbol: str, interval: str) -> Optional[Hashable]:
+        """
+        Token that changes whenever the cached series is written, so copies held
+        elsewhere (the in-memory store) can tell they are stale. The default is
+        the newest candle's time; backends override it with something cheaper.
+        """
+        return self.last_timestamp(symbol, interval)
+
+    def derived_from(self, symbol: str, interval: str) -> Optional[str]:
+        """
+        Base interval the series was aggregated from, or None if it was downloaded.
+        """
+        path = os.path.join(self.cache_dir, f"{self.series_key(symbol, interval)}.derived")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return f.read().strip() or None
+
+    def mark_derived(self, symbol: str, interval: str, base_interval: str) -> None:
+        """
+        Record that the series is aggregated from `base_interval` candles, so it
+        can be rebuilt when the base series changes.
+        """
+        with open(os.path.join(self.cache_dir, f"{self.series_key(symbol, interval)}.derived"), 'w') as f:
+            f.write(base_interval)
+
+    @staticmethod
+    def gap_interval_ms(interval: str) -> Optional[int]:
+        """
+        Expected spacing of the candles, or None if it is not fixed (monthly candles).
+        """
+        if interval.endswith('M'):
+            return None
+        return timeframe_to_ms(interval)
+
+    @staticmethod
+    def _empty_arrays(value_columns: Sequence[str], dtype) -> Dict[str, np.ndarray]:
+        arrays = {'time': np.empty(0, dtype=np.int64)}
+        for col in value_columns:
+            arrays[col] = np.empty(0, dtype=dtype)
+        return arrays
+
+    @staticmethod
+    def _select_columns(columns: Optional[Sequence[str]]) -> List[str]:
+        if columns is None:
+            return list(VALUE_COLUMNS)
+        unknown = [c for c in columns if c not in OHLCV_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown OHLCV columns requested: {unknown}")
+        return [c for c in VALUE_COLUMNS if c in columns]
+
+
+class CSVCache(OHLCVCache):
+    """
+    Legacy backend: one CSV file per series (ohlcv_cache/<SYMBOL>_<interval>.csv).
+    Every load parses the full file, so it is mostly kept for migration.
+    """
+
+    name = "csv"
+
+    def path_for(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.series_key(symbol, interval)}.csv")
+
+    def exists(self, symbol: str, interval: str) -> bool:
+        return os.path.exists(self.path_for(symbol, interval))
+
+    def cached_intervals(self, symbol: str) -> List[str]:
+        prefix = self.series_key(symbol, "")
+        return [
+            name[len(prefix):-len(".csv")] for name in os.listdir(self.cache_dir)
+            if name.startswith(prefix) and name.endswith(".csv")
+        ]
+
+    def load(self, symbol, interval, start_time=None, end_time=None, columns=None) -> pd.DataFrame:
+        return self.load_file(self.path_for(symbol, interval), start_time, end_time, columns)
+
+    def series_version(self, symbol: str, interval: str) -> Optional[Hashable]:
+        try:
+            stat = os.stat(self.path_for(symbol, interval))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_file(self, csv_path, start_time=None, end_time=None, columns=None) -> pd.DataFrame:
+        """
+        Loads a CSV file into a DataFrame, if it exists.
+        Expects a CSV file with columns: 'time', 'open', 'high', 'low', 'close', 'volume'.
+        """
+        if not os.path.exists(csv_path):
+            return pd.DataFrame()
+        try:
+            df = pd.read_csv(
+                csv_path,
+                usecols=['time'] + self._select_columns(columns),
+                parse_dates=['time']
+            )
+            # Ensure the 'time' column is datetime; if not, force conversion
+            if not pd.api.types.is_datetime64_any_dtype(df['time']):
+                df['time'] = pd.to_datetime(df['time'], errors='coerce')
+            df.sort_values('time', inplace=True)
+            if start_time is not None:
+                df = df[df['time'] >= pd.to_datetime(start_time, unit='ms')]
+            if end_time is not None:
+                df = df[df['time'] <= pd.to_datetime(end_time, unit='ms')]
+            df.reset_index(drop=True, inplace=True)
+            logger.info("Loaded %d rows from cache: %s", len(df), csv_path)
+            return df
+        except Exception as e:
+            logger.error("Error loading CSV at %s: %s", csv_path, e)
+            return pd.DataFrame()
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        """
+        Saves a DataFrame to CSV, overwriting existing file.
+        """
+        csv_path = self.path_for(symbol, interval)
+        try:
+            df[OHLCV_COLUMNS].to_csv(csv_path, index=False)
+            logger.info("Saved %d rows to CSV: %s", len(df), csv_path)
+        except Exception as e:
+            logger.error("Error saving CSV to %s: %s", csv_path, e)
+
+
+class NumpyCache(OHLCVCache):
+    """
+    Columnar binary backend: one directory per series holding a raw NumPy array
+    per column ('time' as int64 epoch-ms, prices/volume as float64) plus a small
+    meta.json with the row count and time bounds.
+
+    Loads only touch the requested column files and never parse dates.
+    A legacy CSV found for a series is migrated the first time it is read.
+
+    Reads are indexed by time: segments outside the requested range are skipped
+    using the bounds stored in meta.json, and the sorted time column of each
+    remaining segment is binary searched, so a short window costs the same no
+    matter how long the cached history is.
+
+    Incremental updates are append-only: new candles go into a small tail
+    segment directory (seg-000001, ...) listed in meta.json, so a top-up costs
+    O(new bars). Once OHLCV_COMPACT_SEGMENTS tails have piled up, a background
+    thread merges them back into a single base segment.
+
+    meta.json also keeps a gap index of missing candles, updated on every write
+    from the new rows only, so gaps() never has to scan the series, and, for
+    series aggregated from a finer interval, that base interval ("derived_from").
+    """
+
+    name = "numpy"
+    META_FILE = "meta.json"
+    FORMAT_VERSION = 2
+    ROOT_SEGMENT = "."  # Base columns written by format version 1 live in the series root
+
+    _locks: Dict[str, threading.RLock] = {}
+    _locks_guard = threading.Lock()
+    _compacting: Set[str] = set()
+
+    def __init__(self, cache_dir: str = OHLCV_CACHE_DIR, compact_segments: int = OHLCV_COMPACT_SEGMENTS):
+        super().__init__(cache_dir)
+        self.compact_segments = compact_segments
+
+    def series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.cache_dir, self.series_key(symbol, interval))
+
+    def exists(self, symbol: str, interval: str) -> bool:
+        return os.path.exists(os.path.join(self.series_dir(symbol, interval), self.META_FILE))
+
+    def cached_intervals(self, symbol: str) -> List[str]:
+        prefix = self.series_key(symbol, "")
+        intervals = [
+            name[len(prefix):] for name in os.listdir(self.cache_dir)
+            if name.startswith(prefix) and os.path.exists(os.path.join(self.cache_dir, name, self.META_FILE))
+        ]
+        # Legacy CSV files are migrated on first read, so they count as cached too
+        return sorted(set(intervals) | set(CSVCache(self.cache_dir).cached_intervals(symbol)))
+
+    def read_meta(self, symbol: str, interval: str) -> Optional[Dict]:
+        meta_path = os.path.join(self.series_dir(symbol, interval), self.META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if "base" not in meta:
+            # Format version 1: a single base segment stored in the series root
+            meta["base"] = {
+                "name": self.ROOT_SEGMENT,
+                "rows": meta["rows"],
+                "start": meta["start"],
+                "end": meta["end"],
+            }
+            meta["segments"] = []
+            meta["next_segment"] = 1
+        return meta
+
+    def series_version(self, symbol: str, interval: str) -> Optional[Hashable]:
+        # next_segment grows with every save and append, so it also catches rewrites that keep the end
+        meta = self.read_meta(symbol, interval)
+        return (meta["next_segment"], meta["rows"], meta["end"]) if meta else None
+
+    def derived_from(self, symbol: str, interval: str) -> Optional[str]:
+        meta = self.read_meta(symbol, interval)
+        return meta.get("derived_from") if meta else None
+
+    def mark_derived(self, symbol: str, interval: str, base_interval: str) -> None:
+        series_dir = self.series_dir(symbol, interval)
+        with self._lock(series_dir):
+            meta = self.read_meta(symbol, interval)
+            if meta is not None and meta.get("derived_from") != base_interval:
+                meta["derived_from"] = base_interval
+                self._write_meta(series_dir, meta)
+
+    def segments(self, meta: Dict) -> List[Dict]:
+        """
+        All segments of a series in time order, base segment first.
+        """
+        return [meta["base"]] + list(meta["segments"])
+
+    def segments_in_range(
+        self,
+        meta: Dict,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Segments whose [start, end] bounds from meta.json overlap the requested range.
+        """
+        return [
+            seg for seg in self.segments(meta)
+            if seg["rows"]
+            and (start_time is None or seg["end"] >= start_time)
+            and (end_time is None or seg["start"] <= end_time)
+        ]
+
+    @staticmethod
+    def slice_bounds(times: np.ndarray, start_time: Optional[int] = None, end_time: Optional[int] = None):
+        """
+        Index range [lo, hi) of a sorted epoch-ms array that falls inside [start_time, end_time].
+        """
+        lo = int(np.searchsorted(times, start_time, side='left')) if start_time is not None else 0
+        hi = int(np.searchsorted(times, end_time, side='right')) if end_time is not None else len(times)
+        return lo, hi
+
+    def load(self, symbol, interval, start_time=None, end_time=None, columns=None) -> pd.DataFrame:
+        if not self.exists(symbol, interval) and not self._migrate_legacy_csv(symbol, interval):
+            return pd.DataFrame()
+
+        series_dir = self.series_dir(symbol, interval)
+        try:
+            arrays = self._read_arrays(symbol, interval, start_time, end_time, columns, np.float64)
+            data = {'time': from_epoch_ms(arrays.pop('time'))}
+            data.update(arrays)
+            df = pd.DataFrame(data)
+            logger.info("Loaded %d rows from cache: %s", len(df), series_dir)
+            return df
+        except Exception as e:
+            logger.error("Error loading cached series at %s: %s", series_dir, e)
+            return pd.DataFrame()
+
+    def load_arrays(self, symbol, interval, start_time=None, end_time=None, columns=None,
+                    dtype=np.float64) -> Dict[str, np.ndarray]:
+        value_columns = self._select_columns(columns)
+        if not self.exists(symbol, interval) and not self._migrate_legacy_csv(symbol, interval):
+            return self._empty_arrays(value_columns, dtype)
+        try:
+            return self._read_arrays(symbol, interval, start_time, end_time, columns, dtype)
+        except Exception as e:
+            logger.error("Error loading cached series at %s: %s", self.series_dir(symbol, interval), e)
+            return self._empty_arrays(value_columns, dtype)
+
+    def map_arrays(self, symbol, interval, start_time=None, end_time=None) -> Dict[str, np.ndarray]:
+        """
+        Read-only memory maps of the series' column files, sliced to the requested
+        range without copying.
+
+        Every process mapping the same series shares one set of physical pages via
+        the OS page cache, so memory grows with the number of distinct series, not
+        with the number of workers. Pending tail segments are compacted first so
+        the series is a single contiguous base segment. A later rewrite of the
+        series swaps in new files; existing maps keep the old, unlinked data alive.
+        """
+        if not self.exists(symbol, interval) and not self._migrate_legacy_csv(symbol, interval):
+            return self._empty_arrays(VALUE_COLUMNS, np.float64)
+
+        series_dir = self.series_dir(symbol, interval)
+        with self._lock(series_dir):
+            self.compact(symbol, interval)
+            meta = self.read_meta(symbol, interval)
+            if not meta["rows"]:
+                return self._empty_arrays(VALUE_COLUMNS, np.float64)
+            segment_dir = os.path.join(series_dir, meta["base"]["name"])
+            arrays = {
+                col: np.load(os.path.join(segment_dir, f"{col}.npy"), mmap_mode='r')
+                for col in OHLCV_COLUMNS
+            }
+        lo, hi = self.slice_bounds(arrays['time'], start_time, end_time)
+        logger.info("Mapped %d rows from cache: %s", hi - lo, series_dir)
+        return {col: values[lo:hi] for col, values in arrays.items()}
+
+    def _read_arrays(self, symbol, interval, start_time, end_time, columns, dtype) -> Dict[str, np.ndarray]:
+        series_dir = self.series_dir(symbol, interval)
+        with self._lock(series_dir):
+            meta = self.read_meta(symbol, interval)
+            value_columns = self._select_columns(columns)
+            parts = {col: [] for col in ['time'] + value_columns}
+            for segment in self.segments_in_range(meta, start_time, end_time):
+                segment_dir = os.path.join(series_dir, segment["name"])
+                # Memory-map the time column and binary search it, so only the
+                # requested slice of each column file is ever read into memory
+                times = np.load(os.path.join(segment_dir, "time.npy"), mmap_mode='r')
+                lo, hi = self.slice_bounds(times, start_time, end_time)
+                if lo >= hi:
+                    continue
+                parts['time'].append(np.array(times[lo:hi]))
+                for col in value_columns:
+                    values = np.load(os.path.join(segment_dir, f"{col}.npy"), mmap_mode='r')
+                    parts[col].append(np.array(values[lo:hi], dtype=dtype))
+
+        arrays = {'time': self._concat(parts['time'], np.int64)}
+        for col in value_columns:
+            arrays[col] = self._concat(parts[col], dtype)
+        return arrays
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        """
+        Replace the whole series with a single freshly written base segment.
+        """
+        series_dir = self.series_dir(symbol, interval)
+        try:
+            with self._lock(series_dir):
+                if not os.path.exists(series_dir):
+                    os.makedirs(series_dir)
+                old_meta = self.read_meta(symbol, interval)
+                next_segment = old_meta["next_segment"] if old_meta else 0
+
+                df = df.sort_values('time')
+                base = self._write_segment(series_dir, f"base-{next_segment:06d}", df)
+                meta = {
+                    "version": self.FORMAT_VERSION,
+                    "base": base,
+                    "segments": [],
+                    "next_segment": next_segment + 1,
+                    "gaps": self._find_gaps(to_epoch_ms(df['time']), interval),
+                }
+                if old_meta and old_meta.get("derived_from"):
+                    meta["derived_from"] = old_meta["derived_from"]
+                self._write_meta(series_dir, meta)
+                if old_meta:
+                    self._remove_segments(series_dir, self.segments(old_meta))
+            logger.info("Saved %d rows to cache: %s", base["rows"], series_dir)
+        except Exception as e:
+            logger.error("Error saving cached series to %s: %s", series_dir, e)
+
+    def append(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Write candles newer than the cached series as a new tail segment.
+        """
+        if not self.exists(symbol, interval) and not self._migrate_legacy_csv(symbol, interval):
+            self.save(symbol, interval, df)
+            return len(df)
+
+        series_dir = self.series_dir(symbol, interval)
+        try:
+            with self._lock(series_dir):
+                meta = self.read_meta(symbol, interval)
+                if meta["end"] is not None:
+                    df = df[to_epoch_ms(df['time']) > meta["end"]]
+                if df.empty:
+                    return 0
+
+                df = df.sort_values('time')
+                times = to_epoch_ms(df['time'])
+                if meta["end"] is not None:
+                    # Include the last cached candle so a hole at the seam is indexed too
+                    times = np.r_[meta["end"], times]
+                gaps = self._find_gaps(times, interval)
+
+                name = f"seg-{meta['next_segment']:06d}"
+                segment = self._write_segment(series_dir, name, df)
+                meta["segments"].append(segment)
+                if "gaps" in meta:
+                    meta["gaps"].extend(gaps)
+                meta["next_segment"] += 1
+                self._write_meta(series_dir, meta)
+                pending = len(meta["segments"])
+            logger.info("Appended %d rows to cache: %s (%d tail segments)", segment["rows"], series_dir, pending)
+        except Exception as e:
+            logger.error("Error appending to cached series at %s: %s", series_dir, e)
+            return 0
+
+        if pending >= self.compact_segments:
+            self.compact_in_background(symbol, interval)
+        return segment["rows"]
+
+    def compact(self, symbol: str, interval: str) -> None:
+        """
+        Merge the base segment and all tail segments into a single base segment.
+        """
+        series_dir = self.series_dir(symbol, interval)
+        with self._lock(series_dir):
+            meta = self.read_meta(symbol, interval)
+            if meta is None or not meta["segments"]:
+                return
+            df = self.load(symbol, interval)
+            if len(df) != meta["rows"]:
+                raise ValueError(f"read {len(df)} of {meta['rows']} rows, refusing to rewrite")
+            self.save(symbol, interval, df)
+
+    def compact_in_background(self, symbol: str, interval: str) -> Optional[threading.Thread]:
+        """
+        Run compact() on a daemon thread unless one is already running for the series.
+        """
+        key = self.series_dir(symbol, interval)
+        with self._locks_guard:
+            if key in self._compacting:
+                return None
+            self._compacting.add(key)
+
+        def run():
+            try:
+                self.compact(symbol, interval)
+                logger.info("Compacted cached series: %s", key)
+            except Exception as e:
+                logger.error("Error compacting cached series at %s: %s", key, e)
+            finally:
+                with self._locks_guard:
+                    self._compacting.discard(key)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        meta = self.read_meta(symbol, interval)
+        if meta is None:
+            return super().last_timestamp(symbol, interval)
+        return meta["end"]
+
+    def gaps(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        meta = self.read_meta(symbol, interval)
+        if meta is None or "gaps" not in meta:
+            # Legacy series without a gap index
+            return super().gaps(symbol, interval)
+        return [tuple(gap) for gap in meta["gaps"]]
+
+    def _find_gaps(self, times: np.ndarray, interval: str) -> List[List[int]]:
+        interval_ms = self.gap_interval_ms(interval)
+        if interval_ms is None:
+            return []
+        return [[int(first), int(last)] for first, last in find_gaps(times, interval_ms)]
+
+    def _migrate_legacy_csv(self, symbol: str, interval: str) -> bool:
+        legacy = CSVCache(self.cache_dir)
+        if not legacy.exists(symbol, interval):
+            return False
+        return migrate_series(legacy, self, symbol, interval)
+
+    def _lock(self, series_dir: str) -> threading.RLock:
+        with self._locks_guard:
+            if series_dir not in self._locks:
+                self._locks[series_dir] = threading.RLock()
+            return self._locks[series_dir]
+
+    def _write_segment(self, series_dir: str, name: str, df: pd.DataFrame) -> Dict:
+        segment_dir = os.path.join(series_dir, name)
+        if not os.path.exists(segment_dir):
+            os.makedirs(segment_dir)
+        times = to_epoch_ms(df['time'])
+        self._write_array(os.path.join(segment_dir, "time.npy"), times)
+        for col in VALUE_COLUMNS:
+            self._write_array(os.path.join(segment_dir, f"{col}.npy"), df[col].to_numpy(dtype=np.float64))
+        return {
+            "name": name,
+            "rows": int(len(times)),
+            "start": int(times[0]) if len(times) else None,
+            "end": int(times[-1]) if len(times) else None,
+        }
+
+    def _write_meta(self, series_dir: str, meta: Dict) -> None:
+        segments = [s for s in self.segments(meta) if s["rows"]]
+        meta["rows"] = sum(s["rows"] for s in segments)
+        meta["start"] = segments[0]["start"] if segments else None
+        meta["end"] = segments[-1]["end"] if segments else None
+        self._write_json(os.path.join(series_dir, self.META_FILE), meta)
+
+    @staticmethod
+    def _remove_segments(series_dir: str, segments: List[Dict]) -> None:
+        for segment in segments:
+            segment_dir = os.path.join(series_dir, segment["name"])
+            if segment["name"] == NumpyCache.ROOT_SEGMENT:
+                for col in OHLCV_COLUMNS:
+                    path = os.path.join(segment_dir, f"{col}.npy")
+                    if os.path.exists(path):
+                        os.remove(path)
+            else:
+                shutil.rmtree(segment_dir, ignore_errors=True)
+
+    @staticmethod
+    def _concat(parts: List[np.ndarray], dtype) -> np.ndarray:
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    @staticmethod
+    def _write_array(path: str, values: np.ndarray) -> None:
+        # Write next to the target and swap it in so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(values))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_json(path: str, payload: Dict) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+
+CACHE_BACKENDS = {
+    CSVCache.name: CSVCache,
+    NumpyCache.name: NumpyCache,
+}
+
+
+def get_cache_backend(name: Optional[str] = None, cache_dir: Optional[str] = None) -> OHLCVCache:
+    """
+    Instantiate the configured OHLCV cache backend ("numpy" or "csv").
+    """
+    backend_name = (name or OHLCV_CACHE_BACKEND).lower()
+    if backend_name not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown OHLCV cache backend: {backend_name}")
+    return CACHE_BACKENDS[backend_name](cache_dir or OHLCV_CACHE_DIR)
+
+
+def migrate_series(source: OHLCVCache, target: OHLCVCache, symbol: str, interval: str) -> bool:
+    """
+    Copy a single series from one backend to another.
+    Returns True if anything was written.
+    """
+    df = source.load(symbol, interval)
+    if df.empty:
+        return False
+    target.save(symbol, interval, df)
+    logger.info("Migrated %s %s (%d rows) from %s to %s cache",
+                symbol, interval, len(df), source.name, target.name)
+    return True
+
+
+def migrate_csv_cache(cache_dir: Optional[str] = None, remove_csv: bool = False) -> int:
+    """
+    One-shot migration of every legacy <SYMBOL>_<interval>.csv file in the cache
+    directory into the columnar format.
+
+    :param cache_dir: Cache directory to migrate (defaults to OHLCV_CACHE_DIR).
+    :param remove_csv: Delete each CSV once its series was written successfully.
+    :return: Number of migrated series.
+    """
+    cache_dir = cache_dir or OHLCV_CACHE_DIR
+    legacy = CSVCache(cache_dir)
+    target = NumpyCache(cache_dir)
+
+    migrated = 0
+    for filename in sorted(os.listdir(cache_dir)):
+        if not filename.endswith(".csv"):
+            continue
+        key = filename[:-len(".csv")]
+        if "_" not in key:
+            logger.warning("Skipping unrecognised cache file: %s", filename)
+            continue
+        # The sanitized symbol never contains '_', the interval is the last part
+        symbol, interval = key.rsplit("_", 1)
+        if migrate_series(legacy, target, symbol, interval):
+            migrated += 1
+            if remove_csv:
+                os.remove(legacy.path_for(symbol, interval))
+    logger.info("Migrated %d CSV series in %s", migrated, cache_dir)
+    return migrated
+
+
+if __name__ == "__main__":
+    migrate_csv_cache()
@@ -0,0 +1,37 @@
+# src/data_handler/synthetic.py
+import numpy as np
+import pandas as pd
+
+from .timeframes import timeframe_to_ms
+
+
+def generate_ohlcv(
+    n_bars: int,
+    interval: str = '1h',
+    start: str = '2020-01-01',
+    seed: int = 0,
+    start_price: float = 100.0,
+    volatility: float = 0.01,
+    drift: float = 0.0
+) -> pd.DataFrame:
+    """
+    Deterministic synthetic candles: a geometric random walk of closes with
+    per-bar log-return volatility `volatility` and mean `drift`, opens at the
+    previous close plus a small gap, wicks beyond the body and random volume.
+
+    The same arguments always give the same frame, in the layout returned by
+    BaseDataHandler.fetch_historical_data ('time' column plus OHLCV).
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(drift, volatility, n_bars)))
+    prev_close = np.r_[start_price, close[:-1]]
+    open_ = prev_close * (1 + rng.normal(0, volatility / 5, n_bars))
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n_bars)))
+    return pd.DataFrame({
+        'time': pd.Timestamp(start) + pd.to_timedelta(np.arange(n_bars) * timeframe_to_ms(interval), unit='ms'),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + wick[0]),
+        'low': np.minimum(open_, close) * (1 - wick[1]),
+        'close': close,
+        'volume': rng.lognormal(mean=4.0, sigma=0.5, size=n_bars),
+    })
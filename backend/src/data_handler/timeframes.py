@@ -0,0 +1,146 @@
+# src/data_handler/timeframes.py
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple
+
+from config import logger
+
+TIMEFRAME_UNITS_MS = {
+    's': 1000,
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+    'M': 30 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_to_ms(interval: str) -> int:
+    """
+    Length of a ccxt-style timeframe in milliseconds, e.g. '15m' => 900000.
+    """
+    try:
+        amount, unit = int(interval[:-1]), interval[-1]
+        return amount * TIMEFRAME_UNITS_MS[unit]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Unsupported timeframe: {interval}")
+
+
+def split_time_range(start_time: int, end_time: int, window_ms: int, align_ms: int = 1) -> List[Tuple[int, int]]:
+    """
+    Split the inclusive range [start_time, end_time] (epoch ms) into consecutive,
+    non-overlapping inclusive windows of at most window_ms, starting on an align_ms boundary.
+    """
+    if window_ms <= 0:
+        raise ValueError("window_ms must be positive")
+    windows = []
+    window_start = start_time - (start_time % align_ms)
+    while window_start <= end_time:
+        window_end = min(window_start + window_ms - 1, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end + 1
+    return windows
+
+
+def find_gaps(times: np.ndarray, interval_ms: int) -> List[Tuple[int, int]]:
+    """
+    Missing stretches in a sorted epoch-ms time column, as inclusive
+    (first_missing, last_missing) candle open times.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if len(times) < 2:
+        return []
+    steps = np.diff(times)
+    idx = np.flatnonzero(steps > interval_ms)
+    return [(int(times[i] + interval_ms), int(times[i + 1] - interval_ms)) for i in idx]
+
+
+def stitch_candles(frames: Sequence[pd.DataFrame], interval_ms: int) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Combine independently fetched candle frames into one sorted series.
+
+    Overlapping candles (same open time) are de-duplicated and interior gaps are
+    reported, so a parallel download can be verified before it is cached.
+    Returns the stitched frame and a report dict.
+    """
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(), {"rows": 0, "overlaps": 0, "gaps": []}
+
+    combined = pd.concat(frames, ignore_index=True).sort_values('time', kind='stable')
+    stitched = combined.drop_duplicates(subset=['time'], keep='last').reset_index(drop=True)
+    times = stitched['time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+    report = {
+        "rows": len(stitched),
+        "overlaps": len(combined) - len(stitched),
+        "gaps": find_gaps(times, interval_ms),
+    }
+    if report["overlaps"]:
+        logger.debug("Stitching dropped %d overlapping candles", report["overlaps"])
+    for first_missing, last_missing in report["gaps"]:
+        logger.warning("Gap in stitched candles: %s to %s (%d bars missing)",
+                       pd.to_datetime(first_missing, unit='ms'), pd.to_datetime(last_missing, unit='ms'),
+                       (last_missing - first_missing) // interval_ms + 1)
+    return stitched, report
+
+
+# 1970-01-01 was a Thursday; exchanges open weekly candles on Monday
+WEEK_OFFSET_MS = 4 * TIMEFRAME_UNITS_MS['d']
+
+
+def bucket_starts(times: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Open time of the `interval` candle containing each epoch-ms timestamp.
+    """
+    if interval.endswith('M'):
+        raise ValueError("Monthly candles have variable length and cannot be derived")
+    interval_ms = timeframe_to_ms(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith('w') else 0
+    times = np.asarray(times, dtype=np.int64)
+    return (times - offset) // interval_ms * interval_ms + offset
+
+
+def is_derivable(base_interval: str, interval: str) -> bool:
+    """
+    True if `interval` candles can be built by aggregating `base_interval` candles.
+    """
+    try:
+        base_ms, target_ms = timeframe_to_ms(base_interval), timeframe_to_ms(interval)
+    except ValueError:
+        return False
+    return not interval.endswith('M') and target_ms > base_ms and target_ms % base_ms == 0
+
+
+def resample_ohlcv(df: pd.DataFrame, base_interval: str, interval: str) -> pd.DataFrame:
+    """
+    Aggregate base-interval candles into coarser `interval` candles with vectorized
+    reductions (first open, max high, min low, last close, summed volume).
+
+    Only complete buckets are emitted: a bucket needs all interval / base_interval
+    base candles, so the still-open newest bucket, a partial first bucket when the
+    base starts mid-bucket and buckets spanning missing base candles are dropped
+    (and show up as gaps in the derived series) rather than cached as if complete.
+    """
+    if not is_derivable(base_interval, interval):
+        raise ValueError(f"Cannot derive {interval} candles from {base_interval} candles")
+    if df.empty:
+        return df.iloc[:0].copy()
+
+    times = df['time'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    buckets = bucket_starts(times, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    resampled = pd.DataFrame({
+        'time': pd.to_datetime(buckets[starts], unit='ms'),
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+        'volume': np.add.reduceat(df['volume'].to_numpy(), starts),
+    })
+
+    candles_per_bucket = timeframe_to_ms(interval) // timeframe_to_ms(base_interval)
+    complete = ends - starts + 1 >= candles_per_bucket
+    return resampled[complete].reset_index(drop=True)
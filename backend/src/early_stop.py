@@ -0,0 +1,135 @@
+# src/early_stop.py
+"""
+Early termination of backtests that are already hopeless, e.g. in parameter
+sweeps where most combinations are clearly bad early in the data.
+
+EarlyStopRules holds the conditions: the drawdown from the peak portfolio value
+exceeds max_drawdown (%), the portfolio value falls below min_equity_pct (% of
+the initial capital), or no trade has been opened after no_trade_bars bars.
+Each run checks them through an EarlyStopMonitor after every bar: Cerebro runs
+through the EarlyStop analyzer, which stops Cerebro with runstop(), and vector
+runs inside run_vector_backtest(). Both engines stop on the same bar, and the
+results then cover only the bars up to it. Runs that never trip a rule are
+unaffected.
+"""
+from typing import Any, Dict, Optional
+
+import backtrader as bt
+
+from config import logger
+
+REASONS = {
+    'max_drawdown': "drawdown above {max_drawdown}%",
+    'min_equity': "portfolio value below {min_equity_pct}% of the initial capital",
+    'no_trades': "no trade after {no_trade_bars} bars",
+}
+
+
+class EarlyStopRules:
+    """
+    Conditions under which a backtest stops early; None disables a condition.
+    """
+
+    def __init__(
+        self,
+        max_drawdown: Optional[float] = None,  # % below the peak portfolio value
+        min_equity_pct: Optional[float] = None,  # % of the initial capital
+        no_trade_bars: Optional[int] = None  # bars without any trade opened
+    ):
+        for name, value in (('max_drawdown', max_drawdown), ('min_equity_pct', min_equity_pct),
+                            ('no_trade_bars', no_trade_bars)):
+            if value is not None and value <= 0:
+                raise ValueError(f"Early stop rule {name} must be positive, got {value}")
+        self.max_drawdown = max_drawdown
+        self.min_equity_pct = min_equity_pct
+        self.no_trade_bars = int(no_trade_bars) if no_trade_bars is not None else None
+
+    @classmethod
+    def from_dict(cls, rules: Optional[Dict[str, Any]]) -> Optional["EarlyStopRules"]:
+        """
+        Rules from a mapping such as an API request's "early_stop"; None when empty.
+        """
+        if isinstance(rules, cls):
+            return rules
+        if not rules:
+            return None
+        unknown = set(rules) - {'max_drawdown', 'min_equity_pct', 'no_trade_bars'}
+        if unknown:
+            raise ValueError(f"Unknown early stop rules: {sorted(unknown)}")
+        return cls(**{name: value for name, value in rules.items() if value is not None})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'max_drawdown': self.max_drawdown,
+            'min_equity_pct': self.min_equity_pct,
+            'no_trade_bars': self.no_trade_bars,
+        }
+
+    def monitor(self, initial_value: float) -> "EarlyStopMonitor":
+        return EarlyStopMonitor(self, initial_value)
+
+
+class EarlyStopMonitor:
+    """
+    Tracks one run against the rules: feed it the portfolio value after every
+    bar with check() and flag opened trades with `traded`.
+    """
+
+    def __init__(self, rules: EarlyStopRules, initial_value: float):
+        self.rules = rules
+        self.min_value = initial_value * rules.min_equity_pct / 100.0 if rules.min_equity_pct else None
+        self.peak = float('-inf')
+        self.traded = False
+        self.reason: Optional[str] = None
+        self.bars: Optional[int] = None
+
+    def check(self, bars: int, value: float) -> bool:
+        """
+        True when the run should stop after its first `bars` bars, worth `value`.
+        """
+        rules = self.rules
+        self.peak = max(self.peak, value)
+        if rules.max_drawdown and self.peak > 0 and (self.peak - value) / self.peak * 100.0 > rules.max_drawdown:
+            self.reason = 'max_drawdown'
+        elif self.min_value is not None and value < self.min_value:
+            self.reason = 'min_equity'
+        elif rules.no_trade_bars and not self.traded and bars >= rules.no_trade_bars:
+            self.reason = 'no_trades'
+        else:
+            return False
+        self.bars = bars
+        return True
+
+    def check_flat(self, first: int, last: int, value: float) -> Optional[int]:
+        """
+        check() over bars first..last during which nothing happens (value
+        unchanged, no trades): the bar count the run stops at, or None.
+        """
+        bars = first
+        if self.rules.no_trade_bars and not self.traded:
+            bars = min(max(first, self.rules.no_trade_bars), last)
+        return bars if self.check(bars, value) else None
+
+    def truncation(self, total_bars: int) -> Optional[Dict[str, Any]]:
+        """
+        How the run was cut short ({'reason', 'bars', 'total_bars'}), or None if it ran to the end.
+        """
+        if self.reason is None:
+            return None
+        logger.info("Backtest stopped early after %d of %d bars: %s", self.bars, total_bars,
+                    REASONS[self.reason].format(**self.rules.as_dict()))
+        return {'reason': self.reason, 'bars': self.bars, 'total_bars': total_bars}
+
+
+class EarlyStop(bt.Analyzer):
+    """
+    Stops Cerebro once the monitor's rules trip (checked after every bar).
+    """
+    params = (('monitor', None),)
+
+    def notify_trade(self, trade):
+        self.p.monitor.traded = True
+
+    def next(self):
+        if self.p.monitor.check(len(self.data), self.strategy.broker.getvalue()):
+            self.strategy.env.runstop()
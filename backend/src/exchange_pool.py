@@ -0,0 +1,101 @@
+# src/exchange_pool.py
+import hashlib
+import threading
+import ccxt
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional, Tuple
+
+from config import logger, BULK_DOWNLOAD_WORKERS
+from src.data_handler.rate_limiter import get_rate_limiter
+
+
+class ExchangeClientPool:
+    """
+    Process-wide pool of ccxt clients, one per exchange and credential set.
+
+    Reusing a client keeps its HTTP session (and keep-alive connections) and its
+    loaded markets. Every pooled client throttles through the exchange's shared
+    RateLimiter, so BaseDataHandler, ExchangeAPI and the live trader all draw
+    from a single request budget.
+    """
+
+    def __init__(self, max_connections: int = BULK_DOWNLOAD_WORKERS):
+        self.max_connections = max_connections
+        self._clients: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        exchange_name: str,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Return the shared client for the exchange/credentials, creating it on first use.
+        """
+        name = exchange_name.lower()
+        # Never keep secrets around in plain text as dictionary keys
+        secret_hash = hashlib.sha256((api_secret or "").encode()).hexdigest()
+        key = (name, api_key or "", secret_hash)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(name, api_key, api_secret, options)
+                self._clients[key] = client
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def _create_client(self, name, api_key, api_secret, options):
+        exchange_class = getattr(ccxt, name)
+        config: Dict[str, Any] = {'enableRateLimit': True}
+        if api_key:
+            config['apiKey'] = api_key
+        if api_secret:
+            config['secret'] = api_secret
+        if options:
+            config['options'] = options
+        client = exchange_class(config)
+
+        # Route ccxt's per-request throttling through the shared budget
+        limiter = get_rate_limiter(name)
+        client.throttle = lambda cost=None: limiter.acquire(1 if cost is None else cost)
+
+        # Concurrent callers must not all load markets at once
+        load_markets = client.load_markets
+        markets_lock = threading.Lock()
+
+        def locked_load_markets(*args, **kwargs):
+            with markets_lock:
+                return load_markets(*args, **kwargs)
+
+        client.load_markets = locked_load_markets
+
+        # Allow as many keep-alive connections as we run download workers
+        session = getattr(client, 'session', None)
+        if session is not None:
+            adapter = HTTPAdapter(pool_connections=self.max_connections, pool_maxsize=self.max_connections)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+        logger.info("Created pooled %s client", name)
+        return client
+
+
+_pool = ExchangeClientPool()
+
+
+def get_exchange_client(
+    exchange_name: str,
+    api_key: Optional[str] = None,
+    api_secret: Optional[str] = None,
+    options: Optional[Dict[str, Any]] = None
+):
+    """
+    Shortcut for the process-wide ExchangeClientPool.
+    """
+    return _pool.get(exchange_name, api_key, api_secret, options)
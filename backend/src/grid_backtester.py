@@ -1,12 +1,41 @@
 
 # src/grid_backtester.py
 import backtrader as bt
-from typing import Tuple, List, Dict, Any
+from typing import Callable, Tuple, List, Dict, Any, Optional, Union
 import pandas as pd
 
 from config import logger
 from src.data_handler.base_data_handler import BaseDataHandler
-from src.trading_strategy import BoxMacdRsiStrategy, IntradayMomentumStrategy, IBPriceActionStrategy
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.array_feed import CandleArrayData
+from src.data_handler.timeframes import timeframe_to_ms
+from src.early_stop import EarlyStop, EarlyStopRules
+from src.profiling import SimulationProfiler
+from src.result_cache import data_fingerprint, get_result_cache, result_key
+from src.vector_engine import run_vector_backtest
+from src.trading_strategy import (
+    BoxMacdRsiStrategy, IntradayMomentumStrategy, IBPriceActionStrategy, StochasticMeanReversion
+)
+
+# Minimum bars needed for indicators
+MIN_DATA_LENGTH = 500
+
+class ProgressReporter(bt.Analyzer):
+    """
+    Calls `callback(fraction)` as the run advances through the main feed, at
+    most once per `step` of progress.
+    """
+    params = (('callback', None), ('step', 0.01))
+
+    def start(self):
+        self._reported = 0.0
+
+    def next(self):
+        fraction = len(self.data) / max(self.data.buflen(), 1)
+        if fraction - self._reported >= self.p.step:
+            self._reported = fraction
+            self.p.callback(fraction)
+
 
 class GridBacktester(BaseDataHandler):
     def __init__(
@@ -16,7 +45,18 @@ class GridBacktester(BaseDataHandler):
         initial_capital: float,
         risk_percent: float,
         box_params: Dict[str, Any],
-        strategy_type: str = 'momentum'  # 'momentum', 'grid', or 'ib_price_action'
+        strategy_type: str = 'momentum',  # 'momentum', 'grid', 'ib_price_action' or 'stoch_mean_reversion'
+        htf_interval: Optional[str] = None,  # higher timeframe fed as datas[1], derived from `interval`
+        compact: bool = False,  # hold candles as float32 CandleArrays instead of DataFrames
+        mmap: bool = False,  # feed straight from read-only memory maps of the cache files
+        engine: str = 'backtrader',  # 'backtrader' (Cerebro) or 'vector' (src.vector_engine)
+        strategy_overrides: Optional[Dict[str, Any]] = None,  # extra strategy params applied last
+        fast: bool = False,  # Cerebro fast path: vectorized indicators, no observers (see simulate)
+        profile: bool = False,  # time strategy hooks, indicators and broker (see src.profiling)
+        progress: Optional[Callable[[float], None]] = None,  # called with the fraction of bars simulated
+        cache_results: bool = False,  # reuse the stored result of an identical run (see src.result_cache)
+        refresh_cache: bool = False,  # with cache_results: simulate anyway and overwrite the stored result
+        early_stop: Union[EarlyStopRules, Dict[str, Any], None] = None  # EarlyStopRules (or their dict) cutting hopeless runs short
     ):
 
         super().__init__()
@@ -26,94 +66,180 @@ class GridBacktester(BaseDataHandler):
         self.risk_percent = risk_percent
         self.box_params = box_params
         self.strategy_type = strategy_type
-
+        self.htf_interval = htf_interval
+        self.htf_key = f"{symbol}@{htf_interval}"
+        self.compact = compact
+        self.mmap = mmap
+        if engine not in ('backtrader', 'vector'):
+            raise ValueError(f"Unknown backtest engine: {engine}")
+        self.engine = engine
+        self.strategy_overrides = dict(strategy_overrides or {})
+        self.fast = fast
+        if profile and engine != 'backtrader':
+            raise ValueError("Profiling is only available with the 'backtrader' engine")
+        self.profile = profile
+        self.profile_summary: Optional[Dict[str, Any]] = None
+        self.progress = progress
+        self.cache_results = cache_results
+        self.refresh_cache = refresh_cache
+        self.cache_key: Optional[str] = None
+        self.cache_hit = False
+        self.early_stop = EarlyStopRules.from_dict(early_stop)
+        self.truncated: Optional[Dict[str, Any]] = None
 
     def fetch_and_store_data(self, start_time: int = None, end_time: int = None) -> None:
         """
         Fetch historical data and store it in memory using the base class methods.
         """
-        data = self.fetch_historical_data(self.symbol, self.interval, start_time, end_time)
+        if self.mmap:
+            data = self.fetch_mapped_candles(self.symbol, self.interval, start_time, end_time)
+        elif self.compact:
+            data = self.fetch_candle_arrays(self.symbol, self.interval, start_time, end_time)
+        else:
+            data = self.fetch_historical_data(self.symbol, self.interval, start_time, end_time)
         if data.empty:
             logger.warning("No historical data found for symbol: %s", self.symbol)
         else:
             self.store_data(self.symbol, data)
 
+        if self.htf_interval:
+            # Built locally from the base candles fetched above, no extra download
+            htf_data = self.fetch_resampled_data(
+                self.symbol, self.htf_interval, self.interval, start_time, end_time
+            )
+            self.store_data(self.htf_key, CandleArrays.from_frame(htf_data) if self.compact or self.mmap else htf_data)
+
     def simulate(self) -> Tuple[List[Dict], float, Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
         """Run the backtest and return results.
 
         Returns a tuple containing the list of executed orders, the final broker
         value, and analysis dictionaries for trades, drawdown and Sharpe ratio.
+
+        With fast=True Cerebro preloads the feeds and evaluates indicators in
+        vectorized runonce mode, and skips what the results do not use: the
+        standard observers (broker value, buy/sell marks, trades) and per-trade
+        history. The returned results are the same either way.
+
+        With profile=True the time spent in the strategy's next, notify_order and
+        notify_trade, its indicators and the broker is recorded per call and
+        summarized in self.profile_summary (see SimulationProfiler.summary).
+
+        A `progress` callback receives the fraction of bars simulated so far
+        (Cerebro engine only; the vector engine runs in one step).
+
+        With cache_results=True an identical earlier run (same strategy,
+        parameters, candles and code; see src.result_cache) is returned from the
+        result cache without simulating; self.cache_hit tells which happened.
+        Profiled runs always simulate.
+
+        With early_stop rules (see src.early_stop) the run ends on the first bar
+        where one of them trips; self.truncated then tells why and after how many
+        bars, and the results cover only those bars. Otherwise it is None.
         """
+        self.cache_hit = False
+        if not self.cache_results or self.profile:
+            return self._simulate()
+
+        cache = get_result_cache()
+        self.cache_key = self.result_key()
+        if not self.refresh_cache:
+            cached = cache.get(self.cache_key)
+            if cached is not None:
+                logger.info("Reusing the cached result of an identical backtest (%s)", self.cache_key[:12])
+                self.cache_hit = True
+                result, self.truncated = cached
+                return result
+
+        result = self._simulate()
+        cache.put(self.cache_key, (result, self.truncated))
+        return result
+
+    def result_key(self) -> str:
+        """
+        Result cache key of the run simulate() would do with the stored data.
+        """
+        data = self.get_stored_data(self.symbol)
+        if data is None or data.empty:
+            raise ValueError("No data to run simulation.")
+        htf_data = self.get_stored_data(self.htf_key) if self.htf_interval else None
+        if htf_data is not None and htf_data.empty:
+            htf_data = None
+        strategy_cls, strategy_params = self._strategy_spec()
+        return result_key({
+            'strategy': f"{strategy_cls.__module__}.{strategy_cls.__qualname__}",
+            'params': {**dict(strategy_cls.params._getitems()), **strategy_params},
+            'symbol': self.symbol,
+            'interval': self.interval,
+            'htf_interval': self.htf_interval,
+            'initial_capital': self.initial_capital,
+            'engine': self.engine,
+            'early_stop': self.early_stop.as_dict() if self.early_stop else None,
+            'data': data_fingerprint(self._as_arrays(data)),
+            'htf_data': data_fingerprint(self._as_arrays(htf_data)) if htf_data is not None else None,
+        })
+
+    def _simulate(self) -> Tuple[List[Dict], float, Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
         data = self.get_stored_data(self.symbol)
         if data is None or data.empty:
             raise ValueError("No data to run simulation.")
 
-        # Validate required columns
-        required_columns = ['open', 'high', 'low', 'close']
-        missing_columns = [col for col in required_columns if col not in data.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {missing_columns}")
+        # Validate required columns (CandleArrays always carry the full OHLCV set)
+        if isinstance(data, pd.DataFrame):
+            required_columns = ['open', 'high', 'low', 'close']
+            missing_columns = [col for col in required_columns if col not in data.columns]
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {missing_columns}")
 
         # Ensure sufficient data length
-        min_data_length = 500  # Minimum bars needed for indicators
-        if len(data) < min_data_length:
-            raise ValueError(f"Insufficient data length: {len(data)}. Need at least {min_data_length} bars")
+        if len(data) < MIN_DATA_LENGTH:
+            raise ValueError(f"Insufficient data length: {len(data)}. Need at least {MIN_DATA_LENGTH} bars")
 
-        logger.info("Data being passed to Backtrader: %s", data.head())
+        logger.info("Data being passed to Backtrader: %s", data.head() if isinstance(data, pd.DataFrame) else data)
 
-        # Create Cerebro engine
-        cerebro = bt.Cerebro()
-        # Combine box_params with risk_percent for strategy
-        if self.strategy_type == 'momentum':
-            strategy_params = {
-                'stop_loss_perc': self.risk_percent,
-                'take_profit_perc': self.risk_percent * 3  # 3:1 reward ratio
-            }
-            cerebro.addstrategy(IntradayMomentumStrategy, **strategy_params)
-        elif self.strategy_type == 'ib_price_action':
-            strategy_params = {
-                'risk_percent': self.risk_percent,
-                **self.box_params
-            }
-            cerebro.addstrategy(IBPriceActionStrategy, **strategy_params)
+        strategy_cls, strategy_params = self._strategy_spec()
+
+        htf_data = self.get_stored_data(self.htf_key) if self.htf_interval else None
+        if htf_data is not None and not htf_data.empty:
+            # Stamp higher-timeframe candles with their last base bar so a bucket only
+            # becomes visible once it has closed (no look-ahead into the open candle)
+            shift = timeframe_to_ms(self.htf_interval) - timeframe_to_ms(self.interval)
+            if isinstance(htf_data, CandleArrays):
+                htf_data = htf_data.shift_time(shift)
+            else:
+                htf_data = htf_data.copy()
+                htf_data['time'] = pd.to_datetime(htf_data['time']) + pd.Timedelta(milliseconds=shift)
         else:
-            strategy_params = {**self.box_params, 'risk_percent': self.risk_percent}
-            cerebro.addstrategy(BoxMacdRsiStrategy, **strategy_params)
+            htf_data = None
 
+        if self.fast:
+            # The array feed indexes NumPy columns per bar; PandasData goes through
+            # DataFrame.iloc for every field of every bar
+            data = self._as_arrays(data)
+            htf_data = self._as_arrays(htf_data) if htf_data is not None else None
 
-        # Handle time column
-        if 'time' not in data.columns:
-            if data.index.name == 'time':
-                data = data.reset_index()
-            else:
-                raise ValueError("No time column found in data")
-                
-        # Convert time column to datetime
-        try:
-            if data['time'].dtype == 'int64' and data['time'].max() > 1e12:
-                data['time'] = pd.to_datetime(data['time'], unit='ms')
-            else:
-                data['time'] = pd.to_datetime(data['time'], errors='coerce')
-            
-            # Drop rows with invalid timestamps
-            data = data[data['time'].notna()]
-            
-            # Ensure time is the index for backtrader
-            data.set_index('time', inplace=True)
-        except Exception as e:
-            raise ValueError(f"Failed to process time column: {str(e)}")
+        self.truncated = None
+        monitor = self.early_stop.monitor(self.initial_capital) if self.early_stop else None
 
-        # Create data feed with explicit column mapping
-        data_feed = bt.feeds.PandasData(
-            dataname=data,
-            open=0,
-            high=1,
-            low=2,
-            close=3,
-            volume=4,
-            openinterest=-1
-        )
-        cerebro.adddata(data_feed)
+        if self.engine == 'vector':
+            logger.info("Starting vectorized backtest simulation...")
+            result = run_vector_backtest(data, strategy_cls, strategy_params, self.initial_capital, htf_data,
+                                         early_stop=monitor)
+            self.truncated = monitor.truncation(len(data)) if monitor else None
+            return result
+
+        # Create Cerebro engine
+        if self.fast:
+            cerebro = bt.Cerebro(stdstats=False, preload=True, runonce=True, tradehistory=False)
+        else:
+            cerebro = bt.Cerebro()
+        profiler = SimulationProfiler() if self.profile else None
+        if profiler:
+            strategy_cls = profiler.profile_strategy(strategy_cls)
+            profiler.profile_broker(cerebro.broker)
+        cerebro.addstrategy(strategy_cls, **strategy_params)
+        cerebro.adddata(self._make_feed(data))
+        if htf_data is not None:
+            cerebro.adddata(self._make_feed(htf_data))
 
         # Set initial capital
         cerebro.broker.set_cash(self.initial_capital)
@@ -122,11 +248,16 @@ class GridBacktester(BaseDataHandler):
         cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
         cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
         cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
+        if self.progress:
+            cerebro.addanalyzer(ProgressReporter, callback=self.progress)
+        if monitor:
+            cerebro.addanalyzer(EarlyStop, monitor=monitor)
 
         # Run backtest with error handling
         try:
             logger.info("Starting backtest simulation...")
-            results = cerebro.run()
+            results = profiler.run(cerebro) if profiler else cerebro.run()
+            self.truncated = monitor.truncation(len(data)) if monitor else None
             logger.info("Backtest completed successfully")
             
             # Log trade analysis
@@ -135,9 +266,17 @@ class GridBacktester(BaseDataHandler):
             drawdown_analysis = strat.analyzers.drawdown.get_analysis()
             sharpe_analysis = strat.analyzers.sharpe.get_analysis()
             
-            logger.info(f"Trade analysis: {trade_analysis}")
-            logger.info(f"Drawdown analysis: {drawdown_analysis}")
-            logger.info(f"Sharpe Ratio: {sharpe_analysis}")
+            # Formatting the full analyses is not free; keep them out of fast runs unless debugging
+            log = logger.debug if self.fast else logger.info
+            log("Trade analysis: %s", trade_analysis)
+            log("Drawdown analysis: %s", drawdown_analysis)
+            log("Sharpe Ratio: %s", sharpe_analysis)
+            if profiler:
+                self.profile_summary = profiler.summary()
+                logger.info("Simulation profile (ms per section): %s", {
+                    section: round(stats['total_ms'], 1)
+                    for section, stats in self.profile_summary['sections'].items()
+                })
         except Exception as e:
             logger.error(f"Backtest simulation failed: {str(e)}", exc_info=True)
             raise ValueError(f"Backtest simulation error: {str(e)}")
@@ -146,7 +285,7 @@ class GridBacktester(BaseDataHandler):
         if results:
             strategy = results[0]
             return (
-                strategy.orders,
+                getattr(strategy, 'orders', []),
                 cerebro.broker.getvalue(),
                 trade_analysis,
                 drawdown_analysis,
@@ -154,3 +293,80 @@ class GridBacktester(BaseDataHandler):
             )
 
         return [], 0.0, {}, {}, {}
+
+    def _strategy_spec(self) -> Tuple[type, Dict[str, Any]]:
+        """
+        Strategy class and parameters for the configured strategy_type, with
+        strategy_overrides applied on top (unknown parameter names are rejected).
+        """
+        if self.strategy_type == 'momentum':
+            strategy_cls, strategy_params = IntradayMomentumStrategy, {
+                'stop_loss_perc': self.risk_percent,
+                'take_profit_perc': self.risk_percent * 3  # 3:1 reward ratio
+            }
+        elif self.strategy_type == 'ib_price_action':
+            strategy_cls, strategy_params = IBPriceActionStrategy, {'risk_percent': self.risk_percent, **self.box_params}
+        elif self.strategy_type == 'stoch_mean_reversion':
+            strategy_cls, strategy_params = StochasticMeanReversion, dict(self.box_params)
+        else:
+            # Combine box_params with risk_percent for strategy
+            strategy_cls, strategy_params = BoxMacdRsiStrategy, {**self.box_params, 'risk_percent': self.risk_percent}
+
+        if self.strategy_overrides:
+            unknown = set(self.strategy_overrides) - set(strategy_cls.params._getkeys())
+            if unknown:
+                raise ValueError(f"Unknown parameters for {strategy_cls.__name__}: {sorted(unknown)}")
+            strategy_params.update(self.strategy_overrides)
+        return strategy_cls, strategy_params
+
+    @staticmethod
+    def _as_arrays(data) -> CandleArrays:
+        """
+        CandleArrays view of an OHLCV frame, keeping its float64 values as they are.
+        """
+        if isinstance(data, CandleArrays):
+            return data
+        if 'time' not in data.columns and data.index.name == 'time':
+            data = data.reset_index()
+        return CandleArrays.from_frame(data, dtype=None)
+
+    @staticmethod
+    def _make_feed(data) -> bt.feed.DataBase:
+        """
+        Build a Backtrader feed from CandleArrays or an OHLCV frame with a 'time' column or index.
+        """
+        if isinstance(data, CandleArrays):
+            return CandleArrayData(candles=data)
+
+        # Handle time column
+        if 'time' not in data.columns:
+            if data.index.name == 'time':
+                data = data.reset_index()
+            else:
+                raise ValueError("No time column found in data")
+
+        # Convert time column to datetime
+        try:
+            if data['time'].dtype == 'int64' and data['time'].max() > 1e12:
+                data['time'] = pd.to_datetime(data['time'], unit='ms')
+            else:
+                data['time'] = pd.to_datetime(data['time'], errors='coerce')
+
+            # Drop rows with invalid timestamps
+            data = data[data['time'].notna()]
+
+            # Ensure time is the index for backtrader
+            data.set_index('time', inplace=True)
+        except Exception as e:
+            raise ValueError(f"Failed to process time column: {str(e)}")
+
+        # Create data feed with explicit column mapping
+        return bt.feeds.PandasData(
+            dataname=data,
+            open=0,
+            high=1,
+            low=2,
+            close=3,
+            volume=4,
+            openinterest=-1
+        )
@@ -0,0 +1,340 @@
+# src/indicator_cache.py
+"""
+Process-wide cache of computed indicator arrays, shared across backtest runs.
+
+Entries are keyed by (series fingerprint, indicator name, parameters), so runs
+that only differ in parameters the indicators do not depend on (risk_percent,
+exit multipliers, ...) reuse the arrays instead of recomputing them. The values
+come from vector_indicators, which reproduces Backtrader's results exactly.
+
+Backtrader strategies consume the cache through the Cached* indicators below:
+on a preloaded feed they copy the cached arrays into their lines; otherwise
+(live feeds, preload disabled, cache disabled) they fall back to the stock
+Backtrader indicators. The vectorized strategies call compute_indicator().
+"""
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import backtrader as bt
+import numpy as np
+
+from config import logger, INDICATOR_CACHE_MB
+from src import vector_indicators as vi
+
+SERIES_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+IndicatorKey = Tuple[str, str, Tuple[Tuple[str, Any], ...]]  # (fingerprint, name, sorted params)
+
+
+def series_fingerprint(arrays: Dict[str, np.ndarray]) -> str:
+    """
+    Digest of the OHLCV values of a series (as float64), identifying it in cache keys.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for col in SERIES_COLUMNS:
+        values = np.ascontiguousarray(arrays[col], dtype=np.float64)
+        digest.update(col.encode())
+        digest.update(len(values).to_bytes(8, 'little'))
+        digest.update(values.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Thread-safe LRU cache of indicator outputs (dicts of read-only arrays),
+    bounded by their combined size. A budget of 0 disables caching.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Dict[str, np.ndarray]]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get_or_compute(
+        self,
+        key: IndicatorKey,
+        compute: Callable[[], Dict[str, np.ndarray]]
+    ) -> Dict[str, np.ndarray]:
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return lines
+            self.misses += 1
+
+        lines = compute()
+        for values in lines.values():
+            values.setflags(write=False)
+        size = sum(values.nbytes for values in lines.values())
+        if size > self.max_bytes:
+            return lines
+
+        with self._lock:
+            self._entries[key] = lines
+            self._sizes[key] = size
+            while self.used_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._sizes.pop(evicted, None)
+                logger.debug("Evicted %s from the indicator cache", evicted[1:])
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_indicator_cache = IndicatorCache(INDICATOR_CACHE_MB * 1024 * 1024)
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """
+    The cache shared by every backtest in this process.
+    """
+    return _indicator_cache
+
+
+def _stochastic(a, period, k_smooth, d_smooth, scale_first):
+    lowest_low = vi.lowest(a['low'], period)
+    highest_high = vi.highest(a['high'], period)
+    # Same operand order as the strategy expressions, so the floats match exactly
+    if scale_first:
+        raw_k = 100 * (a['close'] - lowest_low) / (highest_high - lowest_low + 1e-9)
+    else:
+        raw_k = (a['close'] - lowest_low) / (highest_high - lowest_low + 1e-9) * 100
+    k = vi.sma(raw_k, k_smooth)
+    return {'k': k, 'd': vi.sma(k, d_smooth)}
+
+
+# indicator name -> function(arrays, **params) returning its lines as arrays
+INDICATORS: Dict[str, Callable[..., Dict[str, np.ndarray]]] = {
+    'sma': lambda a, period, source='close': {'sma': vi.sma(a[source], period)},
+    'ema': lambda a, period, source='close': {'ema': vi.ema(a[source], period)},
+    'rsi': lambda a, period: {'rsi': vi.rsi(a['close'], period)},
+    'atr': lambda a, period: {'atr': vi.atr(a['high'], a['low'], a['close'], period)},
+    'stddev': lambda a, period: {'stddev': vi.stddev(a['close'], period)},
+    'macd': lambda a, fast, slow, signal: vi.macd(a['close'], fast, slow, signal),
+    'dmi': lambda a, period: vi.directional_movement(a['high'], a['low'], a['close'], period),
+    'stochastic': _stochastic,
+}
+
+
+def compute_indicator(
+    arrays: Dict[str, np.ndarray],
+    name: str,
+    fingerprint: Optional[str] = None,
+    **params
+) -> Dict[str, np.ndarray]:
+    """
+    Lines of indicator `name` over an OHLCV series given as float64 arrays, from
+    the cache when possible. Pass the series_fingerprint() if it is already known.
+    """
+    compute = INDICATORS[name]
+    cache = get_indicator_cache()
+    if not cache.enabled:
+        return compute(arrays, **params)
+    key = (fingerprint or series_fingerprint(arrays), name, tuple(sorted(params.items())))
+    return cache.get_or_compute(key, lambda: compute(arrays, **params))
+
+
+def feed_arrays(data) -> Optional[Dict[str, np.ndarray]]:
+    """
+    OHLCV arrays of a fully preloaded Backtrader feed, or None if the feed is not
+    preloaded (live data, preload=False or exactbars memory saving).
+    """
+    if not isinstance(data, bt.AbstractDataBase):
+        return None
+    close = data.lines.close
+    if close.mode != bt.linebuffer.LineBuffer.UnBounded or not len(close.array) or data.islive():
+        return None
+    return {col: np.array(getattr(data.lines, col).array, dtype=np.float64) for col in SERIES_COLUMNS}
+
+
+def feed_series(data) -> Optional[Tuple[Dict[str, np.ndarray], str]]:
+    """
+    feed_arrays() of a preloaded feed and their series_fingerprint(), computed
+    once per feed and memoized on it, so every cached indicator on the feed
+    shares one copy instead of copying and hashing the series again.
+    """
+    memo = getattr(data, '_indicator_series', None)
+    # A reset feed gets new line buffers, so the memo is only valid for the buffer it was taken from
+    if memo is not None and memo[0] is data.lines.close.array and memo[1] == len(memo[0]):
+        return memo[2], memo[3]
+    arrays = feed_arrays(data)
+    if arrays is None:
+        return None
+    for values in arrays.values():
+        values.setflags(write=False)
+    fingerprint = series_fingerprint(arrays)
+    data._indicator_series = (data.lines.close.array, len(arrays['close']), arrays, fingerprint)
+    return arrays, fingerprint
+
+
+class CachedIndicator(bt.Indicator):
+    """
+    Base for indicators served from the indicator cache. Subclasses name their
+    INDICATORS entry (`indicator`), declare the lines they expose and implement
+    fallback() with the equivalent stock Backtrader indicators.
+    """
+
+    indicator = None
+
+    def __init__(self):
+        self._values = None
+        series = feed_series(self.data) if get_indicator_cache().enabled else None
+        if series is None:
+            self.fallback()
+            return
+
+        arrays, fingerprint = series
+        lines = compute_indicator(arrays, self.indicator, fingerprint=fingerprint, **self.p._getkwargs())
+        self._values = [lines[alias] for alias in self.lines.getlinealiases()]
+        # Each line becomes usable where its first value is, as with the stock indicator
+        for line, values in zip(self.lines, self._values):
+            line.updateminperiod(vi.first_valid(values) + 1)
+
+    def fallback(self) -> None:
+        raise NotImplementedError
+
+    def _copy(self, start: int, end: int) -> None:
+        if self._values is None:
+            return
+        for line, values in zip(self.lines, self._values):
+            line.array[start:end] = array('d', values[start:end].tolist())
+
+    def _set(self) -> None:
+        if self._values is None:
+            return
+        i = len(self) - 1
+        for line, values in zip(self.lines, self._values):
+            line[0] = values[i]
+
+    def preonce(self, start, end):
+        self._copy(start, end)
+
+    def once(self, start, end):
+        self._copy(start, end)
+
+    def prenext(self):
+        self._set()
+
+    def next(self):
+        self._set()
+
+
+class CachedSMA(CachedIndicator):
+    indicator = 'sma'
+    lines = ('sma',)
+    params = (('period', 30), ('source', 'close'))
+
+    def fallback(self):
+        self.lines.sma = bt.indicators.SMA(getattr(self.data, self.p.source), period=self.p.period)
+
+
+class CachedEMA(CachedIndicator):
+    indicator = 'ema'
+    lines = ('ema',)
+    params = (('period', 30), ('source', 'close'))
+
+    def fallback(self):
+        self.lines.ema = bt.indicators.EMA(getattr(self.data, self.p.source), period=self.p.period)
+
+
+class CachedRSI(CachedIndicator):
+    indicator = 'rsi'
+    lines = ('rsi',)
+    params = (('period', 14),)
+
+    def fallback(self):
+        self.lines.rsi = bt.indicators.RSI(self.data.close, period=self.p.period)
+
+
+class CachedATR(CachedIndicator):
+    indicator = 'atr'
+    lines = ('atr',)
+    params = (('period', 14),)
+
+    def fallback(self):
+        self.lines.atr = bt.indicators.ATR(self.data, period=self.p.period)
+
+
+class CachedStdDev(CachedIndicator):
+    indicator = 'stddev'
+    lines = ('stddev',)
+    params = (('period', 20),)
+
+    def fallback(self):
+        self.lines.stddev = bt.indicators.StdDev(self.data.close, period=self.p.period)
+
+
+class CachedMACD(CachedIndicator):
+    indicator = 'macd'
+    lines = ('macd', 'signal')
+    params = (('fast', 12), ('slow', 26), ('signal', 9))
+
+    def fallback(self):
+        macd = bt.indicators.MACD(self.data.close, period_me1=self.p.fast,
+                                  period_me2=self.p.slow, period_signal=self.p.signal)
+        self.lines.macd = macd.macd
+        self.lines.signal = macd.signal
+
+
+class CachedDMI(CachedIndicator):
+    indicator = 'dmi'
+    lines = ('plusDI', 'minusDI', 'adx', 'adxr')
+    params = (('period', 14),)
+
+    def fallback(self):
+        dmi = bt.indicators.DirectionalMovement(self.data, period=self.p.period)
+        self.lines.plusDI = dmi.plusDI
+        self.lines.minusDI = dmi.minusDI
+        self.lines.adx = dmi.adx
+        self.lines.adxr = dmi.adxr
+
+
+class CachedStochastic(CachedIndicator):
+    """
+    %K smoothed by k_smooth and %D, over the raw stochastic of `period` bars.
+    scale_first picks the operand order of the raw value (100 * x / y vs x / y * 100).
+    """
+    indicator = 'stochastic'
+    lines = ('k', 'd')
+    params = (('period', 14), ('k_smooth', 3), ('d_smooth', 3), ('scale_first', False))
+
+    def fallback(self):
+        lowest_low = bt.indicators.Lowest(self.data.low, period=self.p.period)
+        highest_high = bt.indicators.Highest(self.data.high, period=self.p.period)
+        if self.p.scale_first:
+            raw_k = 100 * (self.data.close - lowest_low) / (highest_high - lowest_low + 1e-9)
+        else:
+            raw_k = (self.data.close - lowest_low) / (highest_high - lowest_low + 1e-9) * 100
+        k = bt.indicators.SMA(raw_k, period=self.p.k_smooth)
+        self.lines.k = k
+        self.lines.d = bt.indicators.SMA(k, period=self.p.d_smooth)
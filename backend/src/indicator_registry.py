@@ -0,0 +1,51 @@
+# src/indicator_registry.py
+"""
+Registry of the indicators built over each data feed, so a strategy asking for
+the same indicator twice (directly or through another indicator's parameters
+coinciding) gets the existing instance instead of a second copy of its lines.
+
+Strategies build their indicators with shared_indicator(cls, data, **params).
+Entries live on the data feed (or line) they were built over and are keyed by
+their owner as well: an indicator is only updated by the strategy or indicator
+that created it, so instances are never handed across owners. Computed values
+are already shared across strategies and runs by the indicator cache.
+"""
+from typing import Any, Dict, Tuple
+
+import backtrader as bt
+from backtrader.metabase import findowner
+
+from config import logger
+
+RegistryKey = Tuple[Any, type, Tuple[Tuple[str, Any], ...]]  # (owner, indicator class, sorted params)
+
+
+def indicator_registry(data) -> Dict[RegistryKey, bt.Indicator]:
+    """
+    The indicators registered over `data`, created on first use.
+    """
+    registry = getattr(data, '_indicator_registry', None)
+    if registry is None:
+        registry = {}
+        data._indicator_registry = registry
+    return registry
+
+
+def shared_indicator(cls: type, data, **params) -> bt.Indicator:
+    """
+    Indicator `cls` over `data` with `params`, reusing the instance the calling
+    strategy (or indicator) already built with the same effective parameters.
+    Must be called from the owner's __init__, like any Backtrader indicator.
+    """
+    owner = findowner(None, bt.LineIterator)
+    effective = dict(cls.params._getitems())
+    effective.update(params)
+    key = (owner, cls, tuple(sorted(effective.items())))
+
+    registry = indicator_registry(data)
+    indicator = registry.get(key)
+    if indicator is None:
+        indicator = registry[key] = cls(data, **params)
+    else:
+        logger.debug("Reusing %s%s over the same data", cls.__name__, key[2])
+    return indicator
@@ -0,0 +1,243 @@
+# src/job_queue.py
+"""
+Asynchronous jobs for the REST API: long backtests run in a bounded pool of
+worker processes instead of the request thread.
+
+Jobs are recorded in a local SQLite database (JobStore). Submitting inserts a
+'queued' row and hands the job id to the pool; the worker claims the row
+('running'), reports progress into it and finally stores the JSON result
+('done') or the error ('failed'). Because the queue lives in the database, a
+restarted server picks the unfinished jobs up again (JobQueue.resume()), and
+every process can read a job's state without going through the parent.
+"""
+import json
+import sqlite3
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from config import logger
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# handler(params, progress) -> JSON-serializable result; progress(fraction, message=None)
+JobHandler = Callable[[Dict[str, Any], Callable[..., None]], Dict[str, Any]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+class JobStore:
+    """
+    Job records in a SQLite file, safe to use from several processes: every
+    call opens its own short-lived connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, sql: str, args: tuple = ()) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, args).rowcount
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, args: tuple = ()) -> List[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+    def create(self, kind: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params, default=str), QUEUED, time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._as_dict(rows[0], with_result) if rows else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Most recent jobs first, without their results.
+        """
+        if status:
+            rows = self._query("SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit))
+        else:
+            rows = self._query("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._as_dict(row) for row in rows]
+
+    def queued_ids(self) -> List[str]:
+        return [row['id'] for row in self._query("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,))]
+
+    def claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Move a queued job to running; None if it was cancelled or claimed already.
+        """
+        claimed = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, QUEUED),
+        )
+        return self.get(job_id) if claimed else None
+
+    def set_progress(self, job_id: str, fraction: float, message: Optional[str] = None) -> None:
+        self._execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ? AND status = ?",
+            (min(max(float(fraction), 0.0), 1.0), message, job_id, RUNNING),
+        )
+
+    def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, progress = 1, result = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (DONE, json.dumps(result, default=str), time.time(), job_id, RUNNING),
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+            (FAILED, error, time.time(), job_id, QUEUED, RUNNING),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started yet.
+        """
+        return bool(self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        ))
+
+    def requeue_interrupted(self) -> int:
+        """
+        Put jobs left running by a stopped server back in the queue.
+        """
+        return self._execute(
+            "UPDATE jobs SET status = ?, progress = 0, message = NULL, started_at = NULL WHERE status = ?",
+            (QUEUED, RUNNING),
+        )
+
+    @staticmethod
+    def _as_dict(row: sqlite3.Row, with_result: bool = False) -> Dict[str, Any]:
+        job = {key: row[key] for key in row.keys() if key != 'result'}
+        job['params'] = json.loads(row['params'])
+        if with_result:
+            job['result'] = json.loads(row['result']) if row['result'] is not None else None
+        return job
+
+
+def _run_job(db_path: str, job_id: str, handler: JobHandler) -> None:
+    """
+    Worker-process side of a job: claim it, run its handler, store the outcome.
+    """
+    store = JobStore(db_path)
+    job = store.claim(job_id)
+    if job is None:
+        return
+
+    def progress(fraction: float, message: Optional[str] = None) -> None:
+        store.set_progress(job_id, fraction, message)
+
+    logger.info("Running %s job %s", job['kind'], job_id)
+    try:
+        result = handler(job['params'], progress)
+    except Exception as e:
+        logger.error(f"{job['kind']} job {job_id} failed: {str(e)}", exc_info=True)
+        store.fail(job_id, str(e))
+        return
+    store.finish(job_id, result)
+    logger.info("Finished %s job %s", job['kind'], job_id)
+
+
+class JobQueue:
+    """
+    Submits jobs of the registered kinds to a pool of `max_workers` processes,
+    started on first use.
+    """
+
+    def __init__(self, db_path: str, handlers: Dict[str, JobHandler], max_workers: int = 2):
+        self.store = JobStore(db_path)
+        self.handlers = handlers
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}. Choose from {sorted(self.handlers)}")
+        job_id = self.store.create(kind, params)
+        self._dispatch(job_id, kind)
+        return self.store.get(job_id)
+
+    def resume(self) -> int:
+        """
+        Re-submit the jobs persisted as queued (or interrupted while running),
+        e.g. after a restart. Returns how many were re-submitted.
+        """
+        interrupted = self.store.requeue_interrupted()
+        if interrupted:
+            logger.warning("Re-queueing %d job(s) interrupted by a restart", interrupted)
+        job_ids = self.store.queued_ids()
+        for job_id in job_ids:
+            self._dispatch(job_id, self.store.get(job_id)['kind'])
+        return len(job_ids)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _dispatch(self, job_id: str, kind: str) -> None:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            self.store.fail(job_id, f"Unknown job kind: {kind}")
+            return
+        try:
+            future = self._pool().submit(_run_job, self.store.path, job_id, handler)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool
+            logger.warning("Job worker pool broken, restarting it")
+            self._executor = None
+            future = self._pool().submit(_run_job, self.store.path, job_id, handler)
+        future.add_done_callback(lambda done: self._check_worker(job_id, done))
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _check_worker(self, job_id: str, future: Future) -> None:
+        # Handler errors are stored by _run_job; this catches the worker process itself dying
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            logger.error("Job %s lost its worker: %s", job_id, error)
+            self.store.fail(job_id, f"Worker error: {error}")
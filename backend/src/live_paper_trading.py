@@ -11,6 +11,7 @@ from src.data_handler.live_data_websocket import LiveDataWebSocketHandler
 from src.data_handler.exchange_live_feed import ExchangeLiveData
 from src.trading_strategy import BoxMacdRsiStrategy
 from src.data_handler.base_data_handler import BaseDataHandler
+from src.data_handler.bulk_downloader import BulkDownloader
 
 class LivePaperTrading:
     """
@@ -38,9 +39,12 @@ class LivePaperTrading:
             strategy_kwargs.update(self.strategy_params)
         self.cerebro.addstrategy(self.strategy, **strategy_kwargs)
 
-        # 1) Fetch, store, and queue historical data before starting
+        # 1) Fetch all symbols concurrently, then store and queue historical data before starting
+        downloaded = BulkDownloader(self.data_handler).download(
+            [(symbol, interval) for symbol in self.symbols], start_time, end_time
+        )
         for symbol in self.symbols:
-            df = self.data_handler.fetch_historical_data(symbol, interval, start_time, end_time)
+            df = downloaded.get((symbol, interval))
             if df is None or df.empty:
                 continue
 
@@ -0,0 +1,166 @@
+# src/monte_carlo.py
+"""
+Monte Carlo robustness analysis of a backtest's closed trades.
+
+calculate_advanced_metrics() scores the one sequence of trades a backtest
+happened to produce. run_monte_carlo() replays that sequence many times:
+resampled with replacement ('bootstrap') or reordered ('shuffle'), optionally
+with every trade charged a random slippage cost, and returns the distributions
+of final equity, max drawdown and Sharpe ratio across the paths. A result whose
+realized metrics sit in the tail of these distributions owes a lot to the
+order or the exact fills of its trades.
+
+All paths are computed at once as (iterations x trades) NumPy matrices, in
+chunks of at most CHUNK_ELEMENTS values to bound memory. The metrics are the
+ones calculate_advanced_metrics() reports: equity from the initial capital plus
+the cumulated trade profits, drawdown from the running peak (starting at the
+initial capital) and the Sharpe ratio of the per-trade returns on the initial
+capital.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import logger
+
+METHODS = ('bootstrap', 'shuffle')
+METRICS = ('final_equity', 'max_drawdown', 'sharpe_ratio')
+
+# Values per simulated matrix chunk (about 16 MB of float64)
+CHUNK_ELEMENTS = 2_000_000
+
+
+def trade_arrays(orders: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Profit and notional (entry price x size) of each closed trade in a
+    stored simulation's orders, in the order they closed.
+    """
+    trades = [order for order in orders if order.get('profit') is not None]
+    profits = np.array([float(order['profit']) for order in trades], dtype=np.float64)
+    notionals = np.array([abs(float(order.get('price') or 0.0) * float(order.get('size') or 0.0))
+                          for order in trades], dtype=np.float64)
+    return profits, notionals
+
+
+def path_metrics(profits: np.ndarray, initial_capital: float) -> Dict[str, np.ndarray]:
+    """
+    Final equity, max drawdown (fraction of the peak), Sharpe ratio and whether
+    the equity ever reached zero, for each row of a (paths x trades) matrix.
+    """
+    equity = np.cumsum(profits, axis=1)
+    equity += initial_capital
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, initial_capital, out=peak)
+    # Drawdown (peak - equity) / peak, i.e. 1 - equity / peak, computed in place
+    drawdown = 1.0 - np.divide(equity, peak, out=peak).min(axis=1)
+
+    # Returns on the initial capital share its Sharpe ratio with the plain profits
+    std = profits.std(axis=1)
+    sharpe = np.divide(profits.mean(axis=1), std, out=np.zeros(len(profits)), where=std != 0)
+    return {
+        'final_equity': equity[:, -1],
+        'max_drawdown': np.maximum(drawdown, 0.0),
+        'sharpe_ratio': sharpe,
+        'ruined': equity.min(axis=1) <= 0,
+    }
+
+
+def _distribution(values: np.ndarray, realized: float, percentiles: Sequence[float], bins: int) -> Dict[str, Any]:
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 1e-9 * max(1.0, abs(high)):
+        bins = 1  # constant up to rounding (e.g. final equity of shuffled trades)
+    counts, edges = np.histogram(values, bins=bins, range=(low, high))
+    return {
+        'realized': realized,
+        # Share of the paths (%) at or below the realized value
+        'realized_percentile': float(np.count_nonzero(values <= realized) / len(values) * 100.0),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': low,
+        'max': high,
+        'percentiles': {f"{p:g}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))},
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+    }
+
+
+def run_monte_carlo(
+    orders: List[Dict[str, Any]],
+    initial_capital: float,
+    iterations: int = 10_000,
+    method: str = 'bootstrap',
+    slippage_bps: float = 0.0,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    bins: int = 50
+) -> Dict[str, Any]:
+    """
+    Distributions of final equity, max drawdown and Sharpe ratio over
+    `iterations` simulated sequences of the closed trades in `orders`.
+
+    :param method: 'bootstrap' draws each path's trades with replacement;
+        'shuffle' reorders the realized trades (final equity and, without
+        slippage, the Sharpe ratio are then the same on every path).
+    :param slippage_bps: Mean slippage per fill in basis points of the trade's
+        notional. Each trade pays for its entry and exit fill, a cost drawn
+        uniformly between 0 and four times slippage_bps. 0 disables it.
+    :param seed: Seed of the random generator, for reproducible results.
+    :return: Dictionary with one distribution per metric, the probability of
+        ending below the initial capital and of the equity reaching zero.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method {method!r}, expected one of {METHODS}")
+    if iterations < 1:
+        raise ValueError(f"Monte Carlo iterations must be positive, got {iterations}")
+    if initial_capital <= 0:
+        raise ValueError(f"Initial capital must be positive, got {initial_capital}")
+    if slippage_bps < 0:
+        raise ValueError(f"Slippage must not be negative, got {slippage_bps}")
+
+    profits, notionals = trade_arrays(orders)
+    n_trades = len(profits)
+    if n_trades == 0:
+        raise ValueError("The backtest has no closed trades to resample")
+    if slippage_bps and not notionals.any():
+        # Results stored before trades recorded their entry size
+        raise ValueError("The backtest's trades have no entry size, so slippage cannot be applied; re-run it")
+
+    rng = np.random.default_rng(seed)
+    fill_cost = notionals * (slippage_bps / 10_000.0)
+    chunk_rows = max(1, CHUNK_ELEMENTS // n_trades)
+    results = {name: np.empty(iterations) for name in METRICS}
+    results['ruined'] = np.empty(iterations, dtype=bool)
+
+    for start in range(0, iterations, chunk_rows):
+        rows = min(chunk_rows, iterations - start)
+        if slippage_bps:
+            # Entry and exit fill: on average twice the mean slippage per trade
+            slippage = rng.uniform(0.0, 4.0, size=(rows, n_trades))
+        if method == 'bootstrap':
+            index = rng.integers(0, n_trades, size=(rows, n_trades))
+            paths = profits[index]
+            if slippage_bps:
+                paths -= fill_cost[index] * slippage
+        else:
+            paths = profits - fill_cost * slippage if slippage_bps else np.broadcast_to(profits, (rows, n_trades))
+            # Every trade keeps its own slippage draw wherever the shuffle moves it
+            paths = rng.permuted(paths, axis=1)
+        for name, values in path_metrics(paths, initial_capital).items():
+            results[name][start:start + rows] = values
+
+    realized = {name: float(values[0])
+                for name, values in path_metrics(profits[np.newaxis, :], initial_capital).items()
+                if name != 'ruined'}
+    logger.info("Monte Carlo: %d %s paths over %d trades (slippage %g bps)",
+                iterations, method, n_trades, slippage_bps)
+
+    return {
+        'method': method,
+        'iterations': iterations,
+        'trades': n_trades,
+        'slippage_bps': slippage_bps,
+        'seed': seed,
+        'initial_capital': initial_capital,
+        **{name: _distribution(results[name], realized[name], percentiles, bins) for name in METRICS},
+        'probability_of_loss': float(np.count_nonzero(results['final_equity'] < initial_capital) / iterations),
+        'probability_of_ruin': float(np.count_nonzero(results['ruined']) / iterations),
+    }
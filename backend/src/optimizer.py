@@ -0,0 +1,283 @@
+# src/optimizer.py
+"""
+Parameter sweeps over GridBacktester.
+
+The OHLCV series (and the higher-timeframe series, if any) is loaded once in the
+parent process and handed to each worker process once, through the pool
+initializer. Every combination then runs against that shared copy, so nothing is
+fetched per run.
+"""
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import logger, OPTIMIZER_WORKERS
+from src.data_handler.candle_arrays import CandleArrays
+from src.early_stop import EarlyStopRules
+from src.grid_backtester import GridBacktester
+
+# objective name -> True when higher scores are better
+OBJECTIVES = {
+    'sharpe': True,
+    'net_profit': True,
+    'max_drawdown': False,
+}
+
+# Candles handed to this worker process by _init_worker
+_WORKER_DATA: Dict[str, Any] = {}
+
+
+def grid_search(param_grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Every combination of the listed values, e.g. {'a': [1, 2], 'b': [3]} ->
+    [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}].
+    """
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def random_search(space: Dict[str, Any], n_iter: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    `n_iter` samples from a search space. A list is sampled as a choice; a dict
+    {'low': ..., 'high': ...} as a uniform range (integers when both bounds are ints).
+    """
+    rng = random.Random(seed)
+
+    def sample(values):
+        if isinstance(values, dict):
+            low, high = values['low'], values['high']
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(list(values))
+
+    return [{name: sample(values) for name, values in space.items()} for _ in range(n_iter)]
+
+
+def _init_worker(data, htf_data) -> None:
+    _WORKER_DATA['data'] = data
+    _WORKER_DATA['htf_data'] = htf_data
+
+
+def slice_window(data, htf_data, start: int, stop: int) -> Tuple[Any, Any]:
+    """
+    Rows start..stop-1 of a DataFrame or CandleArrays series, and the higher
+    timeframe candles that fall within the same time span.
+    """
+    if isinstance(data, CandleArrays):
+        part = data.rows(start, stop)
+        first, last = int(part.time[0]), int(part.time[-1])
+    else:
+        part = data.iloc[start:stop].reset_index(drop=True)
+        first, last = part['time'].iloc[0], part['time'].iloc[-1]
+
+    if htf_data is None:
+        return part, None
+    if isinstance(htf_data, CandleArrays):
+        return part, htf_data.window(first, last)
+    mask = (htf_data['time'] >= first) & (htf_data['time'] <= last)
+    return part, htf_data[mask].reset_index(drop=True)
+
+
+def _run_combination(
+    index: int,
+    params: Dict[str, Any],
+    settings: Dict[str, Any],
+    window: Optional[Tuple[int, int]] = None
+) -> Dict[str, Any]:
+    """
+    Backtest one parameter combination against the candles held by this worker,
+    or against rows window[0]..window[1]-1 of them. Failures are reported in the
+    result instead of being raised.
+    """
+    result = {'index': index, 'params': params}
+    if window is not None:
+        result['window'] = list(window)
+    try:
+        data, htf_data = _WORKER_DATA['data'], _WORKER_DATA['htf_data']
+        if window is not None:
+            data, htf_data = slice_window(data, htf_data, *window)
+
+        backtester = GridBacktester(
+            settings['symbol'],
+            settings['interval'],
+            settings['initial_capital'],
+            settings['risk_percent'],
+            settings['box_params'],
+            settings['strategy_type'],
+            htf_interval=settings['htf_interval'],
+            engine=settings['engine'],
+            strategy_overrides=params,
+            fast=True,
+            early_stop=settings.get('early_stop'),
+        )
+        backtester.store_data(settings['symbol'], data)
+        if htf_data is not None:
+            backtester.store_data(backtester.htf_key, htf_data)
+
+        _, final_value, trades, drawdown, sharpe = backtester.simulate()
+        result.update({
+            'final_value': final_value,
+            'net_profit': final_value - settings['initial_capital'],
+            'sharpe': sharpe.get('sharperatio'),
+            'max_drawdown': drawdown['max']['drawdown'],
+            'trades': trades.get('total', {}).get('total', 0),
+            'truncated': backtester.truncated,
+        })
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class ParameterOptimizer:
+    """
+    Runs a list of parameter combinations for one symbol/strategy over a process
+    pool and ranks them by an objective ('sharpe', 'net_profit' or 'max_drawdown').
+
+    Combination keys are strategy parameters (see the strategy's `params`); they
+    are applied on top of the usual box_params/risk_percent mapping.
+
+    Used as a context manager the process pool stays up across calls, so several
+    batches of runs (e.g. walk-forward windows) share one set of workers.
+
+    With `early_stop` rules (see src.early_stop) hopeless runs end as soon as a
+    rule trips; their results carry a 'truncated' entry and rank after the runs
+    that completed.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        initial_capital: float,
+        risk_percent: float,
+        box_params: Optional[Dict[str, Any]] = None,
+        strategy_type: str = 'grid',
+        htf_interval: Optional[str] = None,
+        objective: str = 'sharpe',
+        engine: str = 'vector',
+        max_workers: Optional[int] = None,
+        early_stop: Optional[Dict[str, Any]] = None
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}. Choose from {sorted(OBJECTIVES)}")
+        self.objective = objective
+        early_stop_rules = EarlyStopRules.from_dict(early_stop)
+        self.max_workers = max_workers or OPTIMIZER_WORKERS
+        self.settings = {
+            'symbol': symbol,
+            'interval': interval,
+            'initial_capital': initial_capital,
+            'risk_percent': risk_percent,
+            'box_params': box_params or {},
+            'strategy_type': strategy_type,
+            'htf_interval': htf_interval,
+            'engine': engine,
+            'early_stop': early_stop_rules.as_dict() if early_stop_rules else None,
+        }
+        self.data = None
+        self.htf_data = None
+        self._executor = None
+        self._depth = 0
+
+    def __enter__(self) -> "ParameterOptimizer":
+        if self.data is None:
+            self.load_data()
+        if self._depth == 0 and self.max_workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(self.data, self.htf_data))
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _backtester(self, overrides: Optional[Dict[str, Any]] = None) -> GridBacktester:
+        s = self.settings
+        return GridBacktester(
+            s['symbol'], s['interval'], s['initial_capital'], s['risk_percent'], s['box_params'],
+            s['strategy_type'], htf_interval=s['htf_interval'], engine=s['engine'],
+            strategy_overrides=overrides,
+        )
+
+    def load_data(self, start_time: int = None, end_time: int = None) -> None:
+        """
+        Fetch the candles once for all runs.
+        """
+        backtester = self._backtester()
+        backtester.fetch_and_store_data(start_time, end_time)
+        self.data = backtester.get_stored_data(self.settings['symbol'])
+        if self.data is None or self.data.empty:
+            raise ValueError(f"No historical data found for symbol: {self.settings['symbol']}")
+        if self.settings['htf_interval']:
+            self.htf_data = backtester.get_stored_data(backtester.htf_key)
+
+    def iter_results(self, combinations: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each run's result as soon as it completes (not in submission order).
+        """
+        return self.iter_runs([{'params': params} for params in combinations])
+
+    def iter_runs(self, runs: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Like iter_results, for runs given as {'params': ..., 'window': (start, stop)}
+        where the optional window restricts the run to those rows of the series.
+        A result's 'index' is the position of its run in `runs`.
+        """
+        if self.data is None:
+            self.load_data()
+        if runs:
+            # Reject unknown parameter names before fanning out
+            self._backtester(runs[0]['params'])._strategy_spec()
+
+        logger.info("Optimizing %s over %d runs with %d workers (objective: %s)",
+                    self.settings['symbol'], len(runs), self.max_workers, self.objective)
+
+        if self.max_workers <= 1:
+            _init_worker(self.data, self.htf_data)
+            for index, run in enumerate(runs):
+                yield self._score(_run_combination(index, run['params'], self.settings, run.get('window')))
+            return
+
+        with self:
+            yield from self._submit(self._executor, runs)
+
+    def _submit(self, executor: ProcessPoolExecutor, runs: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        futures = [executor.submit(_run_combination, index, run['params'], self.settings, run.get('window'))
+                   for index, run in enumerate(runs)]
+        for future in as_completed(futures):
+            yield self._score(future.result())
+
+    def run(self, combinations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run every combination and return the results ranked best first.
+        """
+        return self.rank(list(self.iter_results(combinations)))
+
+    def rank(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sort results best first; runs stopped early come after the complete
+        ones, failed runs and runs without a score go last.
+        """
+        maximize = OBJECTIVES[self.objective]
+
+        def key(result):
+            score = result.get('score')
+            if score is None:
+                return (2, 0.0)
+            return (1 if result.get('truncated') else 0, -score if maximize else score)
+
+        ranked = sorted(results, key=key)
+        for rank, result in enumerate(ranked, start=1):
+            result['rank'] = rank
+        return ranked
+
+    def _score(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        score = result.get(self.objective)
+        result['score'] = score if score is not None and not math.isnan(score) else None
+        return result
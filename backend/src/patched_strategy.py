@@ -3,6 +3,9 @@ import datetime
 import numpy as np
 from typing import List, Dict, Any
 
+from src.indicator_cache import CachedATR, CachedEMA, CachedSMA
+from src.indicator_registry import shared_indicator
+
 class PatchedIBPriceActionStrategy(bt.Strategy):
     """
     Inside Bar Price Action Strategy with datetime compatibility fix
@@ -27,9 +30,9 @@ class PatchedIBPriceActionStrategy(bt.Strategy):
         self.shortEntryOrder = None
 
         # Initialize indicators
-        self.ema = bt.indicators.EMA(self.data.close, period=200)
-        self.atr = bt.indicators.ATR(self.data, period=self.p.atrLength)
-        self.volSMA = bt.indicators.SMA(self.data.volume, period=20)
+        self.ema = shared_indicator(CachedEMA, self.data, period=200)
+        self.atr = shared_indicator(CachedATR, self.data, period=self.p.atrLength)
+        self.volSMA = shared_indicator(CachedSMA, self.data, period=20, source='volume')
 
         # Patch for datetime issue
         self._datetime = None
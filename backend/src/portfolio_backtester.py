@@ -0,0 +1,280 @@
+# src/portfolio_backtester.py
+"""
+Portfolio mode: one strategy over a basket of symbols in a single Cerebro run,
+trading from one broker (shared cash).
+
+Every symbol gets its own instance of the strategy (a "leg") bound to that
+symbol's feed only (plus its higher-timeframe feed), so a leg's per-bar work
+does not grow with the size of the basket: Cerebro hands every strategy all
+feeds by default, and a strategy clocks itself over all of them. Legs skip the
+steps where their own feed did not advance, so symbols with different
+histories can be mixed. Cerebro runs with the fast settings (array feeds,
+runonce, no observers) and no per-leg analyzers; trades are aggregated in one
+TradeAnalyzer and the drawdown/Sharpe analyses are computed from the
+portfolio value recorded at every step.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import backtrader as bt
+import numpy as np
+
+from config import logger, PORTFOLIO_LOAD_WORKERS
+from src.data_handler.array_feed import EPOCH_DATENUM, MS_PER_DAY
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.timeframes import resample_ohlcv, timeframe_to_ms
+from src.grid_backtester import GridBacktester
+from src.vector_engine import drawdown_analysis, sharpe_analysis
+
+
+def trade_analysis_host() -> SimpleNamespace:
+    """
+    Stand-in for a bt.analyzers.TradeAnalyzer instance: feed it trades with
+    bt.analyzers.TradeAnalyzer.notify_trade(host, trade), read host.rets.
+    """
+    host = SimpleNamespace()
+    bt.analyzers.TradeAnalyzer.create_analysis(host)
+    return host
+
+
+class PortfolioBook:
+    """
+    Portfolio-wide records of a run: every leg's trades (aggregated and per
+    symbol) and the broker value at every step.
+    """
+
+    def __init__(self, symbols: Sequence[str]):
+        self.trades = trade_analysis_host()
+        self.symbol_trades = {symbol: trade_analysis_host() for symbol in symbols}
+        self.datenums: List[float] = []
+        self.values: List[float] = []
+
+    def record_trade(self, symbol: str, trade: bt.Trade) -> None:
+        bt.analyzers.TradeAnalyzer.notify_trade(self.trades, trade)
+        bt.analyzers.TradeAnalyzer.notify_trade(self.symbol_trades[symbol], trade)
+
+    def record_value(self, datenum: float, value: float) -> None:
+        self.datenums.append(datenum)
+        self.values.append(value)
+
+    def times(self) -> np.ndarray:
+        """
+        Recorded step times as epoch ms.
+        """
+        return np.rint((np.asarray(self.datenums) - EPOCH_DATENUM) * MS_PER_DAY).astype(np.int64)
+
+
+class PortfolioRecorder(bt.Strategy):
+    """
+    Non-trading strategy recording the portfolio value at every step.
+    """
+    params = (('book', None),)
+
+    def prenext(self):
+        # Runs until every feed has started; the portfolio is valued all the same
+        self.p.book.record_value(self.datetime[0], self.broker.getvalue())
+
+    def next(self):
+        self.p.book.record_value(self.datetime[0], self.broker.getvalue())
+
+
+class _LegMeta(type(bt.Strategy)):
+    def donew(cls, *args, **kwargs):
+        # Cerebro passes every feed of the run first; keep only the leg's own
+        args = tuple(cls._feeds) + tuple(arg for arg in args if not isinstance(arg, bt.AbstractDataBase))
+        return super().donew(*args, **kwargs)
+
+
+class _PortfolioLeg:
+    """
+    Mixin turning a strategy class into one symbol's leg of a portfolio run (see
+    portfolio_leg()): runs only on the steps its feed advanced, reports its
+    trades to the book and caps its position at max_position_pct of the
+    portfolio value.
+    """
+    symbol = None
+    book = None
+    max_position_pct = None
+    _feeds = ()
+
+    def _advanced(self) -> bool:
+        bars = len(self.data)
+        if bars == getattr(self, '_bars_seen', 0):
+            return False
+        self._bars_seen = bars
+        return True
+
+    def _next(self):
+        if self._advanced():
+            super()._next()
+
+    def _oncepost(self, dt):
+        if self._advanced():
+            super()._oncepost(dt)
+
+    def notify_trade(self, trade):
+        super().notify_trade(trade)
+        self.book.record_trade(self.symbol, trade)
+
+    def _limit_size(self, data, size, price, sign: int) -> float:
+        """
+        Largest part of an order of `size` (sign +1 buy, -1 sell) that keeps the
+        position within max_position_pct of the portfolio value. Orders that
+        reduce the position are never cut.
+        """
+        data = data if data is not None else self.data
+        size = abs(size if size is not None else self.getsizing(data, isbuy=sign > 0))
+        if not self.max_position_pct or not size:
+            return size
+        price = price or data.close[0]
+        max_units = self.broker.getvalue() * self.max_position_pct / 100.0 / price
+        current = self.getposition(data).size
+        target = min(max(current + sign * size, -max_units), max_units)
+        allowed = min(size, max(sign * (target - current), 0.0))
+        if allowed < size:
+            logger.debug("%s: order of %s cut to %s by the position limit", self.symbol, size, allowed)
+        return allowed
+
+    def buy(self, data=None, size=None, price=None, parent=None, transmit=True, **kwargs):
+        # Bracket children (parent set) and held parents (transmit=False) are sized by their bracket
+        if parent is None and transmit:
+            size = self._limit_size(data, size, price, 1)
+        return super().buy(data=data, size=size, price=price, parent=parent, transmit=transmit, **kwargs)
+
+    def sell(self, data=None, size=None, price=None, parent=None, transmit=True, **kwargs):
+        if parent is None and transmit:
+            size = self._limit_size(data, size, price, -1)
+        return super().sell(data=data, size=size, price=price, parent=parent, transmit=transmit, **kwargs)
+
+    def buy_bracket(self, data=None, size=None, price=None, **kwargs):
+        size = self._limit_size(data, size, price, 1)
+        return super().buy_bracket(data=data, size=size, price=price, **kwargs) if size else None
+
+    def sell_bracket(self, data=None, size=None, price=None, **kwargs):
+        size = self._limit_size(data, size, price, -1)
+        return super().sell_bracket(data=data, size=size, price=price, **kwargs) if size else None
+
+
+def portfolio_leg(strategy_cls: type, symbol: str, feeds: Sequence[bt.AbstractDataBase], book: PortfolioBook,
+                  max_position_pct: Optional[float] = None) -> type:
+    """
+    Subclass of `strategy_cls` trading `symbol` from `feeds` only (base feed first).
+    """
+    # A leading underscore keeps the class out of Backtrader's strategy registry
+    return _LegMeta(f"_{strategy_cls.__name__}Leg", (_PortfolioLeg, strategy_cls), {
+        'symbol': symbol,
+        'book': book,
+        'max_position_pct': max_position_pct,
+        '_feeds': tuple(feeds),
+    })
+
+
+class PortfolioBacktester(GridBacktester):
+    """
+    Backtest one strategy over many cached symbols with shared cash.
+
+    simulate() returns the same 5-tuple as GridBacktester.simulate(), over the
+    whole portfolio: the orders of every leg (tagged with their 'symbol'), the
+    final portfolio value, the trade analysis of all legs together and the
+    drawdown and Sharpe analyses of the portfolio value. Per-symbol trade
+    analyses and final positions are left in self.symbol_results.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        interval: str,
+        initial_capital: float,
+        risk_percent: float,
+        box_params: Dict[str, Any],
+        strategy_type: str = 'momentum',
+        htf_interval: Optional[str] = None,
+        max_position_pct: Optional[float] = None,  # cap on one symbol's position, % of portfolio value
+        strategy_overrides: Optional[Dict[str, Any]] = None,
+        max_workers: int = PORTFOLIO_LOAD_WORKERS
+    ):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            raise ValueError("A portfolio backtest needs at least one symbol")
+        super().__init__(symbols[0], interval, initial_capital, risk_percent, box_params, strategy_type,
+                         htf_interval=htf_interval, strategy_overrides=strategy_overrides, fast=True)
+        self.symbols = symbols
+        self.max_position_pct = max_position_pct
+        self.max_workers = max_workers
+        self.symbol_results: Dict[str, Dict[str, Any]] = {}
+
+    def htf_key_for(self, symbol: str) -> str:
+        return f"{symbol}@{self.htf_interval}"
+
+    def fetch_and_store_data(self, start_time: int = None, end_time: int = None) -> None:
+        """
+        Load every symbol's candles from the on-disk cache, in parallel and
+        without contacting the exchange (download them first, e.g. with the
+        bulk downloader). Symbols with nothing cached are left out of the run.
+        """
+        def load(symbol):
+            arrays = self.cache.load_arrays(symbol, self.interval, start_time, end_time)
+            return symbol, CandleArrays.from_columns(arrays, dtype=None)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.symbols)))) as pool:
+            for symbol, candles in pool.map(load, self.symbols):
+                if candles.empty:
+                    logger.warning("No cached %s data for %s, leaving it out of the portfolio", self.interval, symbol)
+                    continue
+                self.store_data(symbol, candles)
+                if self.htf_interval:
+                    htf = resample_ohlcv(candles.to_frame(), self.interval, self.htf_interval)
+                    self.store_data(self.htf_key_for(symbol), CandleArrays.from_frame(htf, dtype=None))
+
+    def simulate(self) -> Tuple[List[Dict], float, Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        symbols = [symbol for symbol in self.symbols if self.get_stored_data(symbol) is not None]
+        if not symbols:
+            raise ValueError("No data to run simulation.")
+        strategy_cls, strategy_params = self._strategy_spec()
+        shift = timeframe_to_ms(self.htf_interval) - timeframe_to_ms(self.interval) if self.htf_interval else 0
+
+        cerebro = bt.Cerebro(stdstats=False, preload=True, runonce=True, tradehistory=False)
+        cerebro.broker.set_cash(self.initial_capital)
+        book = PortfolioBook(symbols)
+        for symbol in symbols:
+            feeds = [cerebro.adddata(self._make_feed(self._as_arrays(self.get_stored_data(symbol))), name=symbol)]
+            htf_data = self.get_stored_data(self.htf_key_for(symbol)) if self.htf_interval else None
+            if htf_data is not None and not htf_data.empty:
+                # Same no-look-ahead stamping as GridBacktester.simulate()
+                htf_feed = self._make_feed(self._as_arrays(htf_data).shift_time(shift))
+                feeds.append(cerebro.adddata(htf_feed, name=self.htf_key_for(symbol)))
+            leg = portfolio_leg(strategy_cls, symbol, feeds, book, self.max_position_pct)
+            cerebro.addstrategy(leg, **strategy_params)
+        cerebro.addstrategy(PortfolioRecorder, book=book)
+
+        logger.info("Starting portfolio backtest over %d symbols...", len(symbols))
+        try:
+            strategies = cerebro.run()
+        except Exception as e:
+            logger.error(f"Portfolio simulation failed: {str(e)}", exc_info=True)
+            raise ValueError(f"Portfolio simulation error: {str(e)}")
+
+        orders = []
+        self.symbol_results = {}
+        for leg in strategies[:-1]:
+            orders.extend({**order, 'symbol': leg.symbol} for order in getattr(leg, 'orders', []))
+            book.symbol_trades[leg.symbol].rets._close()
+            self.symbol_results[leg.symbol] = {
+                'trade_analysis': book.symbol_trades[leg.symbol].rets,
+                'position': leg.position.size,
+            }
+        orders.sort(key=lambda order: order.get('time', ''))
+        book.trades.rets._close()
+
+        final_value = cerebro.broker.getvalue()
+        values = np.asarray(book.values)
+        logger.info("Portfolio backtest finished: %d symbols, %d steps, final value %.2f",
+                    len(symbols), len(values), final_value)
+        return (
+            orders,
+            final_value,
+            book.trades.rets,
+            drawdown_analysis(values),
+            sharpe_analysis(book.times(), values, self.initial_capital),
+        )
@@ -0,0 +1,112 @@
+# src/profiling.py
+"""
+Opt-in per-call profiling of Backtrader simulations (GridBacktester(profile=True)).
+
+SimulationProfiler wraps a strategy class in a subclass that times next(),
+notify_order() and notify_trade(), the strategy's indicator updates (per
+indicator call: once per bar in next mode, once per run in runonce mode) and
+the broker's per-bar order processing. Nothing is wrapped unless profiling is
+requested, so regular runs execute the original classes untouched.
+"""
+import functools
+import time
+from typing import Any, Callable, Dict, List
+
+import backtrader as bt
+import numpy as np
+
+SECTIONS = ('next', 'notify_order', 'notify_trade', 'indicators', 'broker')
+
+# Upper bounds (microseconds) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 100000)
+
+
+class SimulationProfiler:
+    """
+    Collects the duration of every profiled call, per section, and summarizes
+    them with percentiles and a histogram.
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, List[int]] = {section: [] for section in SECTIONS}
+        self.wall_ns = 0
+
+    def timed(self, section: str, func: Callable) -> Callable:
+        """
+        Wrap `func` so each call records its duration (ns) under `section`.
+        """
+        record = self.durations[section].append
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        return wrapper
+
+    def profile_strategy(self, strategy_cls: type) -> type:
+        """
+        Subclass of `strategy_cls` with its hooks and indicators timed.
+        """
+        profiler = self
+
+        def start(strategy):
+            # Indicators exist once __init__ has run; the strategy drives them
+            # through _next (next mode) or _once (runonce mode)
+            for indicator in strategy._lineiterators[bt.LineIterator.IndType]:
+                indicator._next = profiler.timed('indicators', indicator._next)
+                indicator._once = profiler.timed('indicators', indicator._once)
+            strategy_cls.start(strategy)
+
+        namespace = {'start': start, '__doc__': strategy_cls.__doc__}
+        for section in ('next', 'notify_order', 'notify_trade'):
+            namespace[section] = self.timed(section, getattr(strategy_cls, section))
+        return type(strategy_cls.__name__, (strategy_cls,), namespace)
+
+    def profile_broker(self, broker: bt.BrokerBase) -> None:
+        """
+        Time the broker's per-bar order matching (Cerebro calls broker.next()).
+        """
+        broker.next = self.timed('broker', broker.next)
+
+    def run(self, cerebro: bt.Cerebro) -> List[bt.Strategy]:
+        """
+        cerebro.run(), recording its wall time as the reference for the shares.
+        """
+        start = time.perf_counter_ns()
+        try:
+            return cerebro.run()
+        finally:
+            self.wall_ns = time.perf_counter_ns() - start
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        JSON-serializable summary: per section the number of calls, total and
+        share of the run's wall time, mean/percentile/max call times and a
+        histogram of call times (buckets by upper bound, None = unbounded).
+        """
+        sections = {}
+        for section, durations in self.durations.items():
+            values = np.asarray(durations, dtype=np.float64) / 1000.0  # microseconds
+            counts = np.bincount(np.searchsorted(HISTOGRAM_BOUNDS_US, values, side='left'),
+                                 minlength=len(HISTOGRAM_BOUNDS_US) + 1)
+            total_ms = float(values.sum()) / 1000.0
+            sections[section] = {
+                'calls': len(values),
+                'total_ms': total_ms,
+                'share': total_ms * 1e6 / self.wall_ns if self.wall_ns else 0.0,
+                'mean_us': float(values.mean()) if len(values) else 0.0,
+                'p50_us': float(np.percentile(values, 50)) if len(values) else 0.0,
+                'p95_us': float(np.percentile(values, 95)) if len(values) else 0.0,
+                'p99_us': float(np.percentile(values, 99)) if len(values) else 0.0,
+                'max_us': float(values.max()) if len(values) else 0.0,
+                'histogram': [
+                    {'le_us': bound, 'count': int(count)}
+                    for bound, count in zip(HISTOGRAM_BOUNDS_US + (None,), counts)
+                ],
+            }
+        return {'wall_ms': self.wall_ns / 1e6, 'sections': sections}
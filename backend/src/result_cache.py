@@ -0,0 +1,189 @@
+# src/result_cache.py
+"""
+On-disk cache of completed backtest results, keyed by a hash of everything the
+result depends on.
+
+GridBacktester(cache_results=True) looks its run up here before simulating and
+stores the result afterwards. The key (see result_key()) covers the strategy
+class and its effective parameters, the symbol and intervals, the initial
+capital and engine, a fingerprint of the candles actually fed in (so new or
+repaired candles make a new key) and the version of the code producing it: a
+digest of the backend sources and the Backtrader version, so results computed
+by older code are never served.
+
+Entries are pickles written atomically, so worker processes can share the
+directory; GridBacktester stores its simulate() result with its truncation
+(the analyses keep their Backtrader types). The cache is an LRU
+bounded by the entries' combined size; hits refresh an entry's modification
+time.
+"""
+import functools
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import backtrader as bt
+import numpy as np
+
+from config import logger, RESULT_CACHE_DIR, RESULT_CACHE_MB
+from src.data_handler.candle_arrays import CandleArrays
+
+# Bump when the layout of cached values changes
+RESULT_CACHE_FORMAT = 2
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Digest of the backend sources (src/**/*.py) and the Backtrader version.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bt.__version__.encode())
+    for root, dirs, files in os.walk(SRC_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, SRC_DIR).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def data_fingerprint(candles: CandleArrays) -> str:
+    """
+    Digest of a candle series: its times and OHLCV values as they are fed in.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for col in ('time', 'open', 'high', 'low', 'close', 'volume'):
+        values = np.ascontiguousarray(getattr(candles, col))
+        digest.update(f"{col}:{values.dtype.str}:{len(values)}".encode())
+        digest.update(values.data)
+    return digest.hexdigest()
+
+
+def result_key(spec: Dict[str, Any]) -> str:
+    """
+    Hash of a JSON-able run description, independent of key order.
+    """
+    canonical = json.dumps({'format': RESULT_CACHE_FORMAT, 'code': code_version(), **spec},
+                           sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU of pickled results in `directory`, bounded by `max_bytes` on disk.
+    A budget of 0 disables caching.
+    """
+
+    SUFFIX = '.pkl'
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Dropping unreadable result cache entry %s: %s", key, e)
+            self.evict(key)
+            return None
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._enforce_budget()
+
+    def evict(self, key: str) -> bool:
+        if not key.isalnum():  # keys are hex digests; anything else is not ours to remove
+            return False
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self) -> int:
+        return sum(self.evict(entry['key']) for entry in self._entries())
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'used_bytes': sum(entry['size'] for entry in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        """
+        Entries in least recently used order.
+        """
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:  # evicted by another process meanwhile
+                continue
+            entries.append({'key': name[:-len(self.SUFFIX)], 'size': stat.st_size, 'used': stat.st_mtime})
+        entries.sort(key=lambda entry: entry['used'])
+        return entries
+
+    def _enforce_budget(self) -> None:
+        entries = self._entries()
+        used = sum(entry['size'] for entry in entries)
+        for entry in entries:
+            if used <= self.max_bytes:
+                break
+            if self.evict(entry['key']):
+                logger.debug("Evicted %s from the result cache", entry['key'])
+            used -= entry['size']
+
+
+_result_cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MB * 1024 * 1024)
+
+
+def get_result_cache() -> ResultCache:
+    """
+    The result cache shared by every backtest (and process) using RESULT_CACHE_DIR.
+    """
+    return _result_cache
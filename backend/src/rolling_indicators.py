@@ -0,0 +1,93 @@
+# src/rolling_indicators.py
+"""
+Rolling minimum/maximum over the last `period` values in O(1) amortized time per value.
+
+RollingExtremum keeps a monotonic deque of (index, value) candidates: a new value
+evicts every candidate it beats, so the front is always the window's extreme and
+each value enters and leaves the deque once. RollingMin/RollingMax wrap it as
+Backtrader indicators that work bar by bar (live feeds, runonce=False) as well as
+over a preloaded feed (runonce), replacing min(line.get(size=period)) scans whose
+cost grows with the window.
+"""
+import operator
+from collections import deque
+from typing import Callable
+
+import backtrader as bt
+
+
+class RollingExtremum:
+    """
+    Extreme (per `beats`) of the last `period` values pushed. `beats(a, b)` is
+    true when a new value `a` makes an older candidate `b` irrelevant, e.g.
+    operator.le for a minimum.
+    """
+
+    def __init__(self, period: int, beats: Callable[[float, float], bool]):
+        if period < 1:
+            raise ValueError(f"period must be at least 1, got {period}")
+        self.period = period
+        self.beats = beats
+        self._window = deque()
+        self._count = 0
+
+    def push(self, value: float) -> float:
+        """
+        Add the next value and return the extreme of the window ending with it.
+        """
+        window = self._window
+        while window and self.beats(value, window[-1][1]):
+            window.pop()
+        window.append((self._count, value))
+        if window[0][0] <= self._count - self.period:
+            window.popleft()
+        self._count += 1
+        return window[0][1]
+
+
+class _RollingIndicator(bt.Indicator):
+    """
+    Base for RollingMin/RollingMax: feeds every input value through a
+    RollingExtremum and writes the window's extreme once `period` values are in.
+    """
+    params = (('period', 30),)
+    beats = None
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+        self._extremum = RollingExtremum(self.p.period, self.beats)
+
+    def prenext(self):
+        self._extremum.push(self.data[0])
+
+    def next(self):
+        self.lines[0][0] = self._extremum.push(self.data[0])
+
+    def preonce(self, start, end):
+        push = self._extremum.push
+        for value in self.data.array[start:end]:
+            push(value)
+
+    def once(self, start, end):
+        push = self._extremum.push
+        dst = self.lines[0].array
+        for i, value in enumerate(self.data.array[start:end], start):
+            dst[i] = push(value)
+
+
+class RollingMin(_RollingIndicator):
+    """
+    Lowest value of the input over the last `period` bars (the values of
+    bt.indicators.Lowest).
+    """
+    lines = ('min',)
+    beats = operator.le
+
+
+class RollingMax(_RollingIndicator):
+    """
+    Highest value of the input over the last `period` bars (the values of
+    bt.indicators.Highest).
+    """
+    lines = ('max',)
+    beats = operator.ge
@@ -1,6 +1,31 @@
+import datetime
 import backtrader as bt
 from typing import List, Dict, Any
 from config import logger
+from src.indicator_cache import (
+    CachedATR, CachedDMI, CachedEMA, CachedMACD, CachedRSI, CachedSMA, CachedStdDev, CachedStochastic
+)
+from src.indicator_registry import shared_indicator
+from src.rolling_indicators import RollingMax, RollingMin
+
+
+def record_trade(strategy, trade, time: str) -> None:
+    """
+    Keep a closed trade in strategy.orders, the trade list stored with simulation
+    results: side, close time, entry price and size, and realized profit.
+    The size is the largest the position reached, scale-ins included. A closed
+    trade's own size is 0 and additions are not notified, so it is read from
+    the trade's history (strategies turn it on with set_tradehistory()).
+    """
+    if trade.isclosed:
+        strategy.entry_size = max(abs(event.status.size) for event in trade.history)
+        strategy.orders.append({
+            "type": "buy" if trade.long else "sell",
+            "time": time,
+            "price": trade.price,
+            "size": strategy.entry_size,
+            "profit": trade.pnl
+        })
 
 """
 ####################################################
@@ -12,7 +37,6 @@ from config import logger
 ####################################################
 """
 class IntradayMomentumStrategy(bt.Strategy):
-    import datetime
     params = dict(
         strategy_events=None,
 
@@ -63,6 +87,8 @@ class IntradayMomentumStrategy(bt.Strategy):
 
     def __init__(self):
         self.strategy_events_queue = self.p.strategy_events
+        self.orders = []
+        self.set_tradehistory()  # record_trade reads the peak trade size from it
 
 
         # --- Track daily trades ---
@@ -70,28 +96,26 @@ class IntradayMomentumStrategy(bt.Strategy):
         self.current_day = None
 
         # --- Indicators ---
-        self.dmi = bt.indicators.DirectionalMovement(self.data, period=self.p.adx_length)
+        self.dmi = shared_indicator(CachedDMI, self.data, period=self.p.adx_length)
         self.di_plus  = self.dmi.plusDI
         self.di_minus = self.dmi.minusDI
 
-        self.ema_short = bt.indicators.EMA(self.data.close, period=self.p.ema_short_length)
-        self.ema_long  = bt.indicators.EMA(self.data.close, period=self.p.ema_long_length)
+        self.ema_short = shared_indicator(CachedEMA, self.data, period=self.p.ema_short_length)
+        self.ema_long  = shared_indicator(CachedEMA, self.data, period=self.p.ema_long_length)
 
-        self.rsi = bt.indicators.RSI(self.data.close, period=self.p.rsi_length)
+        self.rsi = shared_indicator(CachedRSI, self.data, period=self.p.rsi_length)
 
         # Stochastic
-        lowest_low = bt.indicators.Lowest(self.data.low, period=self.p.stoch_length)
-        highest_high = bt.indicators.Highest(self.data.high, period=self.p.stoch_length)
-        stoch_k_raw = (self.data.close - lowest_low) / (highest_high - lowest_low + 1e-9) * 100
-        self.stoch_k = bt.indicators.SMA(stoch_k_raw, period=self.p.stoch_k_smooth)
-        self.stoch_d = bt.indicators.SMA(self.stoch_k, period=self.p.stoch_d_smooth)
+        stoch = shared_indicator(CachedStochastic, self.data, period=self.p.stoch_length,
+                                 k_smooth=self.p.stoch_k_smooth, d_smooth=self.p.stoch_d_smooth)
+        self.stoch_k = stoch.k
+        self.stoch_d = stoch.d
 
-        # ADX
-        # If you want DI+ and DI- separately, you can use a DMI indicator
-        self.adx = bt.indicators.AverageDirectionalMovementIndex(self.data, period=self.p.adx_length)
+        # ADX: the DMI above already computes it, no second DI/ADX pipeline
+        self.adx = self.dmi.adx
 
         # ATR for dynamic risk mgmt
-        self.atr = bt.indicators.ATR(self.data, period=self.p.atr_period)
+        self.atr = shared_indicator(CachedATR, self.data, period=self.p.atr_period)
 
     def next(self):
         # --- Check if we have a new day to reset trades ---
@@ -208,7 +232,8 @@ class IntradayMomentumStrategy(bt.Strategy):
     def notify_order(self, order):
         # Track order statuses
         if order.status in [order.Completed, order.Canceled, order.Rejected]:
-            self.strategy_events_queue.put({'type': 'order', 'order': order})
+            if self.strategy_events_queue:
+                self.strategy_events_queue.put({'type': 'order', 'order': order})
             if order.isbuy():
                 print(f"[{self.data.datetime.datetime()}] BUY {order.status}: "
                       f"Size={order.executed.size}, Price={order.executed.price}")
@@ -217,6 +242,7 @@ class IntradayMomentumStrategy(bt.Strategy):
                       f"Size={order.executed.size}, Price={order.executed.price}")
 
     def notify_trade(self, trade):
+        record_trade(self, trade, str(self.data.datetime.datetime()))
         if trade.isclosed:
             print(f"[{self.data.datetime.datetime()}] TRADE CLOSED: "
                   f"Profit={trade.pnl:.2f}, Net={trade.pnlcomm:.2f}")
@@ -273,24 +299,30 @@ class BoxMacdRsiStrategy(bt.Strategy):
         self.broker.set_slippage_perc(self.p.slippage, True, True, True, False)
         
         # Initialize indicators
-        self.rsi = bt.indicators.RSI(self.data.close, period=self.p.rsi_length)
-        self.macd = bt.indicators.MACD(
-            self.data.close,
-            period_me1=self.p.macd_fast,
-            period_me2=self.p.macd_slow,
-            period_signal=self.p.macd_signal
+        self.rsi = shared_indicator(CachedRSI, self.data, period=self.p.rsi_length)
+        self.macd = shared_indicator(
+            CachedMACD,
+            self.data,
+            fast=self.p.macd_fast,
+            slow=self.p.macd_slow,
+            signal=self.p.macd_signal
         )
-        self.atr = bt.indicators.ATR(self.data, period=self.p.atr_period)
+        self.atr = shared_indicator(CachedATR, self.data, period=self.p.atr_period)
         # Volatility and adaptive pivot indicators
-        self.volatility = bt.indicators.StdDev(
-            self.data.close, period=self.p.volatility_period
+        self.volatility = shared_indicator(
+            CachedStdDev, self.data, period=self.p.volatility_period
         )
-        self.adaptive_pivot = bt.indicators.SMA(
-            self.data.close, period=self.p.adaptive_pivot_period
+        self.adaptive_pivot = shared_indicator(
+            CachedSMA, self.data, period=self.p.adaptive_pivot_period
         )
-        
+        # Rolling box extremes and the hammer's 5-bar low, O(1) per bar
+        self.box_lowest = shared_indicator(RollingMin, self.data.low, period=self.p.box_lookback)
+        self.box_highest = shared_indicator(RollingMax, self.data.high, period=self.p.box_lookback)
+        self.lowest5 = shared_indicator(RollingMin, self.data.low, period=5)
+
         # Initialize state variables
         self.orders = []
+        self.set_tradehistory()  # record_trade reads the peak trade size from it
         self.last_entry_bar = None
         self.position_size = 0
         self.position_cost = 0
@@ -329,17 +361,11 @@ class BoxMacdRsiStrategy(bt.Strategy):
 
         # Calculate adaptive box boundaries using pivot
         pivot_level = self.adaptive_pivot[0]
-        box_low = min(
-            pivot_level * 0.98,
-            min(self.data.low.get(size=self.p.box_lookback))
-        )
-        box_high = max(
-            pivot_level * 1.02,
-            max(self.data.high.get(size=self.p.box_lookback))
-        )
+        box_low = min(pivot_level * 0.98, self.box_lowest[0])
+        box_high = max(pivot_level * 1.02, self.box_highest[0])
 
         # Candle patterns
-        rolling_lowest5 = min(self.data.low.get(size=5))
+        rolling_lowest5 = self.lowest5[0]
         is_hammer = (
             c_close > c_open and
             abs(c_low - rolling_lowest5) < 1e-12 and
@@ -416,15 +442,7 @@ class BoxMacdRsiStrategy(bt.Strategy):
         return position_size
 
     def notify_trade(self, trade):
-        # Called when a trade is closed
-        if trade.isclosed:
-            self.orders.append({
-                "type": "sell" if trade.size < 0 else "buy",
-                "time": str(self.data.datetime.datetime()),
-                "price": trade.price,
-                "size": abs(trade.size),
-                "profit": trade.pnl
-            })
+        record_trade(self, trade, str(self.data.datetime.datetime()))
 
 
 """
@@ -452,27 +470,29 @@ class StochasticMeanReversion(bt.Strategy):
     def __init__(self, strategy_events=None):
         # Store the queue reference
         self.strategy_events_queue = strategy_events
+        self.orders = []
+        self.set_tradehistory()  # record_trade reads the peak trade size from it
 
         # Use the primary data for most calculations
         self.data0 = self.datas[0]
         self.dataHTF = self.datas[1] if len(self.datas) > 1 else self.data0
 
         # ATR indicator
-        self.atr = bt.indicators.ATR(self.data0, period=self.p.atrPeriod)
+        self.atr = shared_indicator(CachedATR, self.data0, period=self.p.atrPeriod)
 
         # ---- Stochastic Oscillator ----
-        self.lowest_low = bt.indicators.Lowest(self.data0.low, period=self.p.kLength)
-        self.highest_high = bt.indicators.Highest(self.data0.high, period=self.p.kLength)
-        self.rawK = 100 * (self.data0.close - self.lowest_low) / (self.highest_high - self.lowest_low + 1e-9)
-        self.stochK = bt.indicators.SMA(self.rawK, period=self.p.kSmoothing)
-        self.stochD = bt.indicators.SMA(self.stochK, period=self.p.dSmoothing)
+        stoch = shared_indicator(CachedStochastic, self.data0, period=self.p.kLength, k_smooth=self.p.kSmoothing,
+                                 d_smooth=self.p.dSmoothing, scale_first=True)
+        self.stochK = stoch.k
+        self.stochD = stoch.d
         self.stochCrossover = bt.indicators.CrossOver(self.stochK, self.stochD)
 
         # ---- Moving Averages ----
-        self.ma = bt.indicators.SMA(self.data0.close, period=self.p.maLength)
+        self.ma = shared_indicator(CachedSMA, self.data0, period=self.p.maLength)
         upper_length = int(self.p.maLength * 1.5)
-        self.upper_ma = bt.indicators.SMA(self.data0.close, period=upper_length)
-        self.maHTF = bt.indicators.SMA(self.dataHTF.close, period=self.p.maLength)
+        self.upper_ma = shared_indicator(CachedSMA, self.data0, period=upper_length)
+        # Without a higher-timeframe feed this is self.ma
+        self.maHTF = shared_indicator(CachedSMA, self.dataHTF, period=self.p.maLength)
 
         self.main_order = None
 
@@ -545,6 +565,7 @@ class StochasticMeanReversion(bt.Strategy):
             self.main_order = None
 
     def notify_trade(self, trade):
+        record_trade(self, trade, str(self.data.datetime.datetime()))
         if trade.isclosed:
             self.log(f"Trade closed, PnL: {trade.pnl:.2f}")
 
@@ -552,7 +573,7 @@ class StochasticMeanReversion(bt.Strategy):
                 event = {
                     "type": "trade",
                     "time": str(self.data.datetime.datetime()),
-                    "size": abs(trade.size),
+                    "size": self.entry_size,
                     "price": trade.price,
                     "profit": trade.pnl
                 }
@@ -593,17 +614,19 @@ class IBPriceActionStrategy(bt.Strategy):
     def __init__(self):
         """Initialize indicators & placeholders."""
         # 1) EMA(50) for trend
-        self.ema = bt.indicators.ExponentialMovingAverage(self.data.close, period=50)
+        self.ema = shared_indicator(CachedEMA, self.data, period=50)
         
         # 2) Volume SMA(20)
-        self.volSMA = bt.indicators.SimpleMovingAverage(self.data.volume, period=20)
+        self.volSMA = shared_indicator(CachedSMA, self.data, period=20, source='volume')
         
         # 3) ATR
-        self.atr = bt.indicators.ATR(self.data, period=self.p.atrLength)
+        self.atr = shared_indicator(CachedATR, self.data, period=self.p.atrLength)
         
         # Track open orders so we can cancel/replace if needed
         self.longEntryOrder = None
         self.shortEntryOrder = None
+        self.orders = []
+        self.set_tradehistory()  # record_trade reads the peak trade size from it
         
     def next(self):
         # ----------------------------------------------------------------
@@ -771,6 +794,7 @@ class IBPriceActionStrategy(bt.Strategy):
 
     def notify_trade(self, trade):
         """Optional: track your trade results or debug here."""
+        record_trade(self, trade, str(self.data.datetime.datetime()))
         if trade.isclosed:
             pnl = trade.pnl
             # You can print or log your PnL
@@ -0,0 +1,1007 @@
+# src/vector_engine.py
+"""
+Vectorized backtest engine, an alternative to running the strategies through Cerebro.
+
+Indicators and entry/exit signals are computed once as NumPy arrays (see
+vector_indicators), and only the order/position bookkeeping runs bar by bar, in a
+tight loop that fast-forwards over stretches where the book is flat and no signal
+fires. The broker replicates Backtrader's BackBroker for the order types the
+strategies use (market, limit, stop and brackets): submission checks, fill prices
+and slippage, cash and commission accounting, and the order in which
+notifications reach the strategy. Results come back in the same 5-tuple shape as
+GridBacktester.simulate(), with the trade and drawdown analyses built by
+Backtrader's own analyzer code, so the two engines can be swapped freely.
+"""
+import copy
+import datetime
+import itertools
+from collections import OrderedDict, defaultdict, deque
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+from backtrader.mathsupport import average, standarddev
+from backtrader.utils import AutoOrderedDict
+
+from config import logger
+from src import vector_indicators as vi
+from src.early_stop import EarlyStopMonitor
+from src.indicator_cache import compute_indicator, series_fingerprint
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.ohlcv_cache import VALUE_COLUMNS, to_epoch_ms
+from src.trading_strategy import (
+    BoxMacdRsiStrategy, IntradayMomentumStrategy, IBPriceActionStrategy, StochasticMeanReversion, record_trade
+)
+
+MS_PER_DAY = 86_400_000
+SHARPE_RISK_FREE_RATE = 0.01  # bt.analyzers.SharpeRatio default, yearly returns
+
+Order = bt.Order
+
+
+def bar_arrays(data) -> Dict[str, np.ndarray]:
+    """
+    OHLCV columns of a DataFrame (with a 'time' column or index) or CandleArrays as
+    float64 arrays plus an int64 'time' array of epoch ms.
+    """
+    if isinstance(data, CandleArrays):
+        arrays = {'time': np.asarray(data.time, dtype=np.int64)}
+        for col in VALUE_COLUMNS:
+            arrays[col] = np.asarray(getattr(data, col), dtype=np.float64)
+        return arrays
+
+    if 'time' not in data.columns:
+        if data.index.name != 'time':
+            raise ValueError("No time column found in data")
+        data = data.reset_index()
+    if data['time'].dtype == 'int64' and data['time'].max() > 1e12:
+        times = data['time'].to_numpy(dtype=np.int64)
+    else:
+        converted = pd.to_datetime(data['time'], errors='coerce')
+        data = data[converted.notna()]
+        times = to_epoch_ms(converted[converted.notna()])
+
+    arrays = {'time': times}
+    for col in VALUE_COLUMNS:
+        arrays[col] = data[col].to_numpy(dtype=np.float64) if col in data.columns else np.zeros(len(data))
+    return arrays
+
+
+def bar_datetime(time_ms: int) -> datetime.datetime:
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=int(time_ms))
+
+
+def update_position(size: float, price: float, change: float, exec_price: float) -> Tuple[float, float, float, float]:
+    """
+    bt.Position.update() as a pure function: returns the new size and price plus
+    the opened and closed parts of `change`.
+    """
+    oldsize = size
+    size += change
+    if not size:
+        return size, 0.0, 0, change
+    if not oldsize:
+        return size, exec_price, change, 0
+    if oldsize > 0:
+        if change > 0:
+            return size, (price * oldsize + change * exec_price) / size, change, 0
+        if size > 0:
+            return size, price, 0, change
+        return size, exec_price, size, -oldsize
+    if change < 0:
+        return size, (price * oldsize + change * exec_price) / size, change, 0
+    if size < 0:
+        return size, price, 0, change
+    return size, exec_price, size, -oldsize
+
+
+class VectorOrder:
+    """
+    The parts of bt.Order the engine and strategies need.
+    """
+
+    _refs = itertools.count(1)
+
+    def __init__(self, size: float, exectype: int, price: float, parent: Optional["VectorOrder"], transmit: bool):
+        self.ref = next(self._refs)
+        self.size = size  # signed, negative for sells
+        self.exectype = exectype
+        self.price = price  # created price: limit/stop trigger or the close at creation
+        self.parent = parent
+        self.transmit = transmit
+        self.active = parent is None
+        self.status = Order.Created
+        self.remsize = size
+        self.executed_size = 0
+        self.executed_price = 0.0
+        self.exbits = []
+        self._notified = 0
+
+    def isbuy(self) -> bool:
+        return self.size > 0
+
+    def alive(self) -> bool:
+        return self.status in (Order.Created, Order.Submitted, Order.Partial, Order.Accepted)
+
+    def execute(self, size: float, price: float, closed: float, opened: float, closedcomm: float, openedcomm: float):
+        self.exbits.append((closed, opened, price, closedcomm, openedcomm))
+        self.remsize -= size
+        oldvalue = self.executed_size * self.executed_price
+        self.executed_size += size
+        self.executed_price = (oldvalue + size * price) / self.executed_size
+        self.status = Order.Partial if self.remsize else Order.Completed
+
+    def snapshot(self) -> SimpleNamespace:
+        """
+        What a cloned bt.Order carries in a notification: current status and
+        executed totals plus the execution bits added since the previous one.
+        """
+        pending, self._notified = self.exbits[self._notified:], len(self.exbits)
+        return SimpleNamespace(
+            ref=self.ref, status=self.status, isbuy=self.isbuy(), exbits=pending,
+            executed_size=self.executed_size, executed_price=self.executed_price,
+        )
+
+
+class VectorTrade:
+    """
+    bt.Trade bookkeeping, with the attributes TradeAnalyzer reads and the size
+    after every update in `history`, as bt.TradeHistory's status.size.
+    """
+
+    Created, Open, Closed = bt.Trade.Created, bt.Trade.Open, bt.Trade.Closed
+
+    def __init__(self):
+        self.size = 0
+        self.price = 0.0
+        self.commission = 0.0
+        self.pnl = 0.0
+        self.pnlcomm = 0.0
+        self.status = self.Created
+        self.justopened = False
+        self.isopen = False
+        self.isclosed = False
+        self.long = False
+        self.baropen = 0
+        self.barlen = 0
+        self.history = []
+
+    def update(self, size: float, price: float, commission: float, barlen: int):
+        if not size:
+            return
+        self.commission += commission
+        oldsize = self.size
+        self.size += size
+        self.justopened = bool(not oldsize and size)
+        if self.justopened:
+            self.baropen = barlen
+            self.long = self.size > 0
+        self.isopen = bool(self.size)
+        self.barlen = barlen - self.baropen
+        self.isclosed = bool(oldsize and not self.size)
+        if self.isclosed:
+            self.isopen = False
+            self.status = self.Closed
+        elif self.isopen:
+            self.status = self.Open
+
+        if abs(self.size) > abs(oldsize):
+            self.price = (oldsize * self.price + size * price) / self.size
+            pnl = 0.0
+        else:
+            pnl = -size * (price - self.price)
+        self.pnl += pnl
+        self.pnlcomm = self.pnl - self.commission
+        self.history.append(SimpleNamespace(status=SimpleNamespace(size=self.size)))
+
+
+class VectorBroker:
+    """
+    Single-asset replica of bt.brokers.BackBroker with a percentage commission.
+    Multiplier and leverage are 1, so BackBroker's scaling by them drops out of the
+    cash and value arithmetic; the operations that remain run in the same order,
+    which keeps the results bit-identical.
+    """
+
+    def __init__(self, cash: float):
+        self.cash = cash
+        self.value = cash
+        self.size = 0
+        self.price = 0.0
+        self.commission = 0.0
+        self.slip_perc = 0.0
+        self.slip_open = False
+        self.slip_limit = True
+        self.slip_match = True
+        self.slip_out = False
+
+        self.submitted = deque()
+        self.pending = deque()
+        self.toactivate = deque()
+        self.pchildren = defaultdict(deque)
+        self.notifs = []
+
+    def setcommission(self, commission: float) -> None:
+        self.commission = commission
+
+    def set_slippage_perc(self, perc, slip_open=True, slip_limit=True, slip_match=True, slip_out=False) -> None:
+        self.slip_perc = perc
+        self.slip_open = slip_open
+        self.slip_limit = slip_limit
+        self.slip_match = slip_match
+        self.slip_out = slip_out
+
+    @property
+    def idle(self) -> bool:
+        return not (self.size or self.submitted or self.pending or self.toactivate or self.notifs)
+
+    def notify(self, order: VectorOrder) -> None:
+        self.notifs.append(order.snapshot())
+
+    # --- submission ---
+
+    def _take_children(self, order: VectorOrder) -> Optional[int]:
+        pref = order.parent.ref if order.parent is not None else order.ref
+        if pref != order.ref and pref not in self.pchildren:
+            order.status = Order.Rejected
+            self.notify(order)
+            return None
+        return pref
+
+    def submit(self, order: VectorOrder) -> VectorOrder:
+        pref = self._take_children(order)
+        if pref is None:
+            return order
+        pc = self.pchildren[pref]
+        pc.append(order)
+        if order.transmit:
+            for queued in pc:
+                queued.status = Order.Submitted
+                self.submitted.append(queued)
+                self.notify(queued)
+        return order
+
+    def cancel(self, order: VectorOrder, bracket: bool = False) -> bool:
+        try:
+            self.pending.remove(order)
+        except ValueError:
+            return False
+        order.status = Order.Canceled
+        self.notify(order)
+        if not bracket:
+            self._bracketize(order, cancel=True)
+        return True
+
+    def _bracketize(self, order: VectorOrder, cancel: bool = False) -> None:
+        pref = order.parent.ref if order.parent is not None else order.ref
+        pc = self.pchildren[pref]
+        if cancel or pref != order.ref:
+            while pc:
+                self.cancel(pc.popleft(), bracket=True)
+            del self.pchildren[pref]
+        else:
+            pc.popleft()
+            self.toactivate.extend(pc)
+
+    def _check_submitted(self) -> None:
+        cash = self.cash
+        size, price = self.size, self.price
+        while self.submitted:
+            order = self.submitted.popleft()
+            if self._take_children(order) is None:
+                continue
+
+            # Pseudo-execution at the created price against a running cash/position
+            pprice_orig = order.price
+            size, price, opened, closed = update_position(size, price, order.remsize, order.price)
+            if closed:
+                cash += -closed * pprice_orig
+                cash -= abs(closed) * self.commission * order.price
+            if opened:
+                cash -= opened * order.price
+                cash -= abs(opened) * self.commission * order.price
+
+            if cash >= 0.0:
+                order.status = Order.Accepted
+                self.pending.append(order)
+                self.notify(order)
+                continue
+
+            order.status = Order.Margin
+            self.notify(order)
+            self._bracketize(order, cancel=True)
+
+    # --- execution ---
+
+    def _execute(self, order: VectorOrder, price: Optional[float]) -> None:
+        if price is None:
+            return
+
+        pprice_orig = self.price
+        psize, pprice, opened, closed = update_position(self.size, self.price, order.remsize, price)
+        pnl = -closed * (price - pprice_orig)
+        cash = self.cash
+
+        if closed:
+            cash += -closed * pprice_orig + pnl
+            closedcomm = abs(closed) * self.commission * price
+            cash -= closedcomm
+            self.cash = cash
+        else:
+            closedcomm = 0.0
+
+        popened = opened
+        if opened:
+            cash -= opened * price
+            openedcomm = abs(opened) * self.commission * price
+            cash -= openedcomm
+            if cash < 0.0:
+                opened = 0
+                openedcomm = 0.0
+            else:
+                self.cash = cash
+        else:
+            openedcomm = 0.0
+
+        execsize = closed + opened
+        if execsize:
+            self.size, self.price, _, _ = update_position(self.size, self.price, execsize, price)
+            order.execute(execsize, price, closed, opened, closedcomm, openedcomm)
+            self.notify(order)
+
+        if popened and not opened:
+            order.status = Order.Margin
+            self.notify(order)
+            self._bracketize(order, cancel=True)
+
+    def _slip_up(self, pmax: float, price: float, doslip: bool = True, lim: bool = False) -> Optional[float]:
+        if not doslip or not self.slip_perc:
+            return price
+        pslip = price * (1 + self.slip_perc)
+        if pslip <= pmax:
+            return pslip
+        if self.slip_match or (lim and self.slip_limit):
+            return pslip if self.slip_out else pmax
+        return None
+
+    def _slip_down(self, pmin: float, price: float, doslip: bool = True, lim: bool = False) -> Optional[float]:
+        if not doslip or not self.slip_perc:
+            return price
+        pslip = price * (1 - self.slip_perc)
+        if pslip >= pmin:
+            return pslip
+        if self.slip_match or (lim and self.slip_limit):
+            return pslip if self.slip_out else pmin
+        return None
+
+    def _try_exec(self, order: VectorOrder, popen: float, phigh: float, plow: float) -> None:
+        pcreated = order.price
+        buy = order.isbuy()
+        if order.exectype == Order.Market:
+            # Orders are only processed from the bar after their creation
+            if buy:
+                self._execute(order, self._slip_up(phigh, popen, doslip=self.slip_open))
+            else:
+                self._execute(order, self._slip_down(plow, popen, doslip=self.slip_open))
+
+        elif order.exectype == Order.Limit:
+            if buy:
+                if pcreated >= popen:
+                    self._execute(order, self._slip_up(min(phigh, pcreated), popen, doslip=self.slip_open, lim=True))
+                elif pcreated >= plow:
+                    self._execute(order, pcreated)
+            else:
+                if pcreated <= popen:
+                    # BackBroker passes the limit (not max(low, limit)) as the floor here
+                    self._execute(order, self._slip_down(pcreated, popen, doslip=self.slip_open, lim=True))
+                elif pcreated <= phigh:
+                    self._execute(order, pcreated)
+
+        elif order.exectype == Order.Stop:
+            if buy:
+                if popen >= pcreated:
+                    self._execute(order, self._slip_up(phigh, popen, doslip=self.slip_open))
+                elif phigh >= pcreated:
+                    self._execute(order, self._slip_up(phigh, pcreated))
+            else:
+                if popen <= pcreated:
+                    self._execute(order, self._slip_down(plow, popen, doslip=self.slip_open))
+                elif plow <= pcreated:
+                    self._execute(order, self._slip_down(plow, pcreated))
+
+        else:
+            raise ValueError(f"Unsupported order type for the vector engine: {Order.ExecTypes[order.exectype]}")
+
+    def next(self, popen: float, phigh: float, plow: float, pclose: float) -> None:
+        while self.toactivate:
+            self.toactivate.popleft().active = True
+
+        self._check_submitted()
+
+        self.pending.append(None)
+        while True:
+            order = self.pending.popleft()
+            if order is None:
+                break
+            if not order.active:
+                self.pending.append(order)
+                continue
+            self._try_exec(order, popen, phigh, plow)
+            if order.alive():
+                self.pending.append(order)
+            elif order.status == Order.Completed:
+                self._bracketize(order)
+
+        self.mark_to_market(pclose)
+
+    def mark_to_market(self, pclose: float) -> None:
+        dvalue = self.size * pclose
+        if dvalue > 0:
+            # A long position counts as its cost plus the unrealized profit
+            unrealized = self.size * (pclose - self.price)
+            self.value = self.cash + ((dvalue - unrealized) + unrealized)
+        else:
+            self.value = self.cash + dvalue
+
+
+class VectorStrategy:
+    """
+    Base for the array-driven mirrors of the Backtrader strategies.
+
+    Subclasses compute their indicator and signal arrays in __init__, report the
+    first bar next() may run on (`start`) and the bars where a flat, idle book
+    could place an order (`active_bars`), and implement next()/notify_order()/
+    notify_trade() against bar indices.
+    """
+
+    strategy_cls = None  # the bt.Strategy this mirrors (and takes its parameters from)
+
+    def __init__(self, broker: VectorBroker, bars: Dict[str, np.ndarray], params: Dict[str, Any],
+                 htf: Optional[Dict[str, np.ndarray]] = None):
+        defaults = self.strategy_cls.params._getpairs()
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for {self.strategy_cls.__name__}: {sorted(unknown)}")
+        self.p = SimpleNamespace(**{**defaults, **params})
+        self.broker = broker
+        self.bars = bars
+        self.htf = htf
+        self.time = bars['time']
+        self.opens, self.highs, self.lows = bars['open'], bars['high'], bars['low']
+        self.closes, self.volumes = bars['close'], bars['volume']
+        self.start = 0
+        self.active_bars = np.empty(0, dtype=np.int64)
+        self.orders = []
+        self._fingerprints = {}
+
+    def indicator(self, name: str, htf: bool = False, **params) -> Dict[str, np.ndarray]:
+        """
+        Lines of a cached indicator (see src.indicator_cache) over the bars, or over
+        the higher-timeframe bars with htf=True.
+        """
+        bars = self.htf if htf else self.bars
+        if htf not in self._fingerprints:
+            self._fingerprints[htf] = series_fingerprint(bars)
+        return compute_indicator(bars, name, self._fingerprints[htf], **params)
+
+    @property
+    def idle(self) -> bool:
+        """
+        True when next() can only act on an active bar (no orders to track).
+        """
+        return True
+
+    def next_active(self, i: int) -> int:
+        """
+        First bar >= i where next() might place an order while idle and flat.
+        """
+        j = int(np.searchsorted(self.active_bars, max(i, self.start)))
+        return int(self.active_bars[j]) if j < len(self.active_bars) else len(self.closes)
+
+    def next(self, i: int) -> None:
+        pass
+
+    def notify_order(self, order: SimpleNamespace, i: int) -> None:
+        pass
+
+    def notify_trade(self, trade: VectorTrade, i: int) -> None:
+        record_trade(self, trade, str(bar_datetime(self.time[i])))
+
+    # --- bt.Strategy order helpers ---
+
+    def _order(self, i: int, size, exectype, price, parent, transmit, sign) -> Optional[VectorOrder]:
+        if not size:
+            return None
+        created = float(price) if price else float(self.closes[i])
+        return self.broker.submit(VectorOrder(sign * abs(float(size)), exectype, created, parent, transmit))
+
+    def buy(self, i: int, size, exectype=Order.Market, price=None, parent=None, transmit=True):
+        return self._order(i, size, exectype, price, parent, transmit, 1)
+
+    def sell(self, i: int, size, exectype=Order.Market, price=None, parent=None, transmit=True):
+        return self._order(i, size, exectype, price, parent, transmit, -1)
+
+    def close(self, i: int):
+        if self.broker.size > 0:
+            return self.sell(i, abs(self.broker.size))
+        if self.broker.size < 0:
+            return self.buy(i, abs(self.broker.size))
+        return None
+
+    def buy_bracket(self, i: int, size, limitprice: float, stopprice: float) -> List[VectorOrder]:
+        parent = self.buy(i, size, Order.Limit, transmit=False)
+        stop = self.sell(i, size, Order.Stop, stopprice, parent=parent, transmit=False)
+        limit = self.sell(i, size, Order.Limit, limitprice, parent=parent, transmit=True)
+        return [parent, stop, limit]
+
+    def sell_bracket(self, i: int, size, limitprice: float, stopprice: float) -> List[VectorOrder]:
+        parent = self.sell(i, size, Order.Limit, transmit=False)
+        stop = self.buy(i, size, Order.Stop, stopprice, parent=parent, transmit=False)
+        limit = self.buy(i, size, Order.Limit, limitprice, parent=parent, transmit=True)
+        return [parent, stop, limit]
+
+
+class BoxMacdRsiVector(VectorStrategy):
+    strategy_cls = BoxMacdRsiStrategy
+
+    def __init__(self, broker, bars, params, htf=None):
+        super().__init__(broker, bars, params, htf)
+        p = self.p
+        broker.setcommission(p.commission)
+        broker.set_slippage_perc(p.slippage, True, True, True, False)
+
+        c, o, h, l = self.closes, self.opens, self.highs, self.lows
+        self.rsi = self.indicator('rsi', period=p.rsi_length)['rsi']
+        macd = self.indicator('macd', fast=p.macd_fast, slow=p.macd_slow, signal=p.macd_signal)
+        self.atr = self.indicator('atr', period=p.atr_period)['atr']
+        self.volatility = self.indicator('stddev', period=p.volatility_period)['stddev']
+        pivot = self.indicator('sma', period=p.adaptive_pivot_period)['sma']
+
+        box_low = np.minimum(pivot * 0.98, vi.lowest(l, p.box_lookback))
+        is_hammer = (c > o) & (np.abs(l - vi.lowest(l, 5)) < 1e-12) & ((h - c) > 2 * (c - o))
+        is_doji = np.abs(c - o) < (h - l) * 0.1
+        near_support = (c > box_low * 0.98) & (c < box_low * 1.02)
+        rsi_ok = self.rsi > (50 if p.use_stricter_rsi else p.rsi_threshold)
+        macd_ok = macd['macd'] > (macd['signal'] if p.macd_above_signal else 0)
+        self.entry = near_support & (is_hammer | is_doji) & rsi_ok & macd_ok
+
+        self.start = max(
+            p.rsi_length + 1, p.macd_slow + p.macd_signal - 1, p.atr_period + 1,
+            p.volatility_period, p.adaptive_pivot_period, p.box_lookback,
+        ) - 1
+        self.active_bars = np.flatnonzero(self.entry)
+
+        self.position_size = 0
+        self.position_cost = 0
+        self.position_stop = 0
+        self.position_partial_limit = 0
+        self.position_final_limit = 0
+
+    def next(self, i):
+        if not self.broker.size:
+            if self.entry[i]:
+                self.enter_position(i, float(self.closes[i]))
+        else:
+            self.manage_position(i, float(self.closes[i]), float(self.lows[i]), float(self.highs[i]))
+
+    def enter_position(self, i, price):
+        p = self.p
+        volatility_factor = max(self.volatility[i] / self.closes[i], p.volatility_threshold)
+        atr_multiplier = p.atr_multiplier * (1 + volatility_factor)
+        stop_price = price - self.atr[i] * atr_multiplier
+        risk_amount = self.broker.value * (p.risk_percent / 100.0)
+        position_size = float(risk_amount / max((price - stop_price), 1e-6))
+
+        self.buy(i, position_size)
+        self.position_size = position_size
+        self.position_cost = position_size * price
+        self.position_stop = stop_price
+        self.position_partial_limit = price + self.atr[i] * p.partial_atr_mult
+        self.position_final_limit = price + self.atr[i] * p.final_atr_mult
+
+    def manage_position(self, i, price, low, high):
+        if low <= self.position_stop:
+            self.close(i)
+            return
+        if self.p.partial_exit and high >= self.position_partial_limit:
+            partial_size = self.position_size * (self.p.partial_pct / 100.0)
+            self.sell(i, partial_size)
+            self.position_size -= partial_size
+        if high >= self.position_final_limit:
+            self.close(i)
+
+
+class IntradayMomentumVector(VectorStrategy):
+    strategy_cls = IntradayMomentumStrategy
+
+    def __init__(self, broker, bars, params, htf=None):
+        super().__init__(broker, bars, params, htf)
+        p = self.p
+        c = self.closes
+        dmi = self.indicator('dmi', period=p.adx_length)
+        ema_short = self.indicator('ema', period=p.ema_short_length)['ema']
+        ema_long = self.indicator('ema', period=p.ema_long_length)['ema']
+        rsi = self.indicator('rsi', period=p.rsi_length)['rsi']
+        stoch = self.indicator('stochastic', period=p.stoch_length, k_smooth=p.stoch_k_smooth,
+                               d_smooth=p.stoch_d_smooth, scale_first=False)
+        stoch_k, stoch_d = stoch['k'], stoch['d']
+        atr = self.indicator('atr', period=p.atr_period)['atr']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            atr_percent = np.where(c != 0, (atr / c) * 100, 0)
+        self.dynamic_sl = np.maximum(p.stop_loss_perc, atr_percent * p.atr_factor_sl)
+        self.dynamic_tp = np.maximum(p.take_profit_perc, atr_percent * p.atr_factor_tp)
+
+        bullish_momentum = (rsi > p.rsi_oversold) & (rsi < p.rsi_overbought)
+        stoch_cross_up = (vi.shift(stoch_k) < vi.shift(stoch_d)) & (stoch_k > stoch_d)
+        stoch_cross_down = (vi.shift(stoch_k) > vi.shift(stoch_d)) & (stoch_k < stoch_d)
+        strong_trend = dmi['adx'] > p.adx_threshold
+
+        self.long_entry = ((ema_short > ema_long) & bullish_momentum & stoch_cross_up & (stoch_k < 50)
+                           & strong_trend & (dmi['plusDI'] > dmi['minusDI']))
+        self.short_entry = ((ema_short < ema_long) & bullish_momentum & stoch_cross_down & (stoch_k > 50)
+                            & strong_trend & (dmi['minusDI'] > dmi['plusDI']))
+        self.long_exit = ((rsi > p.rsi_overbought) & (stoch_k > p.stoch_overbought)) | (ema_short < ema_long)
+        self.short_exit = ((rsi < p.rsi_oversold) & (stoch_k < p.stoch_oversold)) | (ema_short > ema_long)
+
+        self.days = self.time // MS_PER_DAY
+        time_of_day = (self.time % MS_PER_DAY) * 1000
+        self.in_session = (
+            (time_of_day >= self._microseconds(p.session_start)) & (time_of_day <= self._microseconds(p.session_end))
+            if p.use_session_filter else np.ones(len(c), dtype=bool)
+        )
+
+        stoch_period = p.stoch_length + p.stoch_k_smooth + p.stoch_d_smooth - 2
+        self.start = max(
+            3 * p.adx_length, p.ema_short_length, p.ema_long_length, p.rsi_length + 1,
+            stoch_period, p.atr_period + 1, p.stoch_length,
+        ) - 1
+        self.min_bars = max(p.ema_long_length, p.stoch_length, p.rsi_length)
+        tradable = self.in_session & (np.arange(len(c)) + 1 >= self.min_bars)
+        self.active_bars = np.flatnonzero((self.long_entry | self.short_entry) & tradable)
+
+        self.trades_today = 0
+        self.current_day = None
+
+    @staticmethod
+    def _microseconds(t: datetime.time) -> int:
+        return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+
+    def next(self, i):
+        day = self.days[i]
+        if self.current_day != day:
+            self.current_day = day
+            self.trades_today = 0
+
+        if not self.in_session[i] or i + 1 < self.min_bars:
+            return
+
+        close = float(self.closes[i])
+        can_trade = self.trades_today < self.p.max_trades_per_day
+        if not self.broker.size and self.long_entry[i] and can_trade:
+            self.trades_today += 1
+            self.buy_bracket(
+                i, 1,
+                limitprice=close * (1.0 + self.dynamic_tp[i] / 100.0),
+                stopprice=close * (1.0 - self.dynamic_sl[i] / 100.0),
+            )
+        if not self.broker.size and self.short_entry[i] and can_trade:
+            self.trades_today += 1
+            self.sell_bracket(
+                i, 1,
+                limitprice=close * (1.0 - self.dynamic_tp[i] / 100.0),
+                stopprice=close * (1.0 + self.dynamic_sl[i] / 100.0),
+            )
+
+        if self.broker.size:
+            if self.broker.size > 0 and self.long_exit[i]:
+                self.close(i)
+            if self.broker.size < 0 and self.short_exit[i]:
+                self.close(i)
+
+
+class IBPriceActionVector(VectorStrategy):
+    strategy_cls = IBPriceActionStrategy
+
+    def __init__(self, broker, bars, params, htf=None):
+        super().__init__(broker, bars, params, htf)
+        p = self.p
+        c, h, l, v = self.closes, self.highs, self.lows, self.volumes
+        self.atr = self.indicator('atr', period=p.atrLength)['atr']
+        ema = self.indicator('ema', period=50)['ema']
+        vol_sma = self.indicator('sma', period=20, source='volume')['sma']
+
+        self.high_m1, self.low_m1 = vi.shift(h), vi.shift(l)
+        inside_bar = (self.high_m1 < vi.shift(h, 2)) & (self.low_m1 > vi.shift(l, 2))
+        close_m1 = vi.shift(c)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inside_perc = np.where(close_m1 != 0, (self.high_m1 - self.low_m1) / close_m1 * 100, 0.0)
+        setup = inside_bar & (inside_perc >= p.minInsideBarSize)
+
+        self.long_cond = setup & (h > self.high_m1)
+        self.short_cond = setup & (l < self.low_m1)
+        if p.useTrendFilter:
+            self.long_cond &= c > ema
+            self.short_cond &= c < ema
+        if p.useVolumeFilter:
+            vol_ok = v > vol_sma * p.volMultiplier
+            self.long_cond &= vol_ok
+            self.short_cond &= vol_ok
+
+        self.start = max(50, 20, p.atrLength + 1, 3) - 1
+        self.active_bars = np.flatnonzero(
+            (self.long_cond & (self.high_m1 > self.low_m1)) | (self.short_cond & (self.high_m1 > self.low_m1))
+        )
+        self.longEntryOrder = None
+        self.shortEntryOrder = None
+
+    @property
+    def idle(self):
+        return self.longEntryOrder is None and self.shortEntryOrder is None
+
+    def next(self, i):
+        if self.broker.size or self.longEntryOrder or self.shortEntryOrder:
+            return
+
+        long_entry, long_sl = float(self.high_m1[i]), float(self.low_m1[i])
+        short_entry, short_sl = long_sl, long_entry
+        broker_val = self.broker.value
+
+        if self.long_cond[i] and long_entry > long_sl:
+            stop_dist = abs(long_entry - long_sl)
+            if stop_dist > 0:
+                size = broker_val * (self.p.risk_percent / 100.0) / stop_dist
+                self.longEntryOrder = self.buy(i, size, Order.Stop, long_entry)
+
+        if self.short_cond[i] and short_sl > short_entry:
+            stop_dist = abs(short_sl - short_entry)
+            if stop_dist > 0:
+                size = broker_val * (self.p.risk_percent / 100.0) / stop_dist
+                self.shortEntryOrder = self.sell(i, size, Order.Stop, short_entry)
+
+    def notify_order(self, order, i):
+        p = self.p
+        if order.status == Order.Completed:
+            fillprice = order.executed_price
+            if order.isbuy:
+                long_sl = float(self.lows[i - 1])
+                long_tp = (fillprice + self.atr[i] * p.atrMult) if p.useATRTP else (fillprice + (fillprice - long_sl) * p.rr_ratio)
+                self.sell(i, order.executed_size, Order.Stop, long_sl)
+                self.sell(i, order.executed_size, Order.Limit, float(long_tp))
+            else:
+                short_sl = float(self.highs[i - 1])
+                short_tp = (fillprice - self.atr[i] * p.atrMult) if p.useATRTP else (fillprice - (short_sl - fillprice) * p.rr_ratio)
+                self.buy(i, abs(order.executed_size), Order.Stop, short_sl)
+                self.buy(i, abs(order.executed_size), Order.Limit, float(short_tp))
+
+        if order.status in (Order.Canceled, Order.Margin, Order.Rejected, Order.Expired):
+            if self.longEntryOrder is not None and order.ref == self.longEntryOrder.ref:
+                self.longEntryOrder = None
+            if self.shortEntryOrder is not None and order.ref == self.shortEntryOrder.ref:
+                self.shortEntryOrder = None
+
+
+class StochasticMeanReversionVector(VectorStrategy):
+    strategy_cls = StochasticMeanReversion
+
+    def __init__(self, broker, bars, params, htf=None):
+        params = {k: v for k, v in params.items() if k != 'strategy_events'}
+        super().__init__(broker, bars, params, htf)
+        p = self.p
+        c = self.closes
+        self.atr = self.indicator('atr', period=p.atrPeriod)['atr']
+        stoch = self.indicator('stochastic', period=p.kLength, k_smooth=p.kSmoothing,
+                               d_smooth=p.dSmoothing, scale_first=True)
+        stoch_k = stoch['k']
+        crossover = vi.crossover(stoch_k, stoch['d'])
+        self.ma = self.indicator('sma', period=p.maLength)['sma']
+
+        start = max(p.atrPeriod + 1, p.kLength + p.kSmoothing + p.dSmoothing - 1, p.maLength,
+                    int(p.maLength * 1.5)) - 1
+        if htf is not None and len(htf['close']):
+            # Each bar sees the latest higher-timeframe candle stamped at or before it
+            htf_idx = np.searchsorted(htf['time'], self.time, side='right') - 1
+            ma_htf = self.indicator('sma', htf=True, period=p.maLength)['sma'][np.maximum(htf_idx, 0)]
+            ma_htf[htf_idx < 0] = np.nan
+            enough = np.flatnonzero(htf_idx + 1 >= p.maLength)
+            start = max(start, int(enough[0]) if len(enough) else len(c))
+        else:
+            ma_htf = self.ma
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = self.atr / c
+        self.long_signal = (stoch_k < p.oversold) & (crossover == 1) & (c < self.ma * (1 - deviation)) & (c > ma_htf)
+        self.short_signal = (stoch_k > p.overbought) & (crossover == -1) & (c > self.ma * (1 + deviation)) & (c < ma_htf)
+
+        self.start = start
+        self.active_bars = np.flatnonzero(self.long_signal | self.short_signal)
+        self.main_order = None
+
+    @property
+    def idle(self):
+        return self.main_order is None
+
+    def next(self, i):
+        p = self.p
+        close = float(self.closes[i])
+        if not self.broker.size and self.main_order is None:
+            if self.long_signal[i]:
+                self.main_order = self.buy_bracket(
+                    i, 1,
+                    stopprice=float(close - self.atr[i] * p.atrMultiplierSL),
+                    limitprice=float(close + self.atr[i] * p.atrMultiplierTP),
+                )
+            elif self.short_signal[i]:
+                self.main_order = self.sell_bracket(
+                    i, 1,
+                    stopprice=float(close + self.atr[i] * p.atrMultiplierSL),
+                    limitprice=float(close - self.atr[i] * p.atrMultiplierTP),
+                )
+        elif self.broker.size:
+            if self.broker.size > 0 and close >= self.ma[i]:
+                self.close(i)
+                self.main_order = None
+            elif self.broker.size < 0 and close <= self.ma[i]:
+                self.close(i)
+                self.main_order = None
+
+    def notify_order(self, order, i):
+        if order.status in (Order.Completed, Order.Canceled, Order.Rejected):
+            self.main_order = None
+
+
+VECTOR_STRATEGIES = {
+    BoxMacdRsiStrategy: BoxMacdRsiVector,
+    IntradayMomentumStrategy: IntradayMomentumVector,
+    IBPriceActionStrategy: IBPriceActionVector,
+    StochasticMeanReversion: StochasticMeanReversionVector,
+}
+
+
+def drawdown_analysis(values: np.ndarray) -> AutoOrderedDict:
+    """
+    bt.analyzers.DrawDown over a series of per-bar broker values.
+    """
+    host = SimpleNamespace()
+    bt.analyzers.DrawDown.create_analysis(host)
+    r = host.rets
+    if len(values):
+        maxvalue = np.maximum.accumulate(values)
+        moneydown = maxvalue - values
+        drawdown = 100.0 * moneydown / maxvalue
+
+        # Length of the current run of bars below the peak, at every bar
+        below = drawdown != 0
+        run_ids = np.cumsum(~below)
+        runs = np.bincount(run_ids[below]) if below.any() else np.zeros(1, dtype=np.int64)
+
+        r.moneydown = float(moneydown[-1])
+        r.drawdown = float(drawdown[-1])
+        r.max.moneydown = max(r.max.moneydown, float(moneydown.max()))
+        r.max.drawdown = max(r.max.drawdown, float(drawdown.max()))
+        r.len = int(runs[run_ids[-1]]) if below[-1] else 0
+        r.max.len = max(r.max.len, int(runs.max()))
+    r._close()
+    return r
+
+
+def sharpe_analysis(times: np.ndarray, values: np.ndarray, initial_value: float) -> OrderedDict:
+    """
+    bt.analyzers.SharpeRatio with its defaults: yearly returns against a 1% rate.
+    The rate goes through SharpeRatio's (1 + rate) - 1 conversion, whose rounding
+    the ratio inherits.
+    """
+    years = (times.astype('datetime64[ms]').astype('datetime64[Y]').astype(np.int64))
+    year_ends = np.flatnonzero(np.append(years[1:] != years[:-1], True)) if len(years) else []
+    returns, start_value = [], initial_value
+    for idx in year_ends:
+        returns.append((values[idx] / start_value) - 1.0)
+        start_value = values[idx]
+
+    rate = (1.0 + SHARPE_RISK_FREE_RATE) - 1.0
+    ratio = None
+    if returns:
+        ret_free = [float(r) - rate for r in returns]
+        ret_free_avg = average(ret_free)
+        try:
+            ratio = ret_free_avg / standarddev(ret_free, avgx=ret_free_avg, bessel=False)
+        except (ValueError, TypeError, ZeroDivisionError):
+            ratio = None
+    return OrderedDict([('sharperatio', ratio)])
+
+
+def run_vector_backtest(
+    data,
+    strategy_cls,
+    strategy_params: Optional[Dict[str, Any]] = None,
+    initial_capital: float = 10000.0,
+    htf_data=None,
+    early_stop: Optional[EarlyStopMonitor] = None
+) -> Tuple[List[Dict], float, Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Backtest one of the built-in strategies on arrays instead of Cerebro.
+
+    Returns the same (orders, final value, trade analysis, drawdown analysis,
+    sharpe analysis) tuple as GridBacktester.simulate(). With an early_stop
+    monitor the run ends after the bar where its rules trip, as Cerebro's does
+    with the EarlyStop analyzer; the results then cover the bars up to it.
+    """
+    if strategy_cls not in VECTOR_STRATEGIES:
+        raise ValueError(f"No vectorized implementation for {getattr(strategy_cls, '__name__', strategy_cls)}")
+
+    bars = bar_arrays(data)
+    htf = bar_arrays(htf_data) if htf_data is not None and len(htf_data) else None
+    broker = VectorBroker(initial_capital)
+    strategy = VECTOR_STRATEGIES[strategy_cls](broker, bars, dict(strategy_params or {}), htf)
+
+    trades = SimpleNamespace()
+    bt.analyzers.TradeAnalyzer.create_analysis(trades)
+    trade = VectorTrade()
+
+    opens, highs, lows, closes = (bars[col].tolist() for col in ('open', 'high', 'low', 'close'))
+    n = len(closes)
+    values = np.empty(n)
+    i = 0
+    while i < n:
+        if broker.idle and strategy.idle:
+            # Flat with nothing working: value stays at cash until next() can act
+            j = strategy.next_active(i)
+            if j > i:
+                values[i:j] = broker.value
+                stop = early_stop.check_flat(i + 1, j, broker.value) if early_stop else None
+                if stop:
+                    n = stop
+                    break
+                i = j
+                continue
+
+        broker.next(opens[i], highs[i], lows[i], closes[i])
+
+        notifications, broker.notifs = broker.notifs, []
+        trade_events = []
+        for order in notifications:
+            if not order.executed_size:
+                continue
+            for closed, opened, price, closedcomm, openedcomm in order.exbits:
+                if closed:
+                    trade.update(closed, price, closedcomm, i + 1)
+                    if trade.isclosed:
+                        trade_events.append(copy.copy(trade))
+                if opened:
+                    if trade.isclosed:
+                        trade = VectorTrade()
+                    trade.update(opened, price, openedcomm, i + 1)
+                    if trade.isclosed:
+                        trade_events.append(copy.copy(trade))
+                if trade.justopened:
+                    trade_events.append(copy.copy(trade))
+
+        for order in notifications:
+            strategy.notify_order(order, i)
+        for event in trade_events:
+            strategy.notify_trade(event, i)
+            bt.analyzers.TradeAnalyzer.notify_trade(trades, event)
+        if early_stop and trade_events:
+            early_stop.traded = True
+
+        values[i] = broker.value
+        if i >= strategy.start:
+            strategy.next(i)
+        i += 1
+        if early_stop and early_stop.check(i, values[i - 1]):
+            n = i
+            break
+
+    values = values[:n]
+    trades.rets._close()
+    final_value = broker.value
+    logger.info("Vector backtest finished: %d bars, final value %.2f", n, final_value)
+    return (
+        getattr(strategy, 'orders', []),
+        final_value,
+        trades.rets,
+        drawdown_analysis(values),
+        sharpe_analysis(bars['time'][:n], values, initial_capital),
+    )
@@ -0,0 +1,194 @@
+# src/vector_indicators.py
+"""
+NumPy implementations of the Backtrader indicators used by the built-in strategies.
+
+Every function takes float64 arrays and returns arrays of the same length, with
+NaN wherever Backtrader would not have produced a value yet (its minimum period).
+The recurrences (seeding, smoothing factors, operand order) follow Backtrader's
+own implementations so both engines see the same indicator values.
+"""
+import math
+import numpy as np
+from typing import Dict
+
+
+def first_valid(values: np.ndarray) -> int:
+    """
+    Index of the first non-NaN value (len(values) if there is none).
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    values(-periods) in Backtrader terms: the value `periods` bars ago.
+    """
+    out = np.full(len(values), np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def _pow(values: np.ndarray, exponent) -> np.ndarray:
+    # Python's float pow, as Backtrader's line operations use: np.power takes
+    # square/sqrt shortcuts that can land an ulp away
+    return np.array([v ** exponent for v in values.tolist()], dtype=np.float64)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Simple moving average. Window sums use math.fsum like Backtrader does: a
+    pairwise NumPy sum is off by an ulp often enough to flip threshold checks.
+    """
+    out = np.full(len(values), np.nan)
+    start = first_valid(values)
+    if len(values) - start >= period:
+        vals = values[start:].tolist()
+        fsum = math.fsum
+        out[start + period - 1:] = [fsum(vals[k:k + period]) / period for k in range(len(vals) - period + 1)]
+    return out
+
+
+def _rolling_extremum(values: np.ndarray, period: int, ufunc: np.ufunc) -> np.ndarray:
+    """
+    Rolling min/max (ufunc np.minimum/np.maximum) in O(n) whatever the period
+    (van Herk/Gil-Werman): split the series into blocks of `period` values, take
+    running extremes forward and backward within each block, and combine the
+    backward one at the window's first value with the forward one at its last.
+    """
+    out = np.full(len(values), np.nan)
+    start = first_valid(values)
+    vals = values[start:]
+    n = len(vals)
+    if n < period:
+        return out
+    blocks = -(-n // period)
+    # The padding only reaches windows that would end past the series
+    padded = np.empty(blocks * period)
+    padded[:n] = vals
+    padded[n:] = vals[-1]
+    padded = padded.reshape(blocks, period)
+    forward = ufunc.accumulate(padded, axis=1).ravel()
+    backward = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[start + period - 1:] = ufunc(backward[:n - period + 1], forward[period - 1:n])
+    return out
+
+
+def highest(values: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extremum(values, period, np.maximum)
+
+
+def lowest(values: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_extremum(values, period, np.minimum)
+
+
+def exp_smoothing(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    Backtrader's ExponentialSmoothing: seeded with the SMA of the first `period`
+    values, then prev * (1 - alpha) + value * alpha.
+    """
+    out = np.full(len(values), np.nan)
+    start = first_valid(values)
+    seed_idx = start + period - 1
+    if seed_idx >= len(values):
+        return out
+
+    alpha1 = 1.0 - alpha
+    prev = math.fsum(values[start:seed_idx + 1].tolist()) / period
+    smoothed = [prev]
+    # Plain floats in a list loop are an order of magnitude faster than ndarray indexing
+    for value in values[seed_idx + 1:].tolist():
+        prev = prev * alpha1 + value * alpha
+        smoothed.append(prev)
+    out[seed_idx:] = smoothed
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    return exp_smoothing(values, period, 2.0 / (1.0 + period))
+
+
+def smma(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's smoothed moving average (used by RSI and ATR).
+    """
+    return exp_smoothing(values, period, 1.0 / period)
+
+
+def stddev(values: np.ndarray, period: int) -> np.ndarray:
+    mean_sq = sma(_pow(values, 2), period)
+    sq_mean = _pow(sma(values, period), 2)
+    return _pow(np.abs(mean_sq - sq_mean), 0.5)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    change = close - shift(close)
+    up = np.where(np.isnan(change), np.nan, np.maximum(change, 0.0))
+    down = np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = smma(up, period) / smma(down, period)
+        return 100.0 - 100.0 / (1.0 + rs)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = shift(close)
+    return np.fmax(high, prev_close) - np.fmin(low, prev_close) + np.where(np.isnan(prev_close), np.nan, 0.0)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return smma(true_range(high, low, close), period)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return {'macd': macd_line, 'signal': signal_line, 'histo': macd_line - signal_line}
+
+
+def directional_movement(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int = 14
+) -> Dict[str, np.ndarray]:
+    """
+    Wilder's DMI: +DI, -DI, ADX and ADXR lines of bt.indicators.DirectionalMovement.
+    """
+    average_range = atr(high, low, close, period)
+    upmove = high - shift(high)
+    downmove = shift(low) - low
+    undefined = np.where(np.isnan(upmove), np.nan, 0.0)
+    plus_dm = np.where((upmove > downmove) & (upmove > 0.0), upmove, 0.0) + undefined
+    minus_dm = np.where((downmove > upmove) & (downmove > 0.0), downmove, 0.0) + undefined
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * smma(plus_dm, period) / average_range
+        minus_di = 100.0 * smma(minus_dm, period) / average_range
+        dx = np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx = 100.0 * smma(dx, period)
+    adxr = (adx + shift(adx, period)) / 2.0
+    return {'plusDI': plus_di, 'minusDI': minus_di, 'adx': adx, 'adxr': adxr}
+
+
+def crossover(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """
+    bt.indicators.CrossOver: +1 when `fast` crosses above `slow`, -1 when it
+    crosses below, 0 otherwise. The previous non-zero difference is carried over
+    equal bars, as Backtrader's NonZeroDifference does.
+    """
+    out = np.full(len(fast), np.nan)
+    start = max(first_valid(fast), first_valid(slow))
+    if start + 1 >= len(fast):
+        return out
+
+    diff = fast[start:] - slow[start:]
+    # Forward-fill zero differences with the last non-zero one (the first value seeds as is)
+    idx = np.where((diff != 0) | (np.arange(len(diff)) == 0), np.arange(len(diff)), 0)
+    nzd = diff[np.maximum.accumulate(idx)]
+
+    prev_nzd = nzd[:-1]
+    up = (prev_nzd < 0.0) & (fast[start + 1:] > slow[start + 1:])
+    down = (prev_nzd > 0.0) & (fast[start + 1:] < slow[start + 1:])
+    out[start + 1:] = up.astype(float) - down.astype(float)
+    return out
@@ -0,0 +1,165 @@
+# src/walk_forward.py
+"""
+Walk-forward analysis: optimize on a train window, evaluate the winner on the
+window that follows, roll forward and stitch the out-of-sample results.
+
+Windows are row offsets into the one series held by the ParameterOptimizer, so
+the whole analysis fetches the candles once and reuses one process pool. Every
+window is backtested on its own rows, so train and test windows both need the
+backtester's MIN_DATA_LENGTH bars.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import logger
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.ohlcv_cache import to_epoch_ms
+from src.grid_backtester import MIN_DATA_LENGTH
+from src.optimizer import ParameterOptimizer
+
+
+def walk_forward_windows(
+    n_bars: int,
+    train_bars: int,
+    test_bars: int,
+    step_bars: Optional[int] = None,
+    anchored: bool = False
+) -> List[Tuple[int, int, int]]:
+    """
+    (train_start, train_end, test_end) row offsets; each test window is
+    train_end..test_end-1. Windows advance by step_bars (default test_bars) and
+    with anchored=True every train window starts at row 0.
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars and test_bars must be positive")
+    step = step_bars or test_bars
+    windows = []
+    train_start = 0
+    while train_start + train_bars + test_bars <= n_bars:
+        train_end = train_start + train_bars
+        windows.append((0 if anchored else train_start, train_end, train_end + test_bars))
+        train_start += step
+    return windows
+
+
+def _bar_times(data) -> np.ndarray:
+    if isinstance(data, CandleArrays):
+        return np.asarray(data.time, dtype=np.int64)
+    return to_epoch_ms(data['time'])
+
+
+class WalkForwardAnalysis:
+    """
+    Rolling train/test evaluation on top of a ParameterOptimizer, which supplies
+    the data, the strategy settings, the objective and the worker pool.
+    """
+
+    def __init__(
+        self,
+        optimizer: ParameterOptimizer,
+        train_bars: int,
+        test_bars: int,
+        step_bars: Optional[int] = None,
+        anchored: bool = False
+    ):
+        if min(train_bars, test_bars) < MIN_DATA_LENGTH:
+            raise ValueError(
+                f"Walk-forward windows need at least {MIN_DATA_LENGTH} bars each to backtest, "
+                f"got train_bars={train_bars} and test_bars={test_bars}"
+            )
+        self.optimizer = optimizer
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars
+        self.anchored = anchored
+
+    def run(self, combinations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Optimize every train window in parallel, evaluate each window's best
+        combination on its test window and compound the test returns into one
+        out-of-sample equity curve (epoch-ms times).
+
+        Windows whose train or test runs failed carry an 'error' and are listed
+        in 'failed_windows'; the curve compounds the other windows. Raises
+        ValueError when no window has an out-of-sample result.
+        """
+        optimizer = self.optimizer
+        if optimizer.data is None:
+            optimizer.load_data()
+        times = _bar_times(optimizer.data)
+        windows = walk_forward_windows(len(times), self.train_bars, self.test_bars, self.step_bars, self.anchored)
+        if not windows:
+            raise ValueError(
+                f"Series of {len(times)} bars is too short for {self.train_bars} train + {self.test_bars} test bars"
+            )
+        logger.info("Walk-forward over %d windows x %d combinations", len(windows), len(combinations))
+
+        with optimizer:
+            # All train windows share one batch so the pool stays busy across windows
+            train_runs = [
+                {'params': params, 'window': (train_start, train_end), 'group': w}
+                for w, (train_start, train_end, _) in enumerate(windows)
+                for params in combinations
+            ]
+            by_window = defaultdict(list)
+            for result in optimizer.iter_runs(train_runs):
+                by_window[train_runs[result['index']]['group']].append(result)
+
+            best, train_errors = {}, {}
+            for w in range(len(windows)):
+                ranked = optimizer.rank(by_window[w])
+                if ranked and ranked[0]['score'] is not None:
+                    best[w] = ranked[0]
+                else:
+                    train_errors[w] = next((r['error'] for r in ranked if 'error' in r), "No train run has a score")
+                    logger.warning("No valid train result for walk-forward window %d: %s", w, train_errors[w])
+
+            test_runs = [{'params': best[w]['params'], 'window': (windows[w][1], windows[w][2])} for w in sorted(best)]
+            test_results = {}
+            for result in optimizer.iter_runs(test_runs):
+                test_results[sorted(best)[result['index']]] = result
+
+        return self._stitch(windows, best, test_results, train_errors, times)
+
+    def _stitch(self, windows, best, test_results, train_errors, times) -> Dict[str, Any]:
+        initial_capital = self.optimizer.settings['initial_capital']
+        equity = initial_capital
+        curve = []
+        report = []
+        failed = []
+        for w, (train_start, train_end, test_end) in enumerate(windows):
+            entry = {
+                'train': {'start': int(times[train_start]), 'end': int(times[train_end - 1])},
+                'test': {'start': int(times[train_end]), 'end': int(times[test_end - 1])},
+                'params': best[w]['params'] if w in best else None,
+                'train_score': best[w]['score'] if w in best else None,
+                'result': test_results.get(w),
+            }
+            report.append(entry)
+
+            result = test_results.get(w)
+            if result is None or 'error' in result:
+                entry['error'] = result['error'] if result else train_errors[w]
+                failed.append(w)
+                continue
+            # Each test window ran from initial_capital; compound its return onto the curve
+            if not curve:
+                curve.append({'time': entry['test']['start'], 'value': equity})
+            equity *= result['final_value'] / initial_capital
+            curve.append({'time': entry['test']['end'], 'value': equity})
+
+        if len(failed) == len(windows):
+            raise ValueError(f"Every walk-forward window failed (first error: {report[0]['error']})")
+        if failed:
+            logger.warning("Walk-forward windows %s failed and are left out of the equity curve", failed)
+
+        return {
+            'objective': self.optimizer.objective,
+            'windows': report,
+            'failed_windows': failed,
+            'equity_curve': curve,
+            'final_value': equity,
+            'net_profit': equity - initial_capital,
+        }
@@ -0,0 +1,65 @@
+import threading
+import time
+import pandas as pd
+
+from src.data_handler.bulk_downloader import BulkDownloader
+from src.data_handler.rate_limiter import RateLimiter
+
+
+class FakeHandler:
+    def __init__(self, delay=0.05, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fetch_historical_data(self, symbol, interval, start_time=None, end_time=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if symbol in self.fail:
+            raise RuntimeError("exchange unavailable")
+        return pd.DataFrame({"time": [pd.Timestamp("2024-01-01")], "close": [1.0]})
+
+
+def test_downloads_series_concurrently_with_bounded_workers():
+    handler = FakeHandler()
+    progress = []
+    downloader = BulkDownloader(handler, max_workers=4,
+                                progress_callback=lambda done, total, *_: progress.append((done, total)))
+    series = [(f"SYM{i}USDT", "1h") for i in range(12)]
+
+    started = time.monotonic()
+    results = downloader.download(series)
+    elapsed = time.monotonic() - started
+
+    assert set(results) == set(series)
+    assert handler.max_active == 4
+    assert elapsed < 12 * handler.delay
+    assert progress[-1] == (12, 12)
+
+
+def test_failed_series_are_reported_as_empty_frames():
+    errors = []
+    downloader = BulkDownloader(FakeHandler(delay=0, fail={"BADUSDT"}),
+                                progress_callback=lambda *args: errors.append(args[-1]))
+
+    results = downloader.download([("BTCUSDT", "1h"), ("BADUSDT", "1h")])
+
+    assert results[("BADUSDT", "1h")].empty
+    assert not results[("BTCUSDT", "1h")].empty
+    assert sum(e is not None for e in errors) == 1
+
+
+def test_rate_limiter_spaces_requests_after_burst():
+    limiter = RateLimiter(rate=50, burst=1)
+
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    assert time.monotonic() - started >= 5 / 50 * 0.9
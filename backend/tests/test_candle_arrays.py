@@ -0,0 +1,107 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_handler.array_feed import CandleArrayData
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.ohlcv_cache import NumpyCache
+
+
+@pytest.fixture
+def candles():
+    times = pd.date_range("2024-01-01", periods=200, freq="h")
+    # Prices on a 0.25 grid are exact in float32, so both feeds see identical values
+    close = 100.0 + np.round(np.sin(np.arange(len(times)) / 7.0) * 40) / 4
+    return pd.DataFrame({
+        "time": times,
+        "open": close - 0.25,
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": np.arange(len(times), dtype=float),
+    })
+
+
+class RecordCloses(bt.Strategy):
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.data.close, period=10)
+        self.seen = []
+
+    def next(self):
+        self.seen.append((self.data.datetime.datetime(0), self.data.close[0], self.sma[0]))
+
+
+def run(feed):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(feed)
+    cerebro.addstrategy(RecordCloses)
+    return cerebro.run()[0].seen
+
+
+def test_candle_arrays_round_trip(candles):
+    arrays = CandleArrays.from_frame(candles)
+
+    assert arrays.close.dtype == np.float32
+    assert arrays.nbytes == len(candles) * 28
+    pd.testing.assert_frame_equal(arrays.to_frame(), candles, check_dtype=False)
+
+
+def test_candle_arrays_memory_map(tmp_path, candles):
+    CandleArrays.from_frame(candles).save(str(tmp_path))
+
+    mapped = CandleArrays.load(str(tmp_path))
+    window = mapped.window(int(candles["time"].iloc[10].value // 10**6), int(candles["time"].iloc[19].value // 10**6))
+
+    assert isinstance(mapped.close, np.memmap)
+    assert len(window) == 10
+    assert window.close[0] == candles["close"].iloc[10]
+
+
+def test_cache_loads_float32_arrays(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+
+    arrays = CandleArrays.from_columns(cache.load_arrays("BTC/USDT", "1h", dtype=np.float32))
+
+    assert len(arrays) == len(candles)
+    assert arrays.volume.dtype == np.float32
+
+
+def test_array_feed_matches_pandas_feed(candles):
+    pandas_feed = bt.feeds.PandasData(dataname=candles.set_index("time"), openinterest=-1)
+    array_feed = CandleArrayData(candles=CandleArrays.from_frame(candles))
+
+    assert run(array_feed) == run(pandas_feed)
+
+
+def mapped_close_sum(cache_dir):
+    arrays = NumpyCache(cache_dir).map_arrays("BTC/USDT", "1h")
+    return isinstance(arrays["close"], np.memmap), float(arrays["close"].sum())
+
+
+def test_map_arrays_compacts_and_maps_cache_files(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.iloc[:150])
+    cache.append("BTC/USDT", "1h", candles.iloc[150:])
+
+    mapped = CandleArrays.from_columns(
+        cache.map_arrays("BTC/USDT", "1h", start_time=int(candles["time"].iloc[100].value // 10**6)),
+        dtype=None,
+    )
+
+    assert cache.read_meta("BTC/USDT", "1h")["segments"] == []
+    assert isinstance(mapped.close, np.memmap)
+    assert not mapped.close.flags.writeable
+    assert mapped.close.tolist() == candles["close"].iloc[100:].tolist()
+
+
+def test_mapped_series_is_readable_from_worker_processes(tmp_path, candles):
+    from concurrent.futures import ProcessPoolExecutor
+
+    NumpyCache(str(tmp_path)).save("BTC/USDT", "1h", candles)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(mapped_close_sum, [str(tmp_path)] * 2))
+
+    assert results == [(True, pytest.approx(candles["close"].sum()))] * 2
@@ -0,0 +1,56 @@
+import pytest
+
+from src.data_handler.memory_store import get_shared_store
+from src.early_stop import EarlyStopRules
+from src.grid_backtester import GridBacktester
+from tests.test_vector_engine import random_walk
+
+GRID = {"rsi_threshold": 30, "box_lookback": 10}
+
+
+def run(engine, rules, strategy_type="grid", box_params=GRID, fast=True, bars=2000):
+    get_shared_store().clear()
+    backtester = GridBacktester("TEST/USDT", "1h", 10000.0, 2.0, box_params, strategy_type,
+                                engine=engine, fast=fast, early_stop=rules)
+    backtester.store_data("TEST/USDT", random_walk(bars, seed=5))
+    return backtester.simulate(), backtester.truncated
+
+
+@pytest.mark.parametrize("rules, reason", [
+    ({"max_drawdown": 0.5}, "max_drawdown"),
+    ({"min_equity_pct": 99.5}, "min_equity"),
+    ({"no_trade_bars": 25}, "no_trades"),
+])
+def test_engines_stop_on_the_same_bar(rules, reason):
+    expected, truncated = run("backtrader", rules, fast=False)
+    assert truncated["reason"] == reason
+    assert 0 < truncated["bars"] < truncated["total_bars"] == 2000
+
+    for engine, fast in (("backtrader", True), ("vector", True)):
+        assert run(engine, rules, fast=fast) == (expected, truncated)
+
+
+@pytest.mark.parametrize("engine", ["backtrader", "vector"])
+def test_rules_that_never_trip_leave_the_run_alone(engine):
+    expected, _ = run(engine, None)
+    result, truncated = run(engine, {"max_drawdown": 99, "min_equity_pct": 1, "no_trade_bars": 1500})
+    assert truncated is None
+    assert result == expected
+
+
+def test_truncated_run_covers_the_bars_up_to_the_stop():
+    (_, _, trades, drawdown, _), truncated = run("vector", {"max_drawdown": 0.5})
+    # The last bar is the one that broke the limit (measured from the peak value, not the capital)
+    assert drawdown.drawdown == drawdown.max.drawdown > 0.5
+    assert trades.total.total >= 1
+
+
+def test_rules_are_validated():
+    assert EarlyStopRules.from_dict({}) is None
+    assert EarlyStopRules.from_dict({"max_drawdown": 20, "no_trade_bars": None}).as_dict() == {
+        "max_drawdown": 20, "min_equity_pct": None, "no_trade_bars": None,
+    }
+    with pytest.raises(ValueError):
+        EarlyStopRules.from_dict({"max_dd": 20})
+    with pytest.raises(ValueError):
+        EarlyStopRules(min_equity_pct=-5)
@@ -0,0 +1,32 @@
+from src.exchange_pool import ExchangeClientPool
+
+
+def test_clients_are_shared_per_exchange_and_credentials():
+    pool = ExchangeClientPool()
+
+    public = pool.get("mexc")
+    assert pool.get("MEXC") is public
+    assert pool.get("mexc", api_key="key", api_secret="secret") is not public
+    assert pool.get("mexc", api_key="key", api_secret="secret") is pool.get("mexc", "key", "secret")
+
+
+def test_client_throttling_uses_shared_rate_limiter(mocker):
+    limiter = mocker.Mock()
+    mocker.patch("src.exchange_pool.get_rate_limiter", return_value=limiter)
+    client = ExchangeClientPool().get("mexc")
+
+    client.throttle(3)
+
+    limiter.acquire.assert_called_once_with(3)
+
+
+def test_exchange_api_reuses_pooled_client(mocker):
+    from src.api_integration import ExchangeAPI
+
+    get_client = mocker.patch("src.api_integration.get_exchange_client")
+
+    first = ExchangeAPI(api_key="key", api_secret="secret", exchange_name="mexc", use_sdk=False)
+    second = ExchangeAPI(api_key="key", api_secret="secret", exchange_name="mexc", use_sdk=False)
+
+    assert first.client is second.client
+    assert get_client.call_count == 2
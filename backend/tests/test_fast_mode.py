@@ -0,0 +1,18 @@
+import pytest
+
+from tests.test_vector_engine import random_walk, simulate
+
+
+@pytest.mark.parametrize("strategy_type, box_params, risk, htf_interval", [
+    ("grid", {"rsi_threshold": 30, "box_lookback": 10}, 2.0, None),
+    ("momentum", {}, 0.5, None),
+    ("stoch_mean_reversion", {"oversold": 40, "overbought": 60}, 1.0, "4h"),
+])
+def test_fast_mode_matches_default_cerebro(strategy_type, box_params, risk, htf_interval):
+    candles = random_walk(3000, seed=1, start="2023-11-01")
+
+    expected = simulate("backtrader", strategy_type, candles, box_params, risk, htf_interval)
+    result = simulate("backtrader", strategy_type, candles, box_params, risk, htf_interval, fast=True)
+
+    assert result[2].total.total > 0
+    assert result == expected
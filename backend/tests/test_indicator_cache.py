@@ -0,0 +1,88 @@
+import backtrader as bt
+import numpy as np
+import pytest
+
+from src import indicator_cache as ic
+from src.indicator_cache import get_indicator_cache
+from tests.test_vector_engine import random_walk, simulate
+
+INDICATORS = [
+    (ic.CachedSMA, dict(period=20, source="volume")),
+    (ic.CachedEMA, dict(period=21)),
+    (ic.CachedRSI, dict(period=14)),
+    (ic.CachedATR, dict(period=14)),
+    (ic.CachedStdDev, dict(period=20)),
+    (ic.CachedMACD, dict(fast=12, slow=26, signal=9)),
+    (ic.CachedDMI, dict(period=14)),
+    (ic.CachedStochastic, dict(period=14, k_smooth=3, d_smooth=3, scale_first=True)),
+    (ic.CachedStochastic, dict(period=14, k_smooth=3, d_smooth=3, scale_first=False)),
+]
+
+
+class AllIndicators(bt.Strategy):
+    def __init__(self):
+        self.indicators = [cls(self.data, **params) for cls, params in INDICATORS]
+
+
+@pytest.fixture
+def cache():
+    cache = get_indicator_cache()
+    budget = cache.max_bytes
+    cache.clear()
+    yield cache
+    cache.max_bytes = budget
+    cache.clear()
+
+
+def run_indicators(candles, **cerebro_kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **cerebro_kwargs)
+    cerebro.adddata(bt.feeds.PandasData(dataname=candles.set_index("time")))
+    cerebro.addstrategy(AllIndicators)
+    return cerebro.run()[0].indicators
+
+
+@pytest.mark.parametrize("runonce", [True, False])
+def test_cached_indicators_match_backtrader(cache, runonce):
+    candles = random_walk(600, seed=3)
+    cached = run_indicators(candles, runonce=runonce)
+    cache.max_bytes = 0  # stock Backtrader indicators
+    stock = run_indicators(candles, runonce=runonce)
+
+    for got, expected in zip(cached, stock):
+        assert got._minperiod == expected._minperiod
+        for got_line, expected_line in zip(got.lines, expected.lines):
+            assert got_line._minperiod == expected_line._minperiod
+            np.testing.assert_array_equal(np.array(got_line.array), np.array(expected_line.array))
+
+
+def test_feed_is_copied_and_hashed_once_per_run(cache, mocker):
+    fingerprint = mocker.spy(ic, "series_fingerprint")
+    copy = mocker.spy(ic, "feed_arrays")
+    run_indicators(random_walk(600, seed=3))
+
+    assert fingerprint.call_count == 1
+    assert copy.call_count == 1
+
+
+@pytest.mark.parametrize("engine", ["backtrader", "vector"])
+def test_exit_parameter_sweep_reuses_indicators(cache, engine):
+    candles = random_walk(1500, seed=1)
+    simulate(engine, "grid", candles, {"rsi_threshold": 30}, risk=1.0)
+    misses = cache.misses
+
+    simulate(engine, "grid", candles, {"rsi_threshold": 30}, risk=2.0)
+
+    assert misses > 0
+    assert cache.misses == misses
+    assert cache.hits >= misses
+
+
+def test_cache_evicts_least_recently_used(cache):
+    arrays = {col: np.arange(100, dtype=np.float64) + 1 for col in ic.SERIES_COLUMNS}
+    cache.max_bytes = 2 * 100 * 8
+    for period in (5, 10, 20):
+        ic.compute_indicator(arrays, "sma", period=period)
+
+    assert cache.stats()["entries"] == 2
+    ic.compute_indicator(arrays, "sma", period=5)
+    assert cache.misses == 4
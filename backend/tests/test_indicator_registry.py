@@ -0,0 +1,64 @@
+import backtrader as bt
+import pytest
+
+from src.indicator_cache import CachedDMI, CachedSMA, get_indicator_cache
+from src.indicator_registry import shared_indicator
+from src.rolling_indicators import RollingMin
+from src.trading_strategy import BoxMacdRsiStrategy, IntradayMomentumStrategy
+from tests.test_vector_engine import random_walk
+
+
+class RequestsTwice(bt.Strategy):
+    def __init__(self):
+        self.sma = shared_indicator(CachedSMA, self.data, period=20)
+        self.same_sma = shared_indicator(CachedSMA, self.data, period=20, source="close")
+        self.volume_sma = shared_indicator(CachedSMA, self.data, period=20, source="volume")
+        self.low = shared_indicator(RollingMin, self.data.low, period=5)
+        self.close = shared_indicator(RollingMin, self.data.close, period=5)
+
+
+def run(strategies, candles, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=candles.set_index("time")))
+    for strategy_cls in strategies:
+        cerebro.addstrategy(strategy_cls, **kwargs)
+    return cerebro.run()
+
+
+def indicators(strategy, *classes):
+    return [ind for ind in strategy._lineiterators[bt.LineIterator.IndType] if isinstance(ind, classes)]
+
+
+def test_same_indicator_and_parameters_share_an_instance():
+    strategy = run([RequestsTwice], random_walk(300, seed=1))[0]
+
+    assert strategy.same_sma is strategy.sma
+    assert strategy.volume_sma is not strategy.sma
+    assert strategy.close is not strategy.low
+    assert len(indicators(strategy, CachedSMA)) == 2
+
+
+def test_strategies_do_not_share_instances():
+    first, second = run([RequestsTwice, RequestsTwice], random_walk(300, seed=1))
+
+    assert first.sma is not second.sma
+    assert len(indicators(second, CachedSMA)) == 2
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_momentum_builds_a_single_dmi(cache_enabled):
+    cache = get_indicator_cache()
+    budget = cache.max_bytes
+    cache.max_bytes = budget if cache_enabled else 0
+    try:
+        strategy = run([IntradayMomentumStrategy], random_walk(600, seed=2))[0]
+    finally:
+        cache.max_bytes = budget
+
+    assert len(indicators(strategy, CachedDMI, bt.indicators.DirectionalMovement)) == 1
+
+
+def test_box_window_reuses_hammer_window():
+    strategy = run([BoxMacdRsiStrategy], random_walk(600, seed=3), box_lookback=5)[0]
+
+    assert strategy.box_lowest is strategy.lowest5
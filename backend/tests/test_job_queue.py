@@ -0,0 +1,170 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app as app_module
+from src.data_handler.memory_store import get_shared_store
+from src.grid_backtester import GridBacktester
+from src.job_queue import DONE, FAILED, CANCELLED, FINISHED, QUEUED, RUNNING, JobQueue, JobStore
+from tests.test_vector_engine import random_walk, simulate
+
+
+def echo(params, progress):
+    progress(0.5, "halfway")
+    return {"echo": params}
+
+
+def explode(params, progress):
+    raise ValueError("boom")
+
+
+HANDLERS = {"echo": echo, "explode": explode}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def queue(db_path):
+    queue = JobQueue(db_path, HANDLERS, max_workers=2)
+    yield queue
+    queue.shutdown()
+
+
+def wait_for(store, job_id, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id, with_result=True)
+        if job["status"] in FINISHED:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_store_lifecycle(db_path):
+    store = JobStore(db_path)
+    job_id = store.create("echo", {"symbol": "BTC/USDT"})
+    assert store.get(job_id)["status"] == QUEUED
+
+    assert store.claim(job_id)["status"] == RUNNING
+    assert store.claim(job_id) is None  # claimed once only
+    store.set_progress(job_id, 0.25, "simulating")
+    store.finish(job_id, {"final_value": 10100.0})
+
+    job = store.get(job_id, with_result=True)
+    assert (job["status"], job["progress"], job["message"]) == (DONE, 1.0, "simulating")
+    assert job["params"] == {"symbol": "BTC/USDT"}
+    assert job["result"] == {"final_value": 10100.0}
+    assert "result" not in store.list()[0]
+
+
+def test_only_queued_jobs_can_be_cancelled(db_path):
+    store = JobStore(db_path)
+    queued, running = store.create("echo", {}), store.create("echo", {})
+    store.claim(running)
+
+    assert store.cancel(queued) and store.get(queued)["status"] == CANCELLED
+    assert not store.cancel(running)
+    assert store.claim(queued) is None
+
+
+def test_queue_runs_jobs_in_worker_processes(queue):
+    done = queue.submit("echo", {"symbol": "ETH/USDT"})
+    failed = queue.submit("explode", {})
+
+    job = wait_for(queue.store, done["id"])
+    assert job["status"] == DONE
+    assert job["result"] == {"echo": {"symbol": "ETH/USDT"}}
+    assert job["message"] == "halfway"
+
+    job = wait_for(queue.store, failed["id"])
+    assert (job["status"], job["error"]) == (FAILED, "boom")
+
+    with pytest.raises(ValueError):
+        queue.submit("unknown", {})
+
+
+def test_persisted_jobs_resume_after_restart(db_path):
+    # Left behind by a previous server: one job never started, one interrupted mid-run
+    store = JobStore(db_path)
+    queued, interrupted = store.create("echo", {"n": 1}), store.create("echo", {"n": 2})
+    store.claim(interrupted)
+
+    queue = JobQueue(db_path, HANDLERS, max_workers=1)
+    try:
+        assert queue.resume() == 2
+        assert wait_for(store, queued)["result"] == {"echo": {"n": 1}}
+        assert wait_for(store, interrupted)["result"] == {"echo": {"n": 2}}
+    finally:
+        queue.shutdown()
+
+
+def test_jobs_api(queue, monkeypatch):
+    monkeypatch.setattr(app_module, "job_queue", queue)
+    monkeypatch.setattr(app_module, "JOB_HANDLERS", HANDLERS)
+    client = app_module.app.test_client()
+
+    response = client.post("/api/jobs", json={"kind": "echo", "params": {"symbol": "BTC/USDT"}})
+    assert response.status_code == 202
+    job_id = json.loads(response.data)["job_id"]
+
+    wait_for(queue.store, job_id)
+    data = json.loads(client.get(f"/api/jobs/{job_id}").data)
+    assert (data["data"]["status"], data["data"]["progress"]) == (DONE, 1.0)
+    data = json.loads(client.get(f"/api/jobs/{job_id}/result").data)
+    assert data == {"status": "success", "echo": {"symbol": "BTC/USDT"}}
+    assert [job["id"] for job in json.loads(client.get("/api/jobs?status=done").data)["data"]] == [job_id]
+
+    assert client.post("/api/jobs", json={"kind": "nope"}).status_code == 400
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.delete(f"/api/jobs/{job_id}").status_code == 409
+
+
+def test_pending_job_result_is_a_conflict(queue, monkeypatch):
+    monkeypatch.setattr(app_module, "job_queue", queue)
+    client = app_module.app.test_client()
+    job_id = queue.store.create("echo", {})  # stored but never dispatched
+
+    assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+    assert client.delete(f"/api/jobs/{job_id}").status_code == 200
+    assert queue.store.get(job_id)["status"] == CANCELLED
+
+
+def test_concurrent_first_requests_share_one_queue(monkeypatch):
+    created = []
+
+    class SlowQueue:
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+        def resume(self):
+            return 0
+
+    monkeypatch.setattr(app_module, "job_queue", None)
+    monkeypatch.setattr(app_module, "JobQueue", SlowQueue)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        queues = list(pool.map(lambda _: app_module.get_job_queue(), range(8)))
+
+    assert len(created) == 1
+    assert all(queue is created[0] for queue in queues)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_simulation_progress_callback(fast):
+    candles = random_walk(1500, seed=3)
+    expected = simulate("backtrader", "momentum", candles, fast=fast)
+
+    get_shared_store().clear()
+    reported = []
+    backtester = GridBacktester("TEST/USDT", "1h", 10000.0, 1.0, {}, "momentum", fast=fast,
+                                progress=reported.append)
+    backtester.store_data("TEST/USDT", candles.copy())
+
+    assert backtester.simulate() == expected
+    assert 50 <= len(reported) <= 101
+    assert reported == sorted(reported) and reported[-1] == pytest.approx(1.0, abs=0.01)
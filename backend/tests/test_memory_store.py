@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_handler.memory_store import SharedOHLCVStore
+
+
+def make_series(rows, start="2024-01-01"):
+    times = pd.date_range(start, periods=rows, freq="h")
+    values = np.arange(rows, dtype=float)
+    return pd.DataFrame({"time": times, "open": values, "high": values, "low": values,
+                         "close": values, "volume": values})
+
+
+def to_ms(ts):
+    return int(pd.Timestamp(ts).value // 10**6)
+
+
+def test_get_returns_requested_window_as_copy():
+    store = SharedOHLCVStore(max_bytes=10**6)
+    series = make_series(100)
+    store.put(("mexc", "BTCUSDT", "1h"), series)
+
+    window = store.get(("mexc", "BTCUSDT", "1h"), to_ms(series["time"][10]), to_ms(series["time"][19]))
+    window["close"] = -1.0
+
+    assert len(window) == 10
+    assert store.get(("mexc", "BTCUSDT", "1h"))["close"].min() == 0.0
+    assert store.last_timestamp(("mexc", "BTCUSDT", "1h")) == to_ms(series["time"].iloc[-1])
+
+
+def test_least_recently_used_series_is_evicted():
+    series = make_series(100)
+    size = int(series.memory_usage(index=True).sum())
+    store = SharedOHLCVStore(max_bytes=2 * size)
+
+    store.put(("mexc", "A", "1h"), series)
+    store.put(("mexc", "B", "1h"), series)
+    store.get(("mexc", "A", "1h"))
+    store.put(("mexc", "C", "1h"), series)
+
+    assert store.get(("mexc", "B", "1h")) is None
+    assert store.get(("mexc", "A", "1h")) is not None
+    assert store.stats()["series"] == 2
+
+
+def test_series_larger_than_budget_is_not_stored():
+    store = SharedOHLCVStore(max_bytes=100)
+
+    assert not store.put(("mexc", "A", "1h"), make_series(100))
+    assert store.get(("mexc", "A", "1h")) is None
+
+
+def test_invalidate_drops_series():
+    store = SharedOHLCVStore(max_bytes=10**6)
+    store.put(("mexc", "A", "1h"), make_series(10))
+
+    store.invalidate(("mexc", "A", "1h"))
+
+    assert store.get(("mexc", "A", "1h")) is None
+
+
+def test_copy_from_another_version_is_a_miss():
+    store = SharedOHLCVStore(max_bytes=10**6)
+    store.put(("mexc", "A", "1h"), make_series(10), version=1)
+
+    assert store.get(("mexc", "A", "1h"), version=1) is not None
+    assert store.get(("mexc", "A", "1h"), version=2) is None
+    assert store.stats()["series"] == 0
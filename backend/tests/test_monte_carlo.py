@@ -0,0 +1,143 @@
+import time
+from types import SimpleNamespace
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+import app as app_module
+from src.metrics import calculate_advanced_metrics
+from src.monte_carlo import run_monte_carlo
+from src.trading_strategy import record_trade
+from src.vector_engine import VectorTrade
+from tests.test_vector_engine import random_walk, simulate
+
+
+def trades(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"type": "sell", "time": str(i), "price": 100.0, "size": 2.0, "profit": float(profit)}
+            for i, profit in enumerate(rng.normal(2.0, 20.0, count))]
+
+
+def test_realized_metrics_match_calculate_advanced_metrics():
+    orders = trades(300)
+    final_value = 10000.0 + sum(order["profit"] for order in orders)
+    expected = calculate_advanced_metrics(orders, 10000.0, final_value)
+    result = run_monte_carlo(orders, 10000.0, iterations=200, seed=1)
+
+    assert result["final_equity"]["realized"] == pytest.approx(final_value)
+    assert result["max_drawdown"]["realized"] == pytest.approx(expected["max_drawdown"])
+    assert result["sharpe_ratio"]["realized"] == pytest.approx(expected["sharpe_ratio"])
+    assert sum(result["max_drawdown"]["histogram"]["counts"]) == 200
+
+
+def test_paths_are_reproducible_with_a_seed():
+    orders = trades(300)
+    first = run_monte_carlo(orders, 10000.0, iterations=500, seed=7)
+    assert run_monte_carlo(orders, 10000.0, iterations=500, seed=7) == first
+    assert run_monte_carlo(orders, 10000.0, iterations=500, seed=8) != first
+
+
+def test_shuffle_keeps_the_final_equity_but_not_the_drawdown():
+    orders = trades(300)
+    result = run_monte_carlo(orders, 10000.0, iterations=1000, method="shuffle", seed=1)
+    final_equity = result["final_equity"]
+    assert final_equity["min"] == pytest.approx(final_equity["max"]) == pytest.approx(final_equity["realized"])
+    assert result["probability_of_loss"] in (0.0, 1.0)
+    drawdown = result["max_drawdown"]
+    assert drawdown["min"] < drawdown["realized"] < drawdown["max"]
+
+
+def test_slippage_costs_twice_the_mean_per_trade():
+    orders = trades(500)
+    clean = run_monte_carlo(orders, 10000.0, iterations=2000, method="shuffle", seed=1)
+    slipped = run_monte_carlo(orders, 10000.0, iterations=2000, method="shuffle", slippage_bps=10, seed=1)
+    # 500 trades with a notional of 200, two fills of 10 bps each
+    expected_cost = 500 * 200.0 * 2 * 0.001
+    assert clean["final_equity"]["mean"] - slipped["final_equity"]["mean"] == pytest.approx(expected_cost, rel=0.02)
+    assert slipped["final_equity"]["std"] > 0
+
+
+@pytest.mark.parametrize("strategy_type, box_params, risk, bars, htf_interval", [
+    ("grid", {"rsi_threshold": 30, "box_lookback": 10}, 2.0, 3000, None),
+    ("momentum", {}, 0.5, 3000, None),
+    ("ib_price_action", {"useVolumeFilter": False}, 10.0, 700, None),
+    ("stoch_mean_reversion", {"oversold": 40, "overbought": 60}, 1.0, 3000, "4h"),
+])
+def test_backtest_trades_carry_their_entry_size(strategy_type, box_params, risk, bars, htf_interval):
+    orders, _, analysis, _, _ = simulate("backtrader", strategy_type, random_walk(bars, 1), box_params, risk,
+                                         htf_interval)
+    assert len(orders) == analysis.total.closed > 0
+    assert all(order["size"] > 0 for order in orders)
+    assert sum(order["profit"] for order in orders) == pytest.approx(analysis.pnl.gross.total)
+
+    clean = run_monte_carlo(orders, 10000.0, iterations=500, seed=1)
+    slipped = run_monte_carlo(orders, 10000.0, iterations=500, slippage_bps=10, seed=1)
+    assert slipped["final_equity"]["mean"] < clean["final_equity"]["mean"]
+
+
+class ScaleIn(bt.Strategy):
+    """Buys 1, adds 2 on the next bar and closes the 3 on the one after."""
+
+    def __init__(self):
+        self.orders = []
+        self.set_tradehistory()
+
+    def next(self):
+        step = len(self)
+        if step in (1, 2):
+            self.buy(size=step)
+        elif step == 3:
+            self.close()
+
+    def notify_trade(self, trade):
+        record_trade(self, trade, str(self.data.datetime.datetime()))
+
+
+def test_scaled_in_trades_carry_their_peak_size():
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=random_walk(10, 1).set_index("time")))
+    cerebro.addstrategy(ScaleIn)
+    orders = cerebro.run()[0].orders
+    assert [order["size"] for order in orders] == [3]
+
+    trade, strategy = VectorTrade(), SimpleNamespace(orders=[])
+    for size in (1, 2, -3):
+        trade.update(size, 100.0, 0.0, 0)
+    record_trade(strategy, trade, "0")
+    assert strategy.orders[0]["size"] == 3
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        run_monte_carlo(trades(10), 10000.0, method="jackknife")
+    with pytest.raises(ValueError):
+        run_monte_carlo([{"type": "buy", "price": 1.0, "size": 1.0}], 10000.0)
+    with pytest.raises(ValueError):
+        run_monte_carlo([{"type": "buy", "price": 1.0, "size": 0.0, "profit": 1.0}], 10000.0, slippage_bps=5)
+
+
+def test_ten_thousand_paths_over_a_thousand_trades_take_under_a_second():
+    orders = trades(1000)
+    start = time.perf_counter()
+    result = run_monte_carlo(orders, 10000.0, iterations=10_000, slippage_bps=5, seed=1)
+    assert time.perf_counter() - start < 1.0
+    assert result["iterations"] == 10_000 and result["trades"] == 1000
+
+
+def test_monte_carlo_api(monkeypatch):
+    stored = {"params": {"initial_capital": 10000}, "equity": {"initial": 10000, "final": 10100},
+              "orders": trades(100)}
+    monkeypatch.setattr(app_module, "get_simulation_result_by_timestamp",
+                        lambda ts: stored if ts == "1617235200" else None)
+    client = app_module.app.test_client()
+
+    response = client.post("/api/backtests/1617235200/monte_carlo", json={"iterations": 500, "seed": 3})
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["iterations"] == 500 and data["trades"] == 100
+    assert set(data["max_drawdown"]["percentiles"]) == {"5", "25", "50", "75", "95"}
+
+    assert client.post("/api/backtests/1/monte_carlo", json={}).status_code == 404
+    assert client.post("/api/backtests/1617235200/monte_carlo", json={"method": "x"}).status_code == 400
+    assert client.post("/api/backtests/1617235200/monte_carlo", json={"iterations": 10 ** 9}).status_code == 400
@@ -0,0 +1,254 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_handler.base_data_handler import BaseDataHandler
+from src.data_handler.memory_store import get_shared_store
+from src.data_handler.ohlcv_cache import CSVCache, NumpyCache, migrate_csv_cache
+
+
+@pytest.fixture
+def candles():
+    times = pd.date_range("2024-01-01", periods=48, freq="h")
+    close = np.linspace(100.0, 147.0, len(times))
+    return pd.DataFrame({
+        "time": times,
+        "open": close - 0.5,
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+        "volume": np.arange(len(times), dtype=float),
+    })
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_store():
+    get_shared_store().clear()
+    yield
+    get_shared_store().clear()
+
+
+def to_ms(ts):
+    return int(pd.Timestamp(ts).value // 10**6)
+
+
+def test_numpy_cache_round_trip(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+
+    loaded = cache.load("BTC/USDT", "1h")
+
+    assert cache.exists("BTC/USDT", "1h")
+    assert list(loaded.columns) == ["time", "open", "high", "low", "close", "volume"]
+    pd.testing.assert_frame_equal(loaded, candles, check_dtype=False, check_index_type=False)
+    assert cache.last_timestamp("BTC/USDT", "1h") == to_ms(candles["time"].iloc[-1])
+
+
+def test_numpy_cache_loads_requested_columns_and_range(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+
+    loaded = cache.load(
+        "BTC/USDT", "1h",
+        start_time=to_ms(candles["time"].iloc[10]),
+        end_time=to_ms(candles["time"].iloc[19]),
+        columns=["close"],
+    )
+
+    assert list(loaded.columns) == ["time", "close"]
+    assert len(loaded) == 10
+    assert loaded["time"].iloc[0] == candles["time"].iloc[10]
+    assert loaded["close"].iloc[-1] == candles["close"].iloc[19]
+
+
+def test_missing_series_returns_empty_frame(tmp_path):
+    assert NumpyCache(str(tmp_path)).load("ETH/USDT", "1h").empty
+
+
+def test_legacy_csv_is_migrated(tmp_path, candles):
+    CSVCache(str(tmp_path)).save("BTC/USDT", "1h", candles)
+    CSVCache(str(tmp_path)).save("ETH/USDT", "5m", candles)
+
+    assert migrate_csv_cache(str(tmp_path), remove_csv=True) == 2
+
+    cache = NumpyCache(str(tmp_path))
+    assert cache.exists("BTC-USDT", "1h")
+    assert len(cache.load("ETH-USDT", "5m")) == len(candles)
+    assert not (tmp_path / "BTC-USDT_1h.csv").exists()
+
+
+def test_legacy_csv_is_migrated_on_first_read(tmp_path, candles):
+    CSVCache(str(tmp_path)).save("BTC/USDT", "1h", candles)
+
+    cache = NumpyCache(str(tmp_path))
+    loaded = cache.load("BTC/USDT", "1h")
+
+    assert len(loaded) == len(candles)
+    assert cache.exists("BTC/USDT", "1h")
+
+
+def test_append_writes_only_new_rows_as_tail_segment(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.iloc[:40])
+
+    # Overlapping rows are ignored, only the 8 newer candles are written
+    assert cache.append("BTC/USDT", "1h", candles.iloc[30:]) == 8
+    assert cache.append("BTC/USDT", "1h", candles.iloc[30:]) == 0
+
+    meta = cache.read_meta("BTC/USDT", "1h")
+    assert [seg["rows"] for seg in meta["segments"]] == [8]
+    assert meta["rows"] == len(candles)
+    pd.testing.assert_frame_equal(cache.load("BTC/USDT", "1h"), candles, check_dtype=False)
+
+
+def test_compaction_merges_tail_segments(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.iloc[:10])
+    for start in range(10, len(candles), 10):
+        cache.append("BTC/USDT", "1h", candles.iloc[start:start + 10])
+
+    cache.compact("BTC/USDT", "1h")
+
+    meta = cache.read_meta("BTC/USDT", "1h")
+    assert meta["segments"] == []
+    assert meta["base"]["rows"] == len(candles)
+    assert sorted(p.name for p in (tmp_path / "BTC-USDT_1h").iterdir() if p.is_dir()) == [meta["base"]["name"]]
+    pd.testing.assert_frame_equal(cache.load("BTC/USDT", "1h"), candles, check_dtype=False)
+
+
+def test_append_triggers_background_compaction(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path), compact_segments=2)
+    cache.save("BTC/USDT", "1h", candles.iloc[:10])
+    cache.append("BTC/USDT", "1h", candles.iloc[10:20])
+    cache.append("BTC/USDT", "1h", candles.iloc[20:30])
+
+    thread = cache.compact_in_background("BTC/USDT", "1h")
+    if thread is not None:
+        thread.join()
+    for _ in range(100):
+        if not cache.read_meta("BTC/USDT", "1h")["segments"]:
+            break
+        time.sleep(0.01)
+
+    assert cache.read_meta("BTC/USDT", "1h")["segments"] == []
+    assert len(cache.load("BTC/USDT", "1h")) == 30
+
+
+def test_update_cache_appends_fresh_candles(tmp_path, candles, mocker):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.iloc[:40])
+    fresh = [[to_ms(row.time), row.open, row.high, row.low, row.close, row.volume]
+             for row in candles.iloc[40:].itertuples()]
+    exchange = mocker.Mock()
+    exchange.fetch_ohlcv.side_effect = [fresh, []]
+    mocker.patch.object(BaseDataHandler, '_create_exchange', return_value=exchange)
+
+    handler = BaseDataHandler()
+    handler.cache = cache
+
+    assert handler.update_cache("BTC/USDT", "1h") == 8
+    assert exchange.fetch_ohlcv.call_args_list[0].kwargs['since'] == to_ms(candles["time"].iloc[39]) + 1
+    assert len(handler.fetch_historical_data("BTC/USDT", "1h")) == len(candles)
+
+
+def test_repeat_fetches_are_served_from_memory(tmp_path, candles, mocker):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+    exchange = mocker.Mock()
+    exchange.fetch_ohlcv.return_value = []
+    mocker.patch.object(BaseDataHandler, '_create_exchange', return_value=exchange)
+    handler = BaseDataHandler()
+    handler.cache = cache
+    handler.fetch_historical_data("BTC/USDT", "1h")
+
+    load_spy = mocker.spy(cache, "load")
+    window = handler.fetch_historical_data("BTC/USDT", "1h", start_time=to_ms(candles["time"].iloc[-5]))
+
+    assert len(window) == 5
+    load_spy.assert_not_called()
+
+
+@pytest.mark.parametrize("backend", [NumpyCache, CSVCache])
+def test_writes_from_other_processes_are_not_shadowed_by_memory(tmp_path, candles, mocker, backend):
+    cache = backend(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles.drop(index=[10]))
+    exchange = mocker.Mock()
+    exchange.fetch_ohlcv.return_value = []
+    mocker.patch.object(BaseDataHandler, '_create_exchange', return_value=exchange)
+    handler = BaseDataHandler()
+    handler.cache = cache
+    assert len(handler.fetch_historical_data("BTC/USDT", "1h")) == len(candles) - 1
+
+    # A job worker repairs the gap: same last candle, nothing invalidated in this process
+    time.sleep(0.01)
+    backend(str(tmp_path)).merge("BTC/USDT", "1h", candles.iloc[[10]])
+
+    pd.testing.assert_frame_equal(handler.fetch_historical_data("BTC/USDT", "1h"), candles, check_dtype=False)
+
+
+def test_series_over_the_memory_budget_is_read_from_disk(tmp_path, candles, mocker):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+    mocker.patch.object(get_shared_store(), "max_bytes", 0)
+    handler = BaseDataHandler()
+    handler.cache = cache
+
+    assert len(handler._read_series("BTC/USDT", "1h", start_time=to_ms(candles["time"].iloc[-5]))) == 5
+
+
+def test_range_reads_only_touch_overlapping_segments(tmp_path, candles, mocker):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.iloc[:24])
+    cache.append("BTC/USDT", "1h", candles.iloc[24:36])
+    cache.append("BTC/USDT", "1h", candles.iloc[36:])
+    meta = cache.read_meta("BTC/USDT", "1h")
+    load_spy = mocker.spy(np, "load")
+
+    window = cache.load(
+        "BTC/USDT", "1h",
+        start_time=to_ms(candles["time"].iloc[30]),
+        end_time=to_ms(candles["time"].iloc[40]),
+    )
+
+    assert window["time"].tolist() == candles["time"].iloc[30:41].tolist()
+    opened = {call.args[0].split("/")[-2] for call in load_spy.call_args_list}
+    assert opened == {seg["name"] for seg in meta["segments"]}
+
+
+def test_range_outside_cached_history_is_empty(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles)
+
+    assert cache.load("BTC/USDT", "1h", start_time=to_ms(candles["time"].iloc[-1]) + 1).empty
+
+
+def test_gap_index_tracks_saves_and_appends(tmp_path, candles):
+    cache = NumpyCache(str(tmp_path), compact_segments=100)
+    cache.save("BTC/USDT", "1h", candles.drop(index=[5, 6]).iloc[:30])
+    # The appended rows leave a hole at the seam with the cached tail
+    cache.append("BTC/USDT", "1h", candles.iloc[33:])
+
+    assert cache.gaps("BTC/USDT", "1h") == [
+        (to_ms(candles["time"].iloc[5]), to_ms(candles["time"].iloc[6])),
+        (to_ms(candles["time"].iloc[32]), to_ms(candles["time"].iloc[32])),
+    ]
+
+
+def test_repair_gaps_fetches_only_missing_windows(tmp_path, candles, mocker):
+    cache = NumpyCache(str(tmp_path))
+    cache.save("BTC/USDT", "1h", candles.drop(index=[10, 11, 12, 40]))
+    rows = [[to_ms(row.time), row.open, row.high, row.low, row.close, row.volume]
+            for row in candles.itertuples()]
+    exchange = mocker.Mock()
+    exchange.fetch_ohlcv.side_effect = lambda symbol, timeframe, since, limit: [r for r in rows if r[0] >= since][:limit]
+    mocker.patch.object(BaseDataHandler, '_create_exchange', return_value=exchange)
+    handler = BaseDataHandler()
+    handler.cache = cache
+
+    report = handler.repair_gaps("BTC/USDT", "1h", max_workers=1)
+
+    assert report == {"gaps": 2, "filled": 4, "remaining": []}
+    assert sorted(call.kwargs['since'] for call in exchange.fetch_ohlcv.call_args_list) == [
+        to_ms(candles["time"].iloc[10]), to_ms(candles["time"].iloc[40])]
+    pd.testing.assert_frame_equal(cache.load("BTC/USDT", "1h"), candles, check_dtype=False)
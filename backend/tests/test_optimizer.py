@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_handler.memory_store import get_shared_store
+from src.grid_backtester import GridBacktester
+from src.optimizer import ParameterOptimizer, grid_search, random_search
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "time": pd.date_range("2023-11-01", periods=n, freq="h"),
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.003,
+        "low": np.minimum(open_, close) * 0.997,
+        "close": close,
+        "volume": rng.uniform(50, 150, n),
+    })
+
+
+@pytest.fixture
+def fetch(mocker):
+    get_shared_store().clear()
+    candles = random_walk(1500, seed=1)
+
+    def fake_fetch(self, start_time=None, end_time=None):
+        self.store_data(self.symbol, candles.copy())
+
+    yield mocker.patch.object(GridBacktester, "fetch_and_store_data", autospec=True, side_effect=fake_fetch)
+    get_shared_store().clear()
+
+
+def make_optimizer(objective="sharpe", max_workers=1):
+    return ParameterOptimizer("TEST/USDT", "1h", 10000.0, 0.5, strategy_type="momentum",
+                              objective=objective, max_workers=max_workers)
+
+
+def test_grid_search_expands_every_combination():
+    combos = grid_search({"rsi_period": [7, 14], "stop_loss_perc": [0.5, 1.0, 2.0]})
+    assert len(combos) == 6
+    assert {"rsi_period": 14, "stop_loss_perc": 2.0} in combos
+
+
+def test_random_search_is_reproducible():
+    space = {"rsi_period": {"low": 5, "high": 30}, "stop_loss_perc": {"low": 0.2, "high": 2.0}, "side": ["a", "b"]}
+    first = random_search(space, 10, seed=42)
+    assert first == random_search(space, 10, seed=42)
+    assert all(isinstance(c["rsi_period"], int) and 5 <= c["rsi_period"] <= 30 for c in first)
+    assert all(0.2 <= c["stop_loss_perc"] <= 2.0 for c in first)
+
+
+@pytest.mark.parametrize("objective, max_workers", [("net_profit", 1), ("max_drawdown", 2)])
+def test_runs_are_ranked_and_data_is_fetched_once(fetch, objective, max_workers):
+    optimizer = make_optimizer(objective, max_workers)
+    combos = grid_search({"ema_short_length": [9, 21], "ema_long_length": [30, 100]})
+
+    results = optimizer.run(combos)
+
+    assert fetch.call_count == 1
+    assert len(results) == len(combos)
+    assert [r["rank"] for r in results] == list(range(1, len(combos) + 1))
+    scores = [r["score"] for r in results]
+    assert len(set(scores)) > 1
+    assert scores == sorted(scores, reverse=objective == "net_profit")
+    assert all(r["score"] == r[objective] and "error" not in r for r in results)
+
+
+def test_unknown_parameters_are_rejected_before_running(fetch):
+    with pytest.raises(ValueError):
+        list(make_optimizer().iter_results([{"no_such_param": 1}]))
+
+
+def test_runs_stopped_early_are_flagged_and_ranked_last(fetch):
+    combos = grid_search({"ema_short_length": [9, 21], "ema_long_length": [30, 100], "stop_loss_perc": [0.5, 3]})
+    full = {r["index"]: r for r in make_optimizer("net_profit").run(combos)}
+    optimizer = ParameterOptimizer("TEST/USDT", "1h", 10000.0, 0.5, strategy_type="momentum",
+                                   objective="net_profit", max_workers=1, early_stop={"max_drawdown": 0.05})
+
+    results = optimizer.run(combos)
+
+    stopped = [r["truncated"] is not None for r in results]
+    assert 0 < sum(stopped) < len(results)
+    assert stopped == sorted(stopped)
+    for r in results:
+        if r["truncated"]:
+            assert r["truncated"]["reason"] == "max_drawdown"
+        else:
+            assert r["final_value"] == full[r["index"]]["final_value"]
+
+
+@pytest.mark.parametrize("endpoint", ["/api/optimize", "/api/walk_forward"])
+def test_requested_workers_are_clamped_to_the_configured_pool(mocker, endpoint):
+    import app as app_module
+
+    optimizer = mocker.patch.object(app_module, "ParameterOptimizer")
+    optimizer.return_value.iter_results.return_value = []
+    optimizer.return_value.rank.return_value = []
+    mocker.patch.object(app_module, "WalkForwardAnalysis").return_value.run.return_value = {}
+    client = app_module.app.test_client()
+    body = {"symbol": "TEST/USDT", "train_bars": 500, "test_bars": 500}
+
+    workers = app_module.OPTIMIZER_WORKERS
+    for requested, expected in [(10 ** 6, workers), (0, 1), ("2", min(2, workers)), (None, None)]:
+        response = client.post(endpoint, json={**body, "max_workers": requested})
+        response.get_data()
+        assert response.status_code == 200
+        assert optimizer.call_args.kwargs["max_workers"] == expected
+
+    optimizer.reset_mock()
+    for requested in ["many", 2.5, True]:
+        assert client.post(endpoint, json={**body, "max_workers": requested}).status_code == 400
+    optimizer.assert_not_called()
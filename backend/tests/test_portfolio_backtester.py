@@ -0,0 +1,77 @@
+import pytest
+
+from src.data_handler.ohlcv_cache import get_cache_backend
+from src.data_handler.synthetic import generate_ohlcv
+from src.grid_backtester import GridBacktester
+from src.portfolio_backtester import PortfolioBacktester
+
+STRATEGIES = {
+    "grid": ({"rsi_threshold": 30, "box_lookback": 10}, None),
+    "momentum": ({}, None),
+    "stoch_mean_reversion": ({"oversold": 40, "overbought": 60}, "4h"),
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return get_cache_backend("numpy", str(tmp_path))
+
+
+def portfolio(cache, symbols, strategy_type, **kwargs):
+    box_params, htf_interval = STRATEGIES[strategy_type]
+    backtester = PortfolioBacktester(symbols, "1h", 10000.0, 1.0, box_params, strategy_type,
+                                     htf_interval=htf_interval, **kwargs)
+    backtester.cache = cache
+    backtester.fetch_and_store_data()
+    return backtester
+
+
+@pytest.mark.parametrize("strategy_type", sorted(STRATEGIES))
+def test_single_symbol_portfolio_matches_grid_backtester(cache, strategy_type):
+    cache.save("A/USDT", "1h", generate_ohlcv(2000, seed=1))
+    backtester = portfolio(cache, ["A/USDT"], strategy_type)
+
+    box_params, htf_interval = STRATEGIES[strategy_type]
+    single = GridBacktester("A/USDT", "1h", 10000.0, 1.0, box_params, strategy_type,
+                            htf_interval=htf_interval, fast=True)
+    single.store_data("A/USDT", backtester.get_stored_data("A/USDT").to_frame())
+    if htf_interval:
+        single.store_data(single.htf_key, backtester.get_stored_data(backtester.htf_key_for("A/USDT")).to_frame())
+    expected = single.simulate()
+
+    result = backtester.simulate()
+    assert result[2].total.total > 0
+    assert result[1:] == expected[1:]
+    assert result[0] == [{**order, "symbol": "A/USDT"} for order in expected[0]]
+
+
+def test_portfolio_shares_cash_across_symbols_with_different_histories(cache):
+    cache.save("A/USDT", "1h", generate_ohlcv(2000, seed=1))
+    cache.save("B/USDT", "1h", generate_ohlcv(1200, start="2020-01-20", seed=5))
+    backtester = portfolio(cache, ["A/USDT", "B/USDT", "MISSING/USDT"], "momentum")
+
+    orders, final_value, trades, drawdown, sharpe = backtester.simulate()
+
+    assert set(backtester.symbol_results) == {"A/USDT", "B/USDT"}
+    per_symbol = [result["trade_analysis"].total.closed for result in backtester.symbol_results.values()]
+    assert all(closed > 0 for closed in per_symbol)
+    assert trades.total.closed == sum(per_symbol)
+    # One portfolio value per step over the union of both histories
+    assert drawdown.max.drawdown > 0
+    assert final_value != 10000.0
+
+
+def test_position_limit_caps_orders(cache):
+    cache.save("A/USDT", "1h", generate_ohlcv(2000, seed=1))
+    unlimited = portfolio(cache, ["A/USDT"], "momentum").simulate()
+
+    # Momentum trades one unit (~1% of the capital): a 5% cap leaves it alone, a 0.5% cap cuts every entry
+    assert portfolio(cache, ["A/USDT"], "momentum", max_position_pct=5).simulate()[1:] == unlimited[1:]
+    capped = portfolio(cache, ["A/USDT"], "momentum", max_position_pct=0.5).simulate()
+    assert capped[2].total.closed == unlimited[2].total.closed
+    assert 0 < abs(capped[1] - 10000.0) < abs(unlimited[1] - 10000.0)
+
+
+def test_portfolio_needs_symbols():
+    with pytest.raises(ValueError):
+        PortfolioBacktester([], "1h", 10000.0, 1.0, {})
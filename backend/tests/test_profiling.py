@@ -0,0 +1,64 @@
+import backtrader as bt
+import pytest
+
+from src.grid_backtester import GridBacktester
+from src.profiling import SECTIONS, SimulationProfiler
+from tests.test_vector_engine import random_walk, simulate
+
+
+class SmaCross(bt.Strategy):
+    def __init__(self):
+        self.fast = bt.indicators.SMA(self.data.close, period=5)
+        self.slow = bt.indicators.SMA(self.data.close, period=20)
+
+    def next(self):
+        if not self.position and self.fast[0] > self.slow[0]:
+            self.buy()
+        elif self.position and self.fast[0] < self.slow[0]:
+            self.close()
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_profiled_simulation_matches_and_reports_sections(fast):
+    candles = random_walk(1500, seed=1)
+    expected = simulate("backtrader", "momentum", candles, risk=0.5, fast=fast)
+
+    backtester = GridBacktester("TEST/USDT", "1h", 10000.0, 0.5, {}, "momentum", fast=fast, profile=True)
+    backtester.store_data("TEST/USDT", candles.copy())
+
+    assert backtester.simulate() == expected
+    summary = backtester.profile_summary
+    assert set(summary["sections"]) == set(SECTIONS)
+    assert summary["sections"]["broker"]["calls"] == len(candles)
+    assert 0 < summary["sections"]["next"]["calls"] <= len(candles)
+    # notify_trade fires when a trade opens and when it closes
+    assert summary["sections"]["notify_trade"]["calls"] == 2 * expected[2].total.closed
+    for stats in summary["sections"].values():
+        assert sum(bucket["count"] for bucket in stats["histogram"]) == stats["calls"]
+        assert stats["total_ms"] <= summary["wall_ms"]
+
+
+def test_profiling_is_off_by_default():
+    backtester = GridBacktester("TEST/USDT", "1h", 10000.0, 0.5, {}, "momentum")
+    backtester.store_data("TEST/USDT", random_walk(600, seed=2))
+    backtester.simulate()
+    assert backtester.profile_summary is None
+
+
+@pytest.mark.parametrize("runonce", [True, False])
+def test_indicator_calls_follow_the_run_mode(runonce):
+    profiler = SimulationProfiler()
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+    cerebro.adddata(bt.feeds.PandasData(dataname=random_walk(300, seed=3).set_index("time")))
+    cerebro.addstrategy(profiler.profile_strategy(SmaCross))
+    profiler.profile_broker(cerebro.broker)
+    profiler.run(cerebro)
+
+    indicators = profiler.summary()["sections"]["indicators"]["calls"]
+    assert indicators == (2 if runonce else 2 * 300)
+    assert len(profiler.durations["next"]) == 300 - 19
+
+
+def test_profiling_requires_backtrader_engine():
+    with pytest.raises(ValueError):
+        GridBacktester("TEST/USDT", "1h", 10000.0, 1.0, {}, "grid", engine="vector", profile=True)
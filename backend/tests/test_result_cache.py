@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+import src.grid_backtester as grid_backtester
+import src.result_cache as result_cache
+from src.data_handler.memory_store import get_shared_store
+from src.grid_backtester import GridBacktester
+from src.result_cache import ResultCache, result_key
+from tests.test_vector_engine import random_walk
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "results"), 10 * 1024 * 1024)
+    monkeypatch.setattr(grid_backtester, "get_result_cache", lambda: cache)
+    return cache
+
+
+def backtester(candles, **kwargs):
+    get_shared_store().clear()
+    backtester = GridBacktester("TEST/USDT", "1h", 10000.0, kwargs.pop("risk", 1.0), {}, "momentum",
+                                cache_results=True, **kwargs)
+    backtester.store_data("TEST/USDT", candles.copy())
+    return backtester
+
+
+def test_cache_put_get_evict(tmp_path):
+    cache = ResultCache(str(tmp_path), 1024 * 1024)
+    assert cache.get("a1") is None
+    cache.put("a1", {"final_value": 1.0})
+    cache.put("b2", [1, 2, 3])
+
+    assert cache.get("a1") == {"final_value": 1.0}
+    assert cache.stats()["entries"] == 2
+    assert cache.evict("a1") and not cache.evict("a1")
+    assert not cache.evict("../b2")
+    assert cache.clear() == 1
+    assert cache.stats() == {"entries": 0, "used_bytes": 0, "max_bytes": 1024 * 1024}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    value = bytes(400)
+    cache = ResultCache(str(tmp_path), 1000)
+    for age, key in enumerate(["old", "used", "new"]):
+        cache.put(key, value)
+        os.utime(os.path.join(str(tmp_path), key + ".pkl"), (age, age))
+    cache.get("used")  # refreshed: now the most recently used
+
+    cache.put("newest", value)
+    assert [cache.get(key) is not None for key in ["old", "new", "used", "newest"]] == [False, False, True, True]
+
+    cache.put("huge", bytes(2000))  # larger than the whole budget: not stored, nothing evicted
+    assert cache.get("huge") is None and cache.get("newest") is not None
+    assert ResultCache(str(tmp_path), 0).get("newest") is None  # budget 0 disables the cache
+
+
+def test_result_key_is_canonical_and_versioned(monkeypatch):
+    spec = {"symbol": "BTC/USDT", "params": {"a": 1, "b": 2.5}}
+    assert result_key(spec) == result_key({"params": {"b": 2.5, "a": 1}, "symbol": "BTC/USDT"})
+    assert result_key(spec) != result_key({**spec, "params": {"a": 1, "b": 2.6}})
+    key = result_key(spec)
+    monkeypatch.setattr(result_cache, "code_version", lambda: "changed sources")
+    assert result_key(spec) != key
+
+
+def test_identical_backtest_is_served_from_the_cache(cache, monkeypatch):
+    candles = random_walk(1200, seed=4)
+    first = backtester(candles)
+    expected = first.simulate()
+    assert not first.cache_hit and cache.stats()["entries"] == 1
+
+    def fail(self):
+        raise AssertionError("simulated again")
+
+    monkeypatch.setattr(GridBacktester, "_simulate", fail)
+    second = backtester(candles)
+    assert second.simulate() == expected
+    assert second.cache_hit and second.cache_key == first.cache_key
+    assert second.simulate()[2].total.total == expected[2].total.total  # analyses keep their attribute access
+
+
+def test_changed_inputs_miss_the_cache(cache):
+    candles = random_walk(1200, seed=4)
+    runs = [backtester(candles), backtester(candles, risk=2.0)]
+    changed = candles.copy()
+    changed.loc[600, "close"] *= 1.01
+    runs.append(backtester(changed))
+    runs.append(backtester(candles, refresh_cache=True))
+    runs.append(backtester(candles, profile=True))
+
+    for run in runs:
+        run.simulate()
+    assert [run.cache_hit for run in runs] == [False] * 5
+    assert len({run.cache_key for run in runs[:3]}) == 3
+    assert runs[3].cache_key == runs[0].cache_key  # refreshed in place
+    assert cache.stats()["entries"] == 3
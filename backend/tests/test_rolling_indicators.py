@@ -0,0 +1,57 @@
+import operator
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from src import vector_indicators as vi
+from src.rolling_indicators import RollingExtremum, RollingMax, RollingMin
+from tests.test_vector_engine import random_walk
+
+PERIODS = (1, 5, 31, 200)
+
+
+class RollingVsStock(bt.Strategy):
+    def __init__(self):
+        self.pairs = []
+        for period in PERIODS:
+            self.pairs.append((RollingMin(self.data.low, period=period), bt.indicators.Lowest(self.data.low, period=period)))
+            self.pairs.append((RollingMax(self.data.high, period=period), bt.indicators.Highest(self.data.high, period=period)))
+        # Input with a warm-up of its own
+        sma = bt.indicators.SMA(self.data.close, period=20)
+        self.pairs.append((RollingMin(sma, period=10), bt.indicators.Lowest(sma, period=10)))
+
+
+@pytest.mark.parametrize("runonce", [True, False])
+def test_rolling_extrema_match_backtrader(runonce):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+    cerebro.adddata(bt.feeds.PandasData(dataname=random_walk(800, seed=4).set_index("time")))
+    cerebro.addstrategy(RollingVsStock)
+    strategy = cerebro.run()[0]
+
+    for got, expected in strategy.pairs:
+        assert got._minperiod == expected._minperiod
+        np.testing.assert_array_equal(np.array(got.lines[0].array), np.array(expected.lines[0].array))
+
+
+def test_rolling_extremum_matches_window_scan():
+    values = np.random.default_rng(0).integers(0, 10, 500).astype(float)  # plenty of ties
+    for period in (1, 3, 17):
+        lowest = RollingExtremum(period, operator.le)
+        highest = RollingExtremum(period, operator.ge)
+        for i, value in enumerate(values):
+            window = values[max(0, i - period + 1):i + 1]
+            assert lowest.push(value) == window.min()
+            assert highest.push(value) == window.max()
+
+
+@pytest.mark.parametrize("period", [1, 2, 7, 50, 499, 500, 501])
+def test_vector_extrema_match_window_scan(period):
+    values = np.random.default_rng(1).normal(size=500)
+    values[:3] = np.nan  # leading warm-up, as in indicator outputs
+    expected = np.full(len(values), np.nan)
+    for i in range(3 + period - 1, len(values)):
+        expected[i] = values[i - period + 1:i + 1].min()
+
+    np.testing.assert_array_equal(vi.lowest(values, period), expected)
+    np.testing.assert_array_equal(-vi.highest(-values, period), expected)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import compare
+from src.data_handler.synthetic import generate_ohlcv
+
+
+def test_generate_ohlcv_is_deterministic():
+    pd.testing.assert_frame_equal(generate_ohlcv(500, seed=7), generate_ohlcv(500, seed=7))
+    assert not generate_ohlcv(500, seed=7)['close'].equals(generate_ohlcv(500, seed=8)['close'])
+
+
+def test_generate_ohlcv_candles_are_consistent():
+    candles = generate_ohlcv(2000, interval='15m')
+
+    assert list(candles.columns) == ['time', 'open', 'high', 'low', 'close', 'volume']
+    assert (np.diff(candles['time'].values) == np.timedelta64(15, 'm')).all()
+    assert (candles['high'] >= candles[['open', 'close']].max(axis=1)).all()
+    assert (candles['low'] <= candles[['open', 'close']].min(axis=1)).all()
+    assert (candles['low'] > 0).all() and (candles['volume'] > 0).all()
+
+
+def test_compare_reports_regressions():
+    before = {'cases': {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}, 'gone': {'seconds': 1.0}}}
+    after = {'cases': {'a': {'seconds': 1.05}, 'b': {'seconds': 1.5}, 'new': {'seconds': 1.0}}}
+
+    assert compare(before, after, threshold=1.1) == ['b']
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_handler.base_data_handler import BaseDataHandler
+from src.data_handler.memory_store import get_shared_store
+from src.data_handler.ohlcv_cache import NumpyCache
+from src.data_handler.timeframes import (
+    find_gaps, is_derivable, resample_ohlcv, split_time_range, stitch_candles, timeframe_to_ms
+)
+
+HOUR = 3600 * 1000
+
+
+class FakeExchange:
+    """Serves fetch_ohlcv pages from an in-memory list of candles."""
+
+    def __init__(self, candles, page_limit=100):
+        self.candles = candles
+        self.page_limit = page_limit
+        self.calls = 0
+        self.timeframes = set()
+
+    def fetch_ohlcv(self, symbol, timeframe=None, since=None, limit=None):
+        self.calls += 1
+        self.timeframes.add(timeframe)
+        rows = [c for c in self.candles if since is None or c[0] >= since]
+        return rows[:min(limit, self.page_limit)]
+
+
+def make_candles(start_ms, count, skip=()):
+    return [[start_ms + i * HOUR, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0]
+            for i in range(count) if i not in skip]
+
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms("1m") == 60 * 1000
+    assert timeframe_to_ms("4h") == 4 * HOUR
+    with pytest.raises(ValueError):
+        timeframe_to_ms("fortnight")
+
+
+def test_split_time_range_covers_range_without_overlap():
+    windows = split_time_range(HOUR + 5, 10 * HOUR, 3 * HOUR, align_ms=HOUR)
+
+    assert windows[0][0] == HOUR
+    assert windows[-1][1] == 10 * HOUR
+    assert all(prev[1] + 1 == nxt[0] for prev, nxt in zip(windows, windows[1:]))
+
+
+def test_find_gaps_reports_missing_candles():
+    times = np.array([0, 1, 2, 5, 6, 9], dtype=np.int64) * HOUR
+
+    assert find_gaps(times, HOUR) == [(3 * HOUR, 4 * HOUR), (7 * HOUR, 8 * HOUR)]
+
+
+def test_stitch_candles_removes_overlaps():
+    first = pd.DataFrame({"time": pd.to_datetime([0, HOUR, 2 * HOUR], unit="ms"), "close": [1.0, 2.0, 3.0]})
+    second = pd.DataFrame({"time": pd.to_datetime([2 * HOUR, 3 * HOUR], unit="ms"), "close": [3.0, 4.0]})
+
+    stitched, report = stitch_candles([second, first], HOUR)
+
+    assert stitched["close"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert report["overlaps"] == 1
+    assert report["gaps"] == []
+
+
+def test_backfill_fetches_windows_and_caches_result(tmp_path, mocker):
+    get_shared_store().clear()
+    start = 1_700_000_000_000 - (1_700_000_000_000 % HOUR)
+    exchange = FakeExchange(make_candles(start, 1000, skip={500}), page_limit=100)
+    handler = BaseDataHandler()
+    handler.cache = NumpyCache(str(tmp_path))
+    mocker.patch.object(handler, "_create_exchange", return_value=exchange)
+    warn = mocker.patch("src.data_handler.timeframes.logger.warning")
+
+    backfilled = handler.backfill_historical_data(
+        "BTC/USDT", "1h", start, start + 999 * HOUR, max_workers=4, window_bars=250)
+
+    assert len(backfilled) == 999
+    assert backfilled["time"].is_monotonic_increasing
+    assert len(handler.cache.load("BTC/USDT", "1h")) == 999
+    warn.assert_called_once()
+    # 4 windows of 250 bars, each paged in 100-bar requests plus a final empty page
+    assert exchange.calls <= 4 * 4
+
+
+def test_resample_ohlcv_aggregates_and_drops_open_bucket():
+    candles = pd.DataFrame(make_candles(0, 10), columns=["time", "open", "high", "low", "close", "volume"])
+    candles["time"] = pd.to_datetime(candles["time"], unit="ms")
+
+    resampled = resample_ohlcv(candles, "1h", "4h")
+
+    # Hours 8-9 only partially fill the third 4h candle, so it is not emitted yet
+    assert resampled["time"].tolist() == pd.to_datetime([0, 4 * HOUR], unit="ms").tolist()
+    assert resampled["open"].tolist() == [1.0, 5.0]
+    assert resampled["high"].tolist() == [5.0, 9.0]
+    assert resampled["low"].tolist() == [0.5, 4.5]
+    assert resampled["close"].tolist() == [4.5, 8.5]
+    assert resampled["volume"].tolist() == [40.0, 40.0]
+    assert not is_derivable("1h", "1M")
+    assert not is_derivable("4h", "1h")
+
+
+def test_resample_ohlcv_drops_buckets_missing_base_candles():
+    # Starts mid-bucket (hour 2) and misses hour 9: only the 4h candles at 4h and 12h are complete
+    candles = pd.DataFrame(make_candles(0, 16, skip=(0, 1, 9)), columns=["time", "open", "high", "low", "close", "volume"])
+    candles["time"] = pd.to_datetime(candles["time"], unit="ms")
+
+    resampled = resample_ohlcv(candles, "1h", "4h")
+
+    assert resampled["time"].tolist() == pd.to_datetime([4 * HOUR, 12 * HOUR], unit="ms").tolist()
+    assert resampled["volume"].tolist() == [40.0, 40.0]
+
+
+def test_resampled_series_is_cached_and_extended_incrementally(tmp_path, mocker):
+    get_shared_store().clear()
+    start = 1_700_000_000_000 - (1_700_000_000_000 % (4 * HOUR))
+    exchange = FakeExchange(make_candles(start, 24))
+    handler = BaseDataHandler()
+    handler.cache = NumpyCache(str(tmp_path))
+    mocker.patch.object(handler, "_create_exchange", return_value=exchange)
+
+    four_hour = handler.fetch_resampled_data("BTC/USDT", "4h", "1h")
+
+    assert len(four_hour) == 6
+    assert handler.cache.exists("BTC/USDT", "4h")
+    assert exchange.timeframes == {"1h"}
+
+    exchange.candles = make_candles(start, 32)
+    four_hour = handler.fetch_resampled_data("BTC/USDT", "4h")
+
+    assert len(four_hour) == 8
+    assert [seg["rows"] for seg in handler.cache.read_meta("BTC/USDT", "4h")["segments"]] == [2]
+    assert four_hour["close"].iloc[-1] == 32.5
+
+
+def test_repairing_the_base_rebuilds_derived_candles(tmp_path, mocker):
+    get_shared_store().clear()
+    start = 1_700_000_000_000 - (1_700_000_000_000 % (4 * HOUR))
+    exchange = FakeExchange(make_candles(start, 24, skip=(5, 6)))
+    handler = BaseDataHandler()
+    handler.cache = NumpyCache(str(tmp_path))
+    mocker.patch.object(handler, "_create_exchange", return_value=exchange)
+
+    four_hour = handler.fetch_resampled_data("BTC/USDT", "4h", "1h")
+    # The 4h candle missing hours 5 and 6 is not derived yet
+    assert len(four_hour) == 5
+    assert handler.cache.derived_from("BTC/USDT", "4h") == "1h"
+
+    exchange.candles = make_candles(start, 24)
+    assert handler.repair_gaps("BTC/USDT", "1h")["filled"] == 2
+
+    full = pd.DataFrame(make_candles(start, 24), columns=["time", "open", "high", "low", "close", "volume"])
+    full["time"] = pd.to_datetime(full["time"], unit="ms")
+    four_hour = handler.fetch_resampled_data("BTC/USDT", "4h", "1h")
+    pd.testing.assert_frame_equal(four_hour, resample_ohlcv(full, "1h", "4h"), check_dtype=False)
+    assert handler.cache.gaps("BTC/USDT", "4h") == []
@@ -0,0 +1,121 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import vector_indicators as vi
+from src.data_handler.candle_arrays import CandleArrays
+from src.data_handler.memory_store import get_shared_store
+from src.data_handler.timeframes import resample_ohlcv
+from src.grid_backtester import GridBacktester
+
+
+def random_walk(n, seed, start="2023-06-01"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.002, n))
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=n, freq="h"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n))),
+        "close": close,
+        "volume": rng.uniform(50, 150, n),
+    })
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_store():
+    get_shared_store().clear()
+    yield
+    get_shared_store().clear()
+
+
+def simulate(engine, strategy_type, candles, box_params=None, risk=1.0, htf_interval=None, compact=False,
+             fast=False):
+    get_shared_store().clear()
+    backtester = GridBacktester(
+        "TEST/USDT", "1h", 10000.0, risk, box_params or {}, strategy_type,
+        htf_interval=htf_interval, compact=compact, engine=engine, fast=fast,
+    )
+    backtester.store_data("TEST/USDT", CandleArrays.from_frame(candles) if compact else candles.copy())
+    if htf_interval:
+        backtester.store_data(backtester.htf_key, resample_ohlcv(candles, "1h", htf_interval))
+    return backtester.simulate()
+
+
+class RecordIndicators(bt.Strategy):
+    def __init__(self):
+        self.rsi = bt.indicators.RSI(self.data.close, period=14)
+        self.atr = bt.indicators.ATR(self.data, period=14)
+        self.macd = bt.indicators.MACD(self.data.close, period_me1=14, period_me2=28, period_signal=9)
+        self.std = bt.indicators.StdDev(self.data.close, period=20)
+        self.dmi = bt.indicators.DirectionalMovement(self.data, period=14)
+        self.cross = bt.indicators.CrossOver(bt.indicators.SMA(self.data.close, period=3),
+                                             bt.indicators.EMA(self.data.close, period=5))
+
+
+def test_indicators_match_backtrader():
+    candles = random_walk(400, seed=7)
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=candles.set_index("time")))
+    cerebro.addstrategy(RecordIndicators)
+    strat = cerebro.run()[0]
+    h, l, c = (candles[col].to_numpy() for col in ("high", "low", "close"))
+
+    def same(line, expected):
+        np.testing.assert_array_equal(np.array(line.array), expected)
+
+    same(strat.rsi.lines.rsi, vi.rsi(c, 14))
+    same(strat.atr.lines.atr, vi.atr(h, l, c, 14))
+    macd = vi.macd(c, 14, 28, 9)
+    same(strat.macd.lines.macd, macd["macd"])
+    same(strat.macd.lines.signal, macd["signal"])
+    same(strat.std.lines.stddev, vi.stddev(c, 20))
+    dmi = vi.directional_movement(h, l, c, 14)
+    for line in ("plusDI", "minusDI", "adx", "adxr"):
+        same(getattr(strat.dmi.lines, line), dmi[line])
+    same(strat.cross.lines.crossover, vi.crossover(vi.sma(c, 3), vi.ema(c, 5)))
+
+
+@pytest.mark.parametrize("strategy_type, box_params, risk, bars, seed, htf_interval", [
+    ("grid", {"rsi_threshold": 30, "box_lookback": 10}, 2.0, 3000, 1, None),
+    ("grid", {"rsi_threshold": 30, "box_lookback": 10}, 2.0, 3000, 2, None),
+    ("momentum", {}, 0.5, 3000, 1, None),
+    # Every filled IB order spawns two more, so keep the series short
+    ("ib_price_action", {"useVolumeFilter": False}, 10.0, 700, 1, None),
+    ("stoch_mean_reversion", {"oversold": 40, "overbought": 60}, 1.0, 3000, 1, "4h"),
+    ("stoch_mean_reversion", {"oversold": 40, "overbought": 60}, 1.0, 3000, 3, "4h"),
+])
+def test_vector_engine_matches_backtrader(strategy_type, box_params, risk, bars, seed, htf_interval):
+    # Starting in November spans a year end, so the Sharpe ratio has two yearly returns
+    candles = random_walk(bars, seed, start="2023-11-01")
+
+    expected = simulate("backtrader", strategy_type, candles, box_params, risk, htf_interval)
+    result = simulate("vector", strategy_type, candles, box_params, risk, htf_interval)
+
+    orders, value, trades, drawdown, sharpe = result
+    assert trades.total.total > 0
+    assert orders == expected[0]
+    assert value == expected[1]
+    assert trades == expected[2]
+    assert drawdown == expected[3]
+    assert sharpe == expected[4]
+
+
+def test_vector_engine_runs_on_compact_arrays():
+    # Prices on a 1/64 grid survive the float32 round trip exactly
+    candles = random_walk(3000, seed=1)
+    for col in ("open", "high", "low", "close"):
+        candles[col] = np.round(candles[col] * 64) / 64
+
+    expected = simulate("vector", "momentum", candles, risk=0.5)
+    result = simulate("vector", "momentum", candles, risk=0.5, compact=True)
+
+    assert result[1] == expected[1]
+    assert result[2] == expected[2]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        GridBacktester("TEST/USDT", "1h", 10000.0, 1.0, {}, engine="gpu")
@@ -0,0 +1,81 @@
+import pytest
+
+import app as app_module
+from src.grid_backtester import GridBacktester
+from src.optimizer import ParameterOptimizer, grid_search
+from src.walk_forward import WalkForwardAnalysis, _bar_times, walk_forward_windows
+from tests.test_optimizer import fetch  # noqa: F401 (fixture)
+
+
+def test_windows_roll_by_test_length():
+    assert walk_forward_windows(2500, 1000, 500) == [(0, 1000, 1500), (500, 1500, 2000), (1000, 2000, 2500)]
+    assert walk_forward_windows(2500, 1000, 500, anchored=True) == [(0, 1000, 1500), (0, 1500, 2000), (0, 2000, 2500)]
+    assert walk_forward_windows(1200, 1000, 500) == []
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_walk_forward_stitches_out_of_sample_equity(fetch, max_workers):
+    optimizer = ParameterOptimizer("TEST/USDT", "1h", 10000.0, 0.5, strategy_type="momentum",
+                                   objective="net_profit", max_workers=max_workers)
+    analysis = WalkForwardAnalysis(optimizer, train_bars=500, test_bars=500)
+
+    report = analysis.run(grid_search({"ema_short_length": [9, 21], "ema_long_length": [30, 100]}))
+
+    assert fetch.call_count == 1
+    assert len(report["windows"]) == 2
+    for window in report["windows"]:
+        assert window["train"]["end"] < window["test"]["start"]
+        assert window["params"] is not None
+        assert "error" not in window["result"]
+
+    curve = report["equity_curve"]
+    assert len(curve) == 3
+    assert curve[0]["value"] == 10000.0
+    expected = 10000.0
+    for window in report["windows"]:
+        expected *= window["result"]["final_value"] / 10000.0
+    assert report["final_value"] == pytest.approx(expected)
+    assert curve[-1]["value"] == report["final_value"]
+
+
+def test_windows_shorter_than_the_backtester_minimum_are_rejected(fetch):
+    optimizer = ParameterOptimizer("TEST/USDT", "1h", 10000.0, 0.5, strategy_type="momentum", max_workers=1)
+    with pytest.raises(ValueError, match="test_bars=200"):
+        WalkForwardAnalysis(optimizer, train_bars=1000, test_bars=200)
+
+    client = app_module.app.test_client()
+    response = client.post("/api/walk_forward", json={"symbol": "TEST/USDT", "strategy_type": "momentum",
+                                                      "param_grid": {"ema_short_length": [9]},
+                                                      "train_bars": 1000, "test_bars": 200})
+    assert response.status_code == 400
+    assert fetch.call_count == 1
+
+
+def test_failed_test_windows_are_reported(fetch, mocker):
+    optimizer = ParameterOptimizer("TEST/USDT", "1h", 10000.0, 0.5, strategy_type="momentum",
+                                   objective="net_profit", max_workers=1)
+    optimizer.load_data()
+    failing_start = int(_bar_times(optimizer.data)[1000])
+    simulate = GridBacktester.simulate
+
+    def fail_last_test_window(self):
+        if int(_bar_times(self.get_stored_data(self.symbol))[0]) == failing_start:
+            raise ValueError("boom")
+        return simulate(self)
+
+    mocker.patch.object(GridBacktester, "simulate", autospec=True, side_effect=fail_last_test_window)
+    # Shorter test than train windows: (0, 700, 1200) and (500, 1200, 1700 > 1500) leaves one window
+    grid = grid_search({"ema_short_length": [9, 21]})
+    report = WalkForwardAnalysis(optimizer, train_bars=700, test_bars=500).run(grid)
+    assert len(report["windows"]) == 1 and report["failed_windows"] == []
+    assert len(report["equity_curve"]) == 2
+
+    report = WalkForwardAnalysis(optimizer, train_bars=500, test_bars=500).run(grid)
+    assert report["failed_windows"] == [1]
+    assert report["windows"][1]["error"] == "boom"
+    assert "error" not in report["windows"][0]
+    assert len(report["equity_curve"]) == 2
+    assert report["final_value"] == pytest.approx(report["windows"][0]["result"]["final_value"])
+
+    with pytest.raises(ValueError, match="boom"):
+        WalkForwardAnalysis(optimizer, train_bars=1000, test_bars=500).run(grid)